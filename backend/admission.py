@@ -0,0 +1,204 @@
+"""
+Admission Control
+Per-client token-bucket rate limiting, per-route concurrency caps and
+priority load shedding, applied before a request reaches its handler
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from starlette.responses import JSONResponse
+from config import settings
+import metrics
+
+PRIORITIES = ("snapshot", "standard", "expensive")
+
+
+class RateLimitBackend:
+    """
+    Where token buckets live
+
+    `acquire` is called on the event loop for every admitted request, so
+    implementations must answer without blocking on I/O.
+    """
+
+    name = "base"
+
+    def acquire(self, key: str, cost: float, now: Optional[float] = None) -> float:
+        """
+        Take `cost` tokens from the client's bucket
+
+        Returns:
+            0 if admitted, else seconds until the bucket holds enough tokens
+        """
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return 0
+
+
+class MemoryRateLimiter(RateLimitBackend):
+    """
+    Token buckets in process memory (limits apply per worker)
+
+    Buckets start full and refill at `rate` tokens per second up to `burst`.
+    At most `max_clients` buckets are kept; the least recently seen client
+    is dropped first, which at worst hands it a full bucket again.
+    """
+
+    name = "memory"
+
+    def __init__(
+        self,
+        rate: float = settings.RATE_LIMIT_PER_SECOND,
+        burst: float = settings.RATE_LIMIT_BURST,
+        max_clients: int = settings.RATE_LIMIT_MAX_CLIENTS
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # key -> [tokens, monotonic time of the last refill]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str, cost: float, now: Optional[float] = None) -> float:
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0.0
+            return (cost - bucket[0]) / self.rate
+
+
+def create_rate_limiter(name: str = settings.RATE_LIMIT_BACKEND) -> RateLimitBackend:
+    """Rate limit backend by name"""
+    if name == "memory":
+        return MemoryRateLimiter()
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+def _longest_prefix(path: str, prefixes: List[str]) -> Optional[str]:
+    """Longest configured prefix covering `path` ('/api/funds' covers '/api/funds/x', not '/api/fundsx')"""
+    for prefix in prefixes:
+        if path == prefix or path.startswith(prefix + "/"):
+            return prefix
+    return None
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware deciding whether a request gets handled at all
+
+    In order, a request is rejected when:
+    - requests in flight reach its priority's shed threshold (503): expensive
+      calls go first, cheap snapshot reads are kept until the very end
+    - its route is at its concurrency cap (503)
+    - its client's token bucket is empty (429); expensive calls cost more tokens
+
+    Rejections carry Retry-After and are counted in
+    algorist_admission_rejections_total. Exempt paths (health, metrics) and
+    CORS preflights always pass.
+    """
+
+    def __init__(self, app: metrics.ASGIApp, limiter: Optional[RateLimitBackend] = None, enabled: bool = settings.ADMISSION_ENABLED):
+        self.app = app
+        self.enabled = enabled
+        self.limiter = limiter if limiter is not None else create_rate_limiter()
+        self.in_flight = 0
+        self._by_priority: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self._by_route: Dict[str, int] = {}
+        # Longest first, so the first match is the most specific
+        self._priority_prefixes = sorted(settings.ROUTE_PRIORITIES, key=len, reverse=True)
+        self._concurrency_prefixes = sorted(settings.ROUTE_CONCURRENCY, key=len, reverse=True)
+
+    def classify(self, path: str) -> Tuple[str, str]:
+        """(priority, route label) for a request path"""
+        prefix = _longest_prefix(path, self._priority_prefixes)
+        if prefix is None:
+            return "standard", _longest_prefix(path, self._concurrency_prefixes) or "other"
+        return settings.ROUTE_PRIORITIES[prefix], prefix
+
+    @staticmethod
+    def client_key(scope: Dict[str, Any]) -> str:
+        """
+        Allow-listed API key if sent, else the client IP (first X-Forwarded-For hop when trusted)
+
+        The key header is unauthenticated, so only keys in RATE_LIMIT_API_KEYS
+        get a bucket of their own: anything else would let a client mint a
+        fresh bucket per request.
+        """
+        header = settings.RATE_LIMIT_KEY_HEADER.lower().encode("latin-1")
+        api_key: Optional[str] = None
+        forwarded: Optional[bytes] = None
+        for name, value in scope.get("headers", []):
+            if name == header and value:
+                api_key = value.decode("latin-1")
+            elif name == b"x-forwarded-for":
+                forwarded = value
+        if api_key is not None and api_key in settings.RATE_LIMIT_API_KEYS:
+            return "key:" + api_key
+        if forwarded and settings.RATE_LIMIT_TRUST_FORWARDED:
+            return "ip:" + forwarded.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    def _admit(self, scope: Dict[str, Any], priority: str, concurrency_route: Optional[str]) -> Optional[Tuple[int, str, float]]:
+        """None if admitted, else (status, reason, retry after seconds)"""
+        if self.in_flight >= settings.SHED_THRESHOLDS[priority]:
+            return 503, "shed", 1.0
+        if concurrency_route is not None and self._by_route.get(concurrency_route, 0) >= settings.ROUTE_CONCURRENCY[concurrency_route]:
+            return 503, "concurrency", 1.0
+        wait = self.limiter.acquire(self.client_key(scope), settings.REQUEST_COSTS[priority])
+        metrics.rate_limit_clients.set(len(self.limiter))
+        if wait > 0:
+            return 429, "rate_limited", wait
+        return None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        path = scope.get("path", "")
+        if (
+            not self.enabled or scope["type"] != "http" or scope.get("method") == "OPTIONS"
+            or path in settings.ADMISSION_EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        priority, route = self.classify(path)
+        concurrency_route = _longest_prefix(path, self._concurrency_prefixes)
+        # No await between the checks and the increments: the event loop can't interleave them
+        rejected = self._admit(scope, priority, concurrency_route)
+        if rejected is not None:
+            status, reason, retry_after = rejected
+            metrics.admission_rejections.inc(route=route, reason=reason)
+            detail = "Rate limit exceeded" if status == 429 else "Server busy, retry shortly"
+            response = JSONResponse({"detail": detail}, status_code=status, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        self._by_priority[priority] += 1
+        if concurrency_route is not None:
+            self._by_route[concurrency_route] = self._by_route.get(concurrency_route, 0) + 1
+        metrics.requests_in_flight.set(self._by_priority[priority], priority=priority)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            self._by_priority[priority] -= 1
+            if concurrency_route is not None:
+                self._by_route[concurrency_route] -= 1
+            metrics.requests_in_flight.set(self._by_priority[priority], priority=priority)
@@ -0,0 +1,6 @@
+"""
+Benchmarks - Offline Performance Suite
+Fetch-cycle timing and read-endpoint load tests against local stand-ins for
+Yahoo Finance and TEFAS, producing JSON reports that can be compared
+between runs (python -m benchmarks --help).
+"""
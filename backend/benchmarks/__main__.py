@@ -0,0 +1,221 @@
+"""
+Benchmark CLI (run from the backend directory)
+
+    python -m benchmarks run --label baseline --out benchmarks/reports/baseline.json
+    python -m benchmarks compare benchmarks/reports/baseline.json benchmarks/reports/new.json
+    python -m benchmarks record --out benchmarks/payloads.json   # needs network
+    python -m benchmarks replay --symbols 10000 --speed 1440 --seconds 60 --backend file
+    python -m benchmarks startup --out benchmarks/reports/startup.json
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from typing import Dict, Any, List
+
+# Keep benchmark runs away from the real data files (must precede app imports)
+os.environ.setdefault("ALGORIST_CACHE_BACKEND", "memory")
+
+
+def _run(args: argparse.Namespace) -> int:
+    from benchmarks import scenarios
+    from benchmarks.fake_yahoo import FakeYahooServer, synthetic_payloads, load_payloads
+    from benchmarks.fake_tefas import FakeCrawler
+    from benchmarks.report import build_meta, write_report
+    from config import settings
+    import main  # noqa: F401  (configures logging, so quiet it afterwards)
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    symbols = settings.BIST100_SYMBOLS + settings.FOREX_SYMBOLS + settings.COMMODITY_SYMBOLS
+    payloads = load_payloads(args.payloads) if args.payloads else synthetic_payloads(symbols)
+    server = FakeYahooServer(
+        payloads,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate
+    ).start()
+    crawler = FakeCrawler(latency_ms=args.tefas_latency_ms, error_rate=args.error_rate)
+
+    options = {key: value for key, value in vars(args).items() if key not in ("handler", "command")}
+    report: Dict[str, Any] = {"meta": build_meta(args.label, options), "settings": scenarios.bench_settings()}
+    try:
+        with scenarios.offline_services(server, crawler, args.throttle_scale):
+            # The load scenarios need a warm cache either way
+            cycle = scenarios.run_fetch_cycle()
+            if not args.skip_fetch:
+                report["fetch_cycle"] = cycle
+                report["fake_yahoo"] = dict(server.stats)
+                print(f"⏱️  Fetch cycle: {cycle['total_seconds']:.2f}s "
+                      f"({cycle['stocks_cached']} stocks, {cycle['mock_fallbacks']:.0f} mock fallbacks)")
+    finally:
+        server.stop()
+
+    if not args.skip_load:
+        report["load"] = {}
+        for clients in args.clients:
+            result = scenarios.run_load(clients, args.requests_per_client, args.url, args.accept_encoding)
+            report["load"][str(clients)] = result
+            latency = result["latency_ms"]
+            print(f"🚦 {clients:>6} clients: {result['rps']} req/s, "
+                  f"p50 {latency['p50']}ms, p99 {latency['p99']}ms, errors {result['errors']}, "
+                  f"rejected {result['rejected']}, "
+                  f"{result['wire_kb_per_response']} KB/response on the wire")
+
+    report["memory"] = {"max_rss_mb": scenarios.max_rss_mb()}
+    write_report(report, args.out)
+    print(f"📄 Report written to {args.out}")
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    from benchmarks.report import load_report, compare_reports, format_comparison
+
+    rows, regressions = compare_reports(load_report(args.baseline), load_report(args.candidate), args.threshold)
+    print(format_comparison(rows))
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\n✅ No regressions above {args.threshold:.0%}")
+    return 0
+
+
+def _record(args: argparse.Namespace) -> int:
+    from benchmarks.fake_yahoo import record_payloads
+    from config import settings
+
+    count = record_payloads(settings.BIST100_SYMBOLS + settings.FOREX_SYMBOLS + settings.COMMODITY_SYMBOLS, args.out)
+    print(f"📼 Recorded {count} payloads to {args.out}")
+    return 0
+
+
+def _replay(args: argparse.Namespace) -> int:
+    # Persist into a throwaway directory so the soak measures real writes
+    # without touching data/ (must precede app imports)
+    os.environ["ALGORIST_CACHE_BACKEND"] = args.backend
+    os.environ.setdefault("ALGORIST_DATA_DIR", tempfile.mkdtemp(prefix="algorist-replay-"))
+
+    from benchmarks import scenarios
+    from benchmarks.report import build_meta, write_report
+    from services.replay_service import ReplayEngine
+    import main  # noqa: F401
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+        # Skipped runs are counted in the report instead
+        logging.getLogger("apscheduler").setLevel(logging.ERROR)
+
+    engine = ReplayEngine(
+        source=args.source, speed=args.speed, symbol_count=args.symbols, fund_count=args.funds, seed=args.seed
+    )
+    options = {key: value for key, value in vars(args).items() if key not in ("handler", "command")}
+    report: Dict[str, Any] = {"meta": build_meta(args.label, options), "settings": scenarios.bench_settings()}
+    report["settings"]["data_dir"] = os.environ["ALGORIST_DATA_DIR"]
+    report["replay"] = result = scenarios.run_replay_soak(engine, args.seconds, args.clients, args.requests_per_client)
+    report["memory"] = {"max_rss_mb": result["memory"]["max_rss_mb"]}
+
+    amplification = result["write_amplification"]
+    memory = result["memory"]
+    print(f"🎬 {result['simulated_hours']}h simulated in {result['seconds']}s: "
+          f"{result['emitted']['records']} records emitted, {result['writes_per_second']} cache writes/s, "
+          f"{result['skipped_job_runs']} skipped job runs")
+    print(f"💾 Write amplification: {amplification['records']}x records, {amplification['bytes']}x bytes")
+    print(f"🧠 RSS {memory['start_rss_mb']} -> {memory['end_rss_mb']} MB (growth {memory['growth_mb']} MB)")
+    write_report(report, args.out)
+    print(f"📄 Report written to {args.out}")
+    return 0
+
+
+def _startup(args: argparse.Namespace) -> int:
+    from benchmarks import startup
+    from benchmarks.report import build_meta, write_report
+
+    options = {key: value for key, value in vars(args).items() if key not in ("handler", "command")}
+    report: Dict[str, Any] = {"meta": build_meta(args.label, options)}
+    report["imports"] = imports = startup.profile_imports(top=args.top)
+    report["startup"] = first = startup.time_to_first_request(replay=not args.live, timeout=args.timeout)
+
+    print(f"📦 import main: {imports['seconds']}s ({imports['modules']} modules)")
+    for module in imports["top"]:
+        print(f"   {module['cumulative_ms']:>9.1f} ms  {module['module']}")
+    loaded = [name for name, deferred in imports["deferred"].items() if not deferred]
+    if loaded:
+        print(f"⚠️  Loaded at import time: {', '.join(loaded)}")
+    print(f"🚀 First request after {first['first_request_seconds']}s, first data after {first['first_data_seconds']}s ({first['source']})")
+    write_report(report, args.out)
+    print(f"📄 Report written to {args.out}")
+    return 0
+
+
+def _int_list(raw: str) -> List[int]:
+    return [int(part) for part in raw.split(",") if part.strip()]
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Algorist offline benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the fetch cycle and load scenarios")
+    run.add_argument("--label", default=None, help="Name stored in the report")
+    run.add_argument("--out", default="benchmarks/reports/latest.json")
+    run.add_argument("--clients", type=_int_list, default=[100, 1000, 10000], help="Comma-separated client counts")
+    run.add_argument("--requests-per-client", type=int, default=5)
+    run.add_argument("--url", default=None, help="Load a running server instead of the in-process app")
+    run.add_argument("--accept-encoding", default=None,
+                     help='Accept-Encoding sent by the load clients (default: httpx\'s; "identity" = uncompressed)')
+    run.add_argument("--payloads", default=None, help="Recorded ticker.price payloads (default: synthetic)")
+    run.add_argument("--latency-ms", type=float, default=50.0, help="Fake Yahoo latency per request")
+    run.add_argument("--jitter-ms", type=float, default=20.0)
+    run.add_argument("--error-rate", type=float, default=0.0, help="Share of Yahoo/TEFAS requests that fail")
+    run.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of Yahoo requests answered with 429")
+    run.add_argument("--tefas-latency-ms", type=float, default=30.0)
+    run.add_argument("--throttle-scale", type=float, default=0.0,
+                     help="Scale the 10-15s Ghost Mode throttle (0 = off, 1 = production)")
+    run.add_argument("--skip-fetch", action="store_true", help="Leave fetch-cycle timing out of the report")
+    run.add_argument("--skip-load", action="store_true")
+    run.add_argument("--verbose", action="store_true", help="Keep the service's INFO logging")
+    run.set_defaults(handler=_run)
+
+    compare = commands.add_parser("compare", help="Compare two reports and fail on regressions")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.add_argument("--threshold", type=float, default=0.10, help="Allowed relative increase (0.10 = 10%%)")
+    compare.set_defaults(handler=_compare)
+
+    record = commands.add_parser("record", help="Record real ticker.price payloads for replay")
+    record.add_argument("--out", default="benchmarks/payloads.json")
+    record.set_defaults(handler=_record)
+
+    replay = commands.add_parser("replay", help="Soak the scheduler, cache and API with replayed market data")
+    replay.add_argument("--label", default=None, help="Name stored in the report")
+    replay.add_argument("--out", default="benchmarks/reports/replay.json")
+    replay.add_argument("--source", default="synthetic", help='"synthetic" or a JSONL tick file')
+    replay.add_argument("--symbols", type=int, default=10000, help="Synthetic stock universe size")
+    replay.add_argument("--funds", type=int, default=500, help="Synthetic fund universe size")
+    replay.add_argument("--speed", type=float, default=1440.0, help="Simulated seconds per wall-clock second")
+    replay.add_argument("--seconds", type=float, default=60.0, help="Wall-clock soak duration")
+    replay.add_argument("--backend", choices=["file", "log", "memory", "redis"], default="file",
+                        help="Cache persistence backend under test")
+    replay.add_argument("--clients", type=int, default=0, help="Concurrent readers during the soak (0 = none)")
+    replay.add_argument("--requests-per-client", type=int, default=5)
+    replay.add_argument("--seed", type=int, default=42)
+    replay.add_argument("--verbose", action="store_true", help="Keep the service's INFO logging")
+    replay.set_defaults(handler=_replay)
+
+    startup = commands.add_parser("startup", help="Profile cold start: import time per module and time to first request")
+    startup.add_argument("--label", default=None, help="Name stored in the report")
+    startup.add_argument("--out", default="benchmarks/reports/startup.json")
+    startup.add_argument("--top", type=int, default=15, help="Heaviest imports to list")
+    startup.add_argument("--live", action="store_true", help="Start against live Yahoo / TEFAS instead of synthetic replay")
+    startup.add_argument("--timeout", type=float, default=60.0, help="Give up waiting for the server after this many seconds")
+    startup.set_defaults(handler=_startup)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
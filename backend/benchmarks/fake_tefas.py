@@ -0,0 +1,112 @@
+"""
+Fake TEFAS Crawler
+Offline stand-in for tefas.Crawler returning synthetic daily fund prices
+"""
+import random
+import time
+import zlib
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional, Union
+import pandas as pd
+
+# Column set returned by tefas.Crawler.fetch
+TEFAS_COLUMNS = ["date", "code", "title", "price", "market_cap", "number_of_shares", "number_of_investors"]
+
+
+def synthetic_funds(count: int = 500, seed: int = 7) -> Dict[str, Dict[str, Any]]:
+    """Fund code -> title/base price (the 13 popular funds are always included)"""
+    rnd = random.Random(seed)
+    codes = ["TCD", "MAC", "GAH", "GEF", "AHL", "AKE", "AYT", "TFF", "YAT", "IPM", "HVT", "IVG", "HSY"]
+    letters = "ABCDEFGHIJKLMNOPRSTUVYZ"
+    while len(codes) < count:
+        code = "".join(rnd.choice(letters) for _ in range(3))
+        if code not in codes:
+            codes.append(code)
+    return {
+        code: {"title": f"{code} FON", "price": rnd.uniform(0.5, 50.0), "market_cap": rnd.uniform(1e7, 5e10)}
+        for code in codes
+    }
+
+
+class FakeCrawler:
+    """
+    tefas.Crawler replacement: fetch(start, end, name, columns, kind) and the
+    fund listing request (_do_post on list_endpoint)
+
+    Each call sleeps `latency_ms` and fails with probability `error_rate`.
+    Besides real column names, `columns` may contain fund codes, in which case
+    the frame gets one price column per code (the way TefasService asks).
+    """
+
+    list_endpoint = "/api/funds/fonGetiriBazliBilgiGetir"
+
+    def __init__(
+        self,
+        funds: Optional[Dict[str, Dict[str, Any]]] = None,
+        latency_ms: float = 30.0,
+        error_rate: float = 0.0,
+        seed: int = 7
+    ):
+        self.funds = funds or synthetic_funds()
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def _request(self) -> None:
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000.0)
+        if self._random.random() < self.error_rate:
+            raise ConnectionError("TEFAS request failed (injected)")
+
+    def _do_post(self, endpoint: str, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fund listing rows (every fund, whatever the kind)"""
+        if endpoint != self.list_endpoint:
+            raise ValueError(f"FakeCrawler only serves the fund listing, not {endpoint}")
+        self._request()
+        return [{"fonKodu": code, "fonUnvan": fund["title"]} for code, fund in self.funds.items()]
+
+    def _day_price(self, code: str, day: date) -> float:
+        base = self.funds[code]["price"]
+        # Deterministic per-day offset so repeated calls agree on a price
+        bump = zlib.crc32(f"{code}:{day.toordinal()}".encode()) % 2001 - 1000
+        return round(base * (1 + bump / 100000), 6)
+
+    def fetch(
+        self,
+        start: Union[str, date],
+        end: Optional[Union[str, date]] = None,
+        name: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        kind: str = "YAT"
+    ) -> pd.DataFrame:
+        self._request()
+
+        start_day = date.fromisoformat(start) if isinstance(start, str) else start
+        end_day = date.fromisoformat(end) if isinstance(end, str) else (end or date.today())
+        days = [start_day + timedelta(days=i) for i in range((end_day - start_day).days + 1)]
+        days = [d for d in days if d.weekday() < 5] or [end_day]
+
+        requested = columns or TEFAS_COLUMNS
+        code_columns = [c for c in requested if c in self.funds]
+        if code_columns:
+            return pd.DataFrame(
+                {"date": days, **{code: [self._day_price(code, d) for d in days] for code in code_columns}}
+            )
+
+        codes = [name] if name else list(self.funds)
+        rows = [
+            {
+                "date": d,
+                "code": code,
+                "title": self.funds[code]["title"],
+                "price": self._day_price(code, d),
+                "market_cap": self.funds[code]["market_cap"],
+                "number_of_shares": self.funds[code]["market_cap"] / self._day_price(code, d),
+                "number_of_investors": 1000,
+            }
+            for code in codes if code in self.funds
+            for d in days
+        ]
+        frame = pd.DataFrame(rows, columns=TEFAS_COLUMNS)
+        return frame[[c for c in requested if c in TEFAS_COLUMNS]]
@@ -0,0 +1,174 @@
+"""
+Fake Yahoo Quote Server
+Local HTTP stand-in for the `ticker.price` module with latency, error and
+429 injection, plus a drop-in replacement for yahooquery's Ticker.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Union
+from urllib.parse import urlparse, parse_qs
+import requests
+
+# symbol -> price module payload (as returned by yahooquery's Ticker.price)
+Payloads = Dict[str, Dict[str, Any]]
+
+
+def synthetic_payloads(symbols: List[str], seed: int = 42) -> Payloads:
+    """Price-module payloads with plausible BIST / FX / commodity values"""
+    rnd = random.Random(seed)
+    payloads: Payloads = {}
+    for symbol in symbols:
+        previous = rnd.uniform(5, 400) if symbol.endswith(".IS") else rnd.uniform(1, 3000)
+        price = previous * rnd.uniform(0.95, 1.05)
+        payloads[symbol] = {
+            "symbol": symbol,
+            "longName": symbol.split(".")[0].replace("=X", "").replace("=F", ""),
+            "regularMarketPrice": round(price, 4),
+            "regularMarketPreviousClose": round(previous, 4),
+            "regularMarketVolume": rnd.randint(100_000, 80_000_000),
+            "marketCap": rnd.uniform(1e9, 8e11) if symbol.endswith(".IS") else None,
+        }
+    return payloads
+
+
+def load_payloads(path: str) -> Payloads:
+    """Read recorded payloads (see record_payloads)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def record_payloads(symbols: List[str], path: str) -> int:
+    """Save real Ticker.price responses for later replay (needs network access)"""
+    from yahooquery import Ticker
+
+    recorded: Payloads = {}
+    for i in range(0, len(symbols), 5):
+        chunk = symbols[i:i + 5]
+        data: Any = Ticker(chunk).price
+        if isinstance(data, dict):
+            recorded.update({s: v for s, v in data.items() if isinstance(v, dict)})
+        time.sleep(2)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(recorded, f, indent=2)
+    return len(recorded)
+
+
+class FakeYahooServer:
+    """
+    Threaded HTTP server answering GET /price?symbols=A,B with recorded payloads
+
+    Faults are drawn per request: `rate_limit_rate` of requests get a 429,
+    `error_rate` get a 500, the rest wait `latency_ms` (+/- `jitter_ms`).
+    Prices drift a little on every request so repeated cycles change values.
+    """
+
+    def __init__(
+        self,
+        payloads: Payloads,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 20.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 42
+    ):
+        self.payloads = payloads
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None, "server not started"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self) -> Union[int, float]:
+        """Return an HTTP error status, or the delay in seconds for a success"""
+        with self._lock:
+            self.stats["requests"] += 1
+            roll = self._random.random()
+            if roll < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return 500
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            return max(delay, 0.0) / 1000.0
+
+    def _quote(self, symbol: str) -> Any:
+        payload = self.payloads.get(symbol)
+        if payload is None:
+            return f"Quote not found for ticker symbol: {symbol}"
+        quote = dict(payload)
+        with self._lock:
+            drift = self._random.uniform(0.99, 1.01)
+        quote["regularMarketPrice"] = round(quote["regularMarketPrice"] * drift, 4)
+        return quote
+
+    def start(self) -> "FakeYahooServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                symbols = [s for s in query.get("symbols", [""])[0].split(",") if s]
+                outcome = fake._draw()
+                if outcome in (429, 500):
+                    self.send_response(int(outcome))
+                    self.end_headers()
+                    return
+                time.sleep(outcome)
+                body = json.dumps({s: fake._quote(s) for s in symbols}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass  # Keep benchmark output clean
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-yahoo", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def ticker_factory(base_url: str, timeout: float = 10.0) -> Any:
+    """
+    Build a Ticker replacement that reads `.price` from a FakeYahooServer
+
+    A 429 raises like yahooquery does on rate limiting; a 500 yields per-symbol
+    error strings, which the service skips symbol by symbol.
+    """
+    session = requests.Session()
+
+    class FakeTicker:
+        def __init__(self, symbols: Union[str, List[str]], **kwargs: Any):
+            self.symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+
+        @property
+        def price(self) -> Dict[str, Any]:
+            response = session.get(f"{base_url}/price", params={"symbols": ",".join(self.symbols)}, timeout=timeout)
+            if response.status_code == 429:
+                raise Exception("429 Client Error: Too Many Requests")
+            if response.status_code >= 500:
+                return {s: f"Server error {response.status_code}" for s in self.symbols}
+            return response.json()
+
+    return FakeTicker
@@ -0,0 +1,112 @@
+"""
+Benchmark Reports
+JSON report writing and run-to-run comparison with regression thresholds
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, Any, List, Tuple, Optional
+
+# (label, path into the report); lower is better for all of them
+TRACKED_METRICS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("fetch cycle seconds", ("fetch_cycle", "total_seconds")),
+    ("fetch cycle peak traced MB", ("fetch_cycle", "peak_traced_mb")),
+    ("max RSS MB", ("memory", "max_rss_mb")),
+    ("import seconds", ("imports", "seconds")),
+    ("time to first request seconds", ("startup", "first_request_seconds")),
+    ("time to first data seconds", ("startup", "first_data_seconds")),
+]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_meta(label: Optional[str], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Context needed to decide whether two reports are comparable"""
+    return {
+        "label": label,
+        "created_at": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": options,
+    }
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _lookup(report: Dict[str, Any], path: Tuple[str, ...]) -> Optional[float]:
+    node: Any = report
+    for key in path:
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return float(node) if isinstance(node, (int, float)) else None
+
+
+def _tracked(report: Dict[str, Any]) -> List[Tuple[str, Tuple[str, ...]]]:
+    tracked = list(TRACKED_METRICS)
+    for clients in sorted(report.get("load", {}), key=int):
+        tracked.append((f"p99 ms @ {clients} clients", ("load", clients, "latency_ms", "p99")))
+        tracked.append((f"wire KB/response @ {clients} clients", ("load", clients, "wire_kb_per_response")))
+    return tracked
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    candidate: Dict[str, Any],
+    threshold: float = 0.10
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Compare tracked metrics between two reports
+
+    Args:
+        threshold: Allowed relative increase before a metric counts as a regression
+
+    Returns:
+        (rows for display, labels of regressed metrics)
+    """
+    rows: List[Dict[str, Any]] = []
+    regressions: List[str] = []
+    for label, path in _tracked(candidate):
+        base = _lookup(baseline, path)
+        new = _lookup(candidate, path)
+        if base is None or new is None:
+            continue
+        change = (new - base) / base if base else 0.0
+        regressed = change > threshold
+        rows.append({"metric": label, "baseline": base, "candidate": new, "change": change, "regressed": regressed})
+        if regressed:
+            regressions.append(label)
+    return rows, regressions
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'metric':<32} {'baseline':>12} {'candidate':>12} {'change':>9}"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        lines.append(
+            f"{row['metric']:<32} {row['baseline']:>12.3f} {row['candidate']:>12.3f} {row['change']:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
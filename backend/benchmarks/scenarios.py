@@ -0,0 +1,360 @@
+"""
+Benchmark Scenarios
+End-to-end fetch-cycle timing and concurrent load against the read endpoints
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, List, Tuple, Optional, Iterator
+import numpy as np
+import httpx
+
+import metrics
+from config import settings
+from scheduler import data_scheduler
+from services import yahoo_service as yahoo_module
+from services.tefas_service import tefas_service
+from benchmarks.fake_yahoo import FakeYahooServer, ticker_factory
+from benchmarks.fake_tefas import FakeCrawler
+
+# Read endpoints hit by the load scenarios, in round-robin order
+READ_ENDPOINTS: List[Tuple[str, Dict[str, Any]]] = [
+    ("/api/market-data", {}),
+    ("/api/stocks", {}),
+    ("/api/movers", {"by": "change_percent", "n": 10}),
+    ("/api/screener", {"filter": "change_percent>0", "sort": "volume", "limit": 20}),
+    ("/api/market-summary", {}),
+    ("/api/funds", {}),
+    ("/api/forex", {}),
+]
+
+
+def max_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size (Linux only; None elsewhere)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+def latency_summary(samples_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples_ms, dtype=np.float64)
+    if not values.size:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        "p50": round(float(p50), 3),
+        "p90": round(float(p90), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(values.max()), 3),
+        "mean": round(float(values.mean()), 3),
+    }
+
+
+@contextmanager
+def offline_services(server: FakeYahooServer, crawler: FakeCrawler, throttle_scale: float = 0.0) -> Iterator[None]:
+    """
+    Point yahoo_service and tefas_service at the local stand-ins
+
+    The Ghost Mode throttle keeps its random range but is scaled by
+    `throttle_scale` (0 disables it, 1 is production pacing).
+    """
+    service = yahoo_module.yahoo_service
+    original_ticker = yahoo_module.Ticker
+    original_throttle = service._aggressive_throttle
+    original_crawler = tefas_service.crawler
+
+    def scaled_throttle(min_delay: float = 10.0, max_delay: float = 15.0):
+        if throttle_scale > 0:
+            original_throttle(min_delay * throttle_scale, max_delay * throttle_scale)
+
+    yahoo_module.Ticker = ticker_factory(server.url)
+    service._aggressive_throttle = scaled_throttle  # type: ignore[method-assign]
+    tefas_service.crawler = crawler  # type: ignore[assignment]
+    # Start every run from healthy breakers
+    service.reset_breakers()
+    try:
+        yield
+    finally:
+        yahoo_module.Ticker = original_ticker
+        service._aggressive_throttle = original_throttle  # type: ignore[method-assign]
+        tefas_service.crawler = original_crawler
+
+
+def run_fetch_cycle() -> Dict[str, Any]:
+    """
+    Run every scheduled group once, back to back, and time it
+
+    Returns per-group wall time, the total, and what happened along the way
+    (mock fallbacks, throttle sleep, peak traced allocations).
+    """
+    jobs = [
+        ("Stock Group 1 + Forex + Commodities", data_scheduler.fetch_stock_group_1),
+        ("Stock Group 2", data_scheduler.fetch_stock_group_2),
+        ("Stock Group 3", data_scheduler.fetch_stock_group_3),
+        ("Stock Group 4", data_scheduler.fetch_stock_group_4),
+        ("Stock Group 5", data_scheduler.fetch_stock_group_5),
+        ("Group B", data_scheduler.fetch_group_b_data),
+    ]
+    mock_before = sum(metrics.mock_fallbacks.value(asset=a) for a in ("stocks", "forex", "commodities"))
+    throttle_before = metrics.throttle_sleep_seconds.value()
+
+    groups: Dict[str, float] = {}
+    tracemalloc.start()
+    started = time.perf_counter()
+    for name, job in jobs:
+        job_started = time.perf_counter()
+        job()
+        groups[name] = round(time.perf_counter() - job_started, 4)
+    total = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    from cache.cache_manager import cache
+    return {
+        "total_seconds": round(total, 4),
+        "groups": groups,
+        "stocks_cached": len(cache.get_stocks()),
+        "funds_cached": len(cache.get_funds()),
+        "mock_fallbacks": sum(metrics.mock_fallbacks.value(asset=a) for a in ("stocks", "forex", "commodities")) - mock_before,
+        "throttle_sleep_seconds": round(metrics.throttle_sleep_seconds.value() - throttle_before, 3),
+        "peak_traced_mb": round(peak / (1024 * 1024), 2),
+    }
+
+
+def client_api_key(offset: int) -> str:
+    return f"benchmark-{offset}"
+
+
+async def _client(
+    http: httpx.AsyncClient,
+    requests_per_client: int,
+    offset: int,
+    samples: Dict[str, List[float]],
+    sizes: Dict[str, List[Tuple[int, int]]],
+    errors: List[int],
+    rejected: List[int]
+) -> None:
+    # Each simulated client has its own rate limit bucket (its key is allow-listed in-process)
+    headers = {settings.RATE_LIMIT_KEY_HEADER: client_api_key(offset)}
+    for i in range(requests_per_client):
+        path, params = READ_ENDPOINTS[(offset + i) % len(READ_ENDPOINTS)]
+        started = time.perf_counter()
+        try:
+            response = await http.get(path, params=params, headers=headers)
+            if response.status_code in (429, 503):
+                rejected[0] += 1
+            elif response.status_code >= 400:
+                errors[0] += 1
+            sizes[path].append((response.num_bytes_downloaded, len(response.content)))
+        except httpx.HTTPError:
+            errors[0] += 1
+        samples[path].append((time.perf_counter() - started) * 1000)
+
+
+def _size_summary(sizes: List[Tuple[int, int]]) -> Dict[str, Any]:
+    """Mean bytes on the wire vs decoded, per response"""
+    if not sizes:
+        return {"wire_kb": None, "content_kb": None, "ratio": None}
+    wire = sum(w for w, _ in sizes) / len(sizes)
+    content = sum(c for _, c in sizes) / len(sizes)
+    return {
+        "wire_kb": round(wire / 1024, 2),
+        "content_kb": round(content / 1024, 2),
+        "ratio": round(content / wire, 2) if wire else None,
+    }
+
+
+async def _run_load(
+    clients: int,
+    requests_per_client: int,
+    url: Optional[str],
+    accept_encoding: Optional[str] = None
+) -> Dict[str, Any]:
+    allowed_keys = settings.RATE_LIMIT_API_KEYS
+    if url is None:
+        from main import app
+        transport: Optional[httpx.AsyncBaseTransport] = httpx.ASGITransport(app=app)
+        base_url = "http://benchmark"
+        # Every in-process client shares one address: give each simulated client its own key
+        settings.RATE_LIMIT_API_KEYS = allowed_keys | {client_api_key(offset) for offset in range(clients)}
+    else:
+        # A remote server only honours these keys if its ALGORIST_RATE_LIMIT_API_KEYS lists them
+        transport = None
+        base_url = url
+
+    samples: Dict[str, List[float]] = {path: [] for path, _ in READ_ENDPOINTS}
+    sizes: Dict[str, List[Tuple[int, int]]] = {path: [] for path, _ in READ_ENDPOINTS}
+    errors = [0]
+    rejected = [0]
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding is not None else None
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, limits=limits, timeout=60.0, headers=headers
+        ) as http:
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                _client(http, requests_per_client, offset, samples, sizes, errors, rejected) for offset in range(clients)
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        settings.RATE_LIMIT_API_KEYS = allowed_keys
+
+    all_samples = [ms for values in samples.values() for ms in values]
+    return {
+        "clients": clients,
+        "requests": len(all_samples),
+        "errors": errors[0],
+        "rejected": rejected[0],  # Rate limited or shed by admission control
+        "seconds": round(elapsed, 3),
+        "rps": round(len(all_samples) / elapsed, 1) if elapsed else None,
+        "latency_ms": latency_summary(all_samples),
+        "by_endpoint": {path: latency_summary(values) for path, values in samples.items()},
+        "wire_kb_per_response": _size_summary([size for values in sizes.values() for size in values])["wire_kb"],
+        "bytes_by_endpoint": {path: _size_summary(values) for path, values in sizes.items()},
+    }
+
+
+def run_load(
+    clients: int,
+    requests_per_client: int = 5,
+    url: Optional[str] = None,
+    accept_encoding: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    `clients` concurrent clients each issuing `requests_per_client` reads
+
+    Runs in-process through the ASGI app by default (no sockets, so it
+    measures the app itself); pass `url` to load a running server instead.
+    `accept_encoding` overrides the client's Accept-Encoding (e.g. "identity"
+    to measure without compression); wire vs decoded sizes are reported.
+    """
+    return asyncio.run(_run_load(clients, requests_per_client, url, accept_encoding))
+
+
+def _write_counters() -> Dict[str, float]:
+    return {
+        "cache_writes": metrics.cache_writes.total(),
+        "records_changed": metrics.cache_records_changed.total(),
+        "persisted_records": metrics.cache_persisted_records.total(),
+        "persisted_bytes": metrics.cache_persisted_bytes.total(),
+    }
+
+
+def run_replay_soak(
+    engine: Any,
+    seconds: float,
+    clients: int = 0,
+    requests_per_client: int = 5,
+    sample_every: float = 1.0
+) -> Dict[str, Any]:
+    """
+    Drive the real scheduler from a replay engine for `seconds` of wall time
+
+    Job intervals are compressed by the engine's speed, so a 60s run at
+    1440x covers a simulated day of fetch cycles. With `clients` > 0, read
+    load runs against the app for the whole soak. Reports write
+    amplification (bytes the cache persisted per byte the source produced),
+    write rate and memory over time.
+    """
+    from apscheduler.events import EVENT_JOB_MAX_INSTANCES
+
+    data_scheduler.use_replay(engine, engine.clock.speed)
+    # A skipped run means the previous one was still busy: the pipeline is saturated
+    skipped = [0]
+    data_scheduler.scheduler.add_listener(lambda event: skipped.__setitem__(0, skipped[0] + 1), EVENT_JOB_MAX_INSTANCES)
+    before = _write_counters()
+    emitted_before = dict(engine.stats)
+    samples: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    done = threading.Event()
+
+    def sample() -> None:
+        from cache.cache_manager import cache
+        while not done.is_set():
+            samples.append({
+                "t": round(time.perf_counter() - started, 2),
+                "rss_mb": current_rss_mb(),
+                "stocks": len(cache.get_stocks()),
+                "version": cache.get_version(),
+                **{key: value - before[key] for key, value in _write_counters().items()},
+            })
+            done.wait(sample_every)
+
+    data_scheduler.start()
+    sampler = threading.Thread(target=sample, name="replay-sampler", daemon=True)
+    sampler.start()
+    loads: List[Dict[str, Any]] = []
+    try:
+        while time.perf_counter() - started < seconds:
+            if clients:
+                loads.append(run_load(clients, requests_per_client))
+            else:
+                time.sleep(min(sample_every, seconds))
+    finally:
+        data_scheduler.shutdown()
+        done.set()
+        sampler.join()
+    elapsed = time.perf_counter() - started
+
+    writes = {key: value - before[key] for key, value in _write_counters().items()}
+    emitted = {key: engine.stats[key] - emitted_before[key] for key in engine.stats}
+    rss = [s["rss_mb"] for s in samples if s["rss_mb"] is not None]
+    result: Dict[str, Any] = {
+        "seconds": round(elapsed, 2),
+        "simulated_hours": round(elapsed * engine.clock.speed / 3600, 2),
+        "emitted": emitted,
+        "writes": writes,
+        "writes_per_second": round(writes["cache_writes"] / elapsed, 2) if elapsed else None,
+        "skipped_job_runs": skipped[0],
+        "write_amplification": {
+            "records": round(writes["persisted_records"] / emitted["records"], 2) if emitted["records"] else None,
+            # None for backends that don't report bytes written (memory)
+            "bytes": (
+                round(writes["persisted_bytes"] / emitted["bytes"], 2)
+                if emitted["bytes"] and writes["persisted_bytes"] else None
+            ),
+        },
+        "memory": {
+            "start_rss_mb": rss[0] if rss else None,
+            "end_rss_mb": rss[-1] if rss else None,
+            "growth_mb": round(rss[-1] - rss[0], 1) if rss else None,
+            "max_rss_mb": max_rss_mb(),
+        },
+        "samples": samples,
+    }
+    if loads:
+        result["load"] = {
+            "rounds": len(loads),
+            "requests": sum(load["requests"] for load in loads),
+            "errors": sum(load["errors"] for load in loads),
+            "p99_ms": max(load["latency_ms"]["p99"] for load in loads),
+        }
+    return result
+
+
+def bench_settings() -> Dict[str, Any]:
+    """Settings that change what the numbers mean"""
+    return {
+        "cache_backend": settings.CACHE_BACKEND,
+        "symbols": len(settings.BIST100_SYMBOLS),
+        "high_freq_interval_minutes": settings.HIGH_FREQ_INTERVAL_MINUTES,
+    }
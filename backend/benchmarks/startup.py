@@ -0,0 +1,134 @@
+"""
+Startup Profile
+Cold-start cost of the service: per-module import time (python -X importtime)
+and time to first request / first data for a freshly spawned server
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that should stay out of the import path (loaded on first fetch)
+DEFERRED_MODULES = ("yahooquery", "pandas", "tefas", "requests", "apscheduler", "uvicorn")
+
+
+def _env(**overrides: str) -> Dict[str, str]:
+    """Environment for a child process that never touches data/"""
+    env = dict(os.environ)
+    env.setdefault("ALGORIST_CACHE_BACKEND", "memory")
+    env.setdefault("ALGORIST_DATA_DIR", tempfile.mkdtemp(prefix="algorist-startup-"))
+    env.update(overrides)
+    return env
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Parse `-X importtime` stderr lines ("import time: self | cumulative | name")
+
+    Returns:
+        [{"module", "self_ms", "cumulative_ms", "depth"}] in import order
+    """
+    modules: List[Dict[str, Any]] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append({
+            "module": name.strip(),
+            "self_ms": round(int(self_us) / 1000, 2),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 2),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2  # One space after "|", then two per level
+        })
+    return modules
+
+
+def profile_imports(module: str = "main", top: int = 15) -> Dict[str, Any]:
+    """
+    Import `module` in a fresh interpreter and break the time down per module
+
+    Returns:
+        {"seconds", "top": heaviest direct imports, "deferred": which DEFERRED_MODULES got loaded}
+    """
+    probe = f"import sys, {module}; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, timeout=120, check=True
+    )
+    modules = parse_importtime(result.stderr)
+    root = next((m for m in reversed(modules) if m["module"] == module), None)
+    # Children of the module itself, i.e. what importing it actually costs
+    direct = [m for m in modules if m["depth"] == 1] or modules
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return {
+        "seconds": round(root["cumulative_ms"] / 1000, 3) if root else None,
+        "modules": len(modules),
+        "top": sorted(direct, key=lambda m: m["cumulative_ms"], reverse=True)[:top],
+        "deferred": {name: name not in loaded for name in DEFERRED_MODULES}
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(
+    client: httpx.Client,
+    url: str,
+    deadline: float,
+    ready: Callable[[httpx.Response], bool] = lambda response: True
+) -> Optional[float]:
+    """Poll `url` until it answers 200 and `ready(response)`; returns the monotonic time it did"""
+    while time.monotonic() < deadline:
+        try:
+            response = client.get(url)
+            if response.status_code == 200 and ready(response):
+                return time.monotonic()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def time_to_first_request(replay: bool = True, timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Spawn uvicorn and time /health answering and the first stocks landing in the cache
+
+    Args:
+        replay: Feed the cache from the synthetic replay engine (offline, deterministic);
+            False measures against live Yahoo / TEFAS
+        timeout: Give up after this many seconds
+    """
+    port = _free_port()
+    overrides = {"ALGORIST_REPLAY": "synthetic", "ALGORIST_REPLAY_SYMBOLS": "100", "ALGORIST_REPLAY_SPEED": "1"} if replay else {}
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_env(**overrides), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(timeout=5.0) as client:
+            deadline = started + timeout
+            first_request = _wait_for(client, f"{base}/health", deadline)
+            first_data = _wait_for(client, f"{base}/api/stocks", deadline, lambda response: bool(response.json()["stocks"]))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    return {
+        "source": "replay" if replay else "live",
+        "first_request_seconds": round(first_request - started, 3) if first_request else None,
+        "first_data_seconds": round(first_data - started, 3) if first_data else None
+    }
@@ -0,0 +1,172 @@
+"""
+Market Aggregates
+Index proxy, breadth and per-sector stats maintained incrementally on write
+"""
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+
+class _Bucket:
+    """Running sums for a group of stocks (whole market or one sector)"""
+
+    __slots__ = ("count", "change_sum", "turnover", "cap", "prev_cap", "advancers", "decliners", "unchanged")
+
+    def __init__(self):
+        self.count = 0
+        self.change_sum = 0.0
+        self.turnover = 0.0
+        self.cap = 0.0
+        self.prev_cap = 0.0
+        self.advancers = 0
+        self.decliners = 0
+        self.unchanged = 0
+
+    def apply(self, contribution: Tuple[float, float, float, float], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one stock's contribution"""
+        change_percent, turnover, cap, prev_cap = contribution
+        self.count += sign
+        self.change_sum += sign * change_percent
+        self.turnover += sign * turnover
+        self.cap += sign * cap
+        self.prev_cap += sign * prev_cap
+        if change_percent > 0:
+            self.advancers += sign
+        elif change_percent < 0:
+            self.decliners += sign
+        else:
+            self.unchanged += sign
+
+    def mean_change(self) -> Optional[float]:
+        return round(self.change_sum / self.count, 2) if self.count else None
+
+    def cap_weighted_change(self) -> Optional[float]:
+        if self.prev_cap <= 0:
+            return None
+        return round((self.cap / self.prev_cap - 1) * 100, 2)
+
+
+class MarketAggregates:
+    """
+    Market-level aggregates updated in O(1) per upserted stock
+
+    Each stock's last contribution is remembered so an upsert subtracts the
+    old values and adds the new ones instead of re-summing the universe.
+    The index proxy is total market cap over a divisor; the divisor is
+    adjusted when constituents join or leave so the level stays continuous.
+    """
+
+    def __init__(self, sector_of: Callable[[str], str], base_level: float = 10000.0):
+        """
+        Args:
+            sector_of: Maps a symbol to its sector name
+            base_level: Index level at the previous close of the first snapshot
+        """
+        self._sector_of = sector_of
+        self._base_level = base_level
+        self._contributions: Dict[str, Tuple[str, Tuple[float, float, float, float]]] = {}
+        self._market = _Bucket()
+        self._sectors: Dict[str, _Bucket] = {}
+        self._divisor: Optional[float] = None
+
+    @staticmethod
+    def _contribution(record: Dict[str, Any]) -> Tuple[float, float, float, float]:
+        change_percent = float(record.get("change_percent") or 0.0)
+        price = float(record.get("price") or 0.0)
+        volume = float(record.get("volume") or 0.0)
+        cap = float(record.get("market_cap") or 0.0)
+        # Market cap at the previous close, backed out of today's change
+        prev_cap = cap / (1 + change_percent / 100) if change_percent > -100 else 0.0
+        return (change_percent, price * volume, cap, prev_cap)
+
+    def _rebase_divisor(self, cap_before: float) -> None:
+        """Keep the index level unchanged across a constituent change"""
+        if self._divisor is None or cap_before <= 0:
+            if self._market.prev_cap > 0:
+                self._divisor = self._market.prev_cap / self._base_level
+            return
+        level = cap_before / self._divisor
+        if level > 0 and self._market.cap > 0:
+            self._divisor = self._market.cap / level
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """Replace one stock's contribution"""
+        symbol = record.get("symbol")
+        if not symbol:
+            return
+
+        old = self._contributions.get(symbol)
+        new = (self._sector_of(symbol), self._contribution(record))
+        cap_before = self._market.cap
+
+        if old is not None:
+            old_sector, old_values = old
+            self._market.apply(old_values, -1)
+            self._sectors[old_sector].apply(old_values, -1)
+
+        sector, values = new
+        self._market.apply(values, 1)
+        self._sectors.setdefault(sector, _Bucket()).apply(values, 1)
+        self._contributions[symbol] = new
+
+        if old is None:
+            # New constituent: adjust the divisor instead of jumping the level
+            self._rebase_divisor(cap_before)
+
+    def remove(self, symbol: str) -> None:
+        """Drop one stock's contribution (evicted from the cache)"""
+        old = self._contributions.pop(symbol, None)
+        if old is None:
+            return
+        cap_before = self._market.cap
+        sector, values = old
+        self._market.apply(values, -1)
+        self._sectors[sector].apply(values, -1)
+        # Leaving constituent: adjust the divisor instead of jumping the level
+        self._rebase_divisor(cap_before)
+
+    def rebuild(self, records: List[Dict[str, Any]]) -> None:
+        """Recompute everything from scratch (startup / full replace)"""
+        self._contributions = {}
+        self._market = _Bucket()
+        self._sectors = {}
+        for record in records:
+            self.upsert(record)
+        # Base the index on the previous close of the full snapshot
+        self._divisor = None
+        self._rebase_divisor(0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current aggregates as a JSON-ready dict"""
+        market = self._market
+        index_level = round(market.cap / self._divisor, 2) if self._divisor else None
+
+        sectors = [
+            {
+                "sector": name,
+                "count": bucket.count,
+                "mean_change_percent": bucket.mean_change(),
+                "cap_weighted_change_percent": bucket.cap_weighted_change(),
+                "turnover": round(bucket.turnover, 2),
+                "market_cap": bucket.cap,
+                "advancers": bucket.advancers,
+                "decliners": bucket.decliners,
+            }
+            for name, bucket in sorted(self._sectors.items())
+            if bucket.count > 0
+        ]
+
+        return {
+            "index": {
+                "level": index_level,
+                "change_percent": market.cap_weighted_change(),
+                "total_market_cap": market.cap,
+            },
+            "breadth": {
+                "advancers": market.advancers,
+                "decliners": market.decliners,
+                "unchanged": market.unchanged,
+                "total": market.count,
+            },
+            "mean_change_percent": market.mean_change(),
+            "turnover": round(market.turnover, 2),
+            "sectors": sectors,
+        }
@@ -0,0 +1,415 @@
+"""
+Cache Backends
+Where CacheManager persists and shares its snapshots:
+- memory: process-local only (tests, throwaway runs)
+- file:   JSON files under DATA_DIR (default, single node)
+- log:    append-only change log + binary checkpoints under DATA_DIR
+- redis:  any Redis-protocol server, with pub/sub invalidation between nodes
+"""
+import json
+import os
+import pickle
+import struct
+import threading
+import uuid
+from typing import Dict, Any, Optional, Callable, List, Tuple
+import logging
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# invalidation callback(data_type)
+InvalidationCallback = Callable[[str], None]
+
+# Builds the full snapshot of a data type on demand (for checkpoints)
+SnapshotFactory = Callable[[], Dict[str, Any]]
+
+
+class CacheBackend:
+    """
+    Persistence + distribution interface for cache snapshots
+
+    Snapshots are keyed by data type ('market' or 'funds') and are plain
+    JSON-serializable dicts.
+    """
+
+    name = "base"
+    shared = False  # True if other nodes see what this node saves
+    incremental = False  # True if append() persists single changes
+
+    def load(self, data_type: str) -> Optional[Dict[str, Any]]:
+        """Return the stored snapshot, or None if there is none"""
+        raise NotImplementedError
+
+    def save(self, data_type: str, data: Dict[str, Any]) -> Optional[int]:
+        """
+        Store a snapshot (and notify subscribers for shared backends)
+        
+        Returns:
+            Bytes written, or None if the backend does not serialize
+        """
+        raise NotImplementedError
+
+    def append(self, data_type: str, entry: Dict[str, Any], snapshot: SnapshotFactory) -> Optional[int]:
+        """
+        Persist one change (incremental backends only)
+        
+        Args:
+            entry: {"item", "op": "upsert" | "replace", "records", "last_updated", "version"},
+                plus "removed" (keys to drop) on upserts that evicted records
+            snapshot: Full snapshot factory, called when the backend compacts
+        
+        Returns:
+            Bytes written
+        """
+        raise NotImplementedError
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        """Get told when another node saved a snapshot (no-op for local backends)"""
+
+    def close(self) -> None:
+        """Release connections / threads"""
+
+
+class MemoryBackend(CacheBackend):
+    """Keeps snapshots in a dict - nothing survives a restart"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._store: Dict[str, Dict[str, Any]] = {}
+
+    def load(self, data_type: str) -> Optional[Dict[str, Any]]:
+        return self._store.get(data_type)
+
+    def save(self, data_type: str, data: Dict[str, Any]) -> Optional[int]:
+        self._store[data_type] = data
+        return None
+
+
+class LocalFileBackend(CacheBackend):
+    """JSON files on local disk (the original persistence format)"""
+
+    name = "file"
+
+    def __init__(self, paths: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            paths: data_type -> file path (defaults to the settings paths)
+        """
+        self.paths = paths or {
+            "market": settings.MARKET_DATA_FILE,
+            "funds": settings.FUNDS_DATA_FILE,
+        }
+
+    def load(self, data_type: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.paths[data_type], 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, data_type: str, data: Dict[str, Any]) -> Optional[int]:
+        path = self.paths[data_type]
+        # Write then rename so readers never see a half-written file
+        # (per-thread temp name: fetch jobs for different groups can save concurrently)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            written = f.tell()
+        os.replace(tmp_path, path)
+        return written
+
+
+class _Codec:
+    """Binary serializer for the log backend: msgpack if installed, else pickle"""
+
+    def __init__(self, name: Optional[str] = None):
+        if name is None:
+            try:
+                import msgpack  # noqa: F401  (optional, smaller and language-neutral)
+                name = "msgpack"
+            except ImportError:
+                name = "pickle"
+        self.name = name
+        self.tag = name[0].encode()  # Stored in every file header
+
+    @classmethod
+    def from_tag(cls, tag: bytes) -> "_Codec":
+        return cls({b"m": "msgpack", b"p": "pickle"}[tag])
+
+    def dumps(self, obj: Any) -> bytes:
+        if self.name == "msgpack":
+            import msgpack
+            return msgpack.packb(obj, use_bin_type=True)
+        return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, payload: bytes) -> Any:
+        if self.name == "msgpack":
+            import msgpack
+            return msgpack.unpackb(payload, raw=False)
+        return pickle.loads(payload)
+
+
+class LogBackend(CacheBackend):
+    """
+    Append-only change log plus periodic checkpoints, per data type
+
+    Every write appends one length-prefixed entry holding just the records it
+    touched, so write cost follows the size of the change. Once the log
+    outgrows the last checkpoint (or holds LOG_CHECKPOINT_ENTRIES entries),
+    the full snapshot becomes a new checkpoint and the log is truncated.
+    load() reads the checkpoint and replays newer entries in version order,
+    so reload time stays bounded by about twice the dataset. Without a
+    checkpoint it starts from the file backend's JSON (one-way migration).
+    """
+
+    name = "log"
+    incremental = True
+
+    MAGIC = b"ALGL"
+    FRAME = struct.Struct(">I")
+    MIN_CHECKPOINT_BYTES = 1024 * 1024  # Don't rewrite tiny snapshots after every change
+
+    def __init__(
+        self,
+        directory: str = settings.DATA_DIR,
+        checkpoint_entries: int = settings.LOG_CHECKPOINT_ENTRIES,
+        codec: Optional[str] = None
+    ):
+        """
+        Args:
+            directory: Where <data_type>.ckpt / <data_type>.log live
+            checkpoint_entries: Compact after this many logged changes
+            codec: "msgpack" or "pickle" for new files (default: msgpack if installed)
+        """
+        self.directory = directory
+        self.checkpoint_entries = checkpoint_entries
+        self.codec = _Codec(codec)
+        self._lock = threading.Lock()
+        self._tail: Dict[str, Tuple[int, int]] = {}  # data_type -> (entries, bytes) since the checkpoint
+        self._checkpoint_bytes: Dict[str, int] = {}
+        self._legacy = LocalFileBackend()
+
+    def _path(self, data_type: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{data_type}.{kind}")
+
+    def _header(self) -> bytes:
+        return self.MAGIC + self.codec.tag
+
+    def _open(self, path: str) -> Tuple[Any, _Codec]:
+        """Open a log/checkpoint file and return it positioned after the header"""
+        f = open(path, "rb")
+        header = f.read(len(self.MAGIC) + 1)
+        if header[:len(self.MAGIC)] != self.MAGIC:
+            f.close()
+            raise ValueError(f"{path} is not an Algorist log file")
+        return f, _Codec.from_tag(header[len(self.MAGIC):])
+
+    def _read_frames(self, path: str) -> List[Any]:
+        """Decode every complete frame; a torn final write is cut off so later appends stay readable"""
+        try:
+            f, codec = self._open(path)
+        except FileNotFoundError:
+            return []
+        frames: List[Any] = []
+        with f:
+            valid_end = f.tell()
+            while True:
+                head = f.read(self.FRAME.size)
+                if len(head) < self.FRAME.size:
+                    break
+                (size,) = self.FRAME.unpack(head)
+                payload = f.read(size)
+                if len(payload) < size:
+                    break
+                frames.append(codec.loads(payload))
+                valid_end = f.tell()
+            torn = f.seek(0, os.SEEK_END) > valid_end
+        if torn:
+            logger.warning(f"⚠️  Dropping torn entry at the end of {path}")
+            with open(path, "r+b") as f:
+                f.truncate(valid_end)
+        return frames
+
+    def _frame(self, obj: Any) -> bytes:
+        payload = self.codec.dumps(obj)
+        return self.FRAME.pack(len(payload)) + payload
+
+    @staticmethod
+    def _replay(snapshot: Dict[str, Any], entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply logged changes newer than the snapshot, in version order"""
+        base_version = snapshot.get("version", 0)
+        merged: Dict[str, Dict[str, Any]] = {}  # item -> key -> record, built on first upsert
+        for entry in sorted(entries, key=lambda e: e["version"]):
+            if entry["version"] <= base_version:
+                continue  # Already in the checkpoint
+            item = entry["item"]
+            if entry["op"] == "replace":
+                merged.pop(item, None)
+                snapshot[item] = entry["records"]
+            else:
+                records = merged.get(item)
+                if records is None:
+                    records = merged[item] = {
+                        r.get("symbol") or r.get("code"): r for r in snapshot.get(item, [])
+                    }
+                for record in entry["records"]:
+                    records[record.get("symbol") or record.get("code")] = record
+                for key in entry.get("removed", ()):
+                    records.pop(key, None)
+            snapshot["last_updated"] = entry["last_updated"]
+            snapshot["version"] = entry["version"]
+        for item, records in merged.items():
+            snapshot[item] = list(records.values())
+        return snapshot
+
+    def load(self, data_type: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            checkpoints = self._read_frames(self._path(data_type, "ckpt"))
+            entries = self._read_frames(self._path(data_type, "log"))
+            if checkpoints:
+                self._checkpoint_bytes[data_type] = os.path.getsize(self._path(data_type, "ckpt"))
+            log_path = self._path(data_type, "log")
+            self._tail[data_type] = (len(entries), os.path.getsize(log_path) if os.path.exists(log_path) else 0)
+
+        snapshot = checkpoints[-1] if checkpoints else self._legacy.load(data_type)
+        if snapshot is None and not entries:
+            return None
+        return self._replay(snapshot or {}, entries)
+
+    def _write_checkpoint(self, data_type: str, data: Dict[str, Any]) -> int:
+        """Write a checkpoint and truncate the log (caller holds the lock)"""
+        path = self._path(data_type, "ckpt")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._header())
+            f.write(self._frame(data))
+            written = f.tell()
+        os.replace(tmp_path, path)
+        # Entries logged before this point are covered by the checkpoint's version
+        with open(self._path(data_type, "log"), "wb") as f:
+            f.write(self._header())
+        self._checkpoint_bytes[data_type] = written
+        self._tail[data_type] = (0, 0)
+        return written
+
+    def save(self, data_type: str, data: Dict[str, Any]) -> Optional[int]:
+        with self._lock:
+            return self._write_checkpoint(data_type, data)
+
+    def append(self, data_type: str, entry: Dict[str, Any], snapshot: SnapshotFactory) -> Optional[int]:
+        frame = self._frame(entry)
+        with self._lock:
+            path = self._path(data_type, "log")
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(self._header())
+            with open(path, "ab") as f:
+                f.write(frame)
+            entries, size = self._tail.get(data_type, (0, 0))
+            entries, size = entries + 1, size + len(frame)
+            self._tail[data_type] = (entries, size)
+
+            written = len(frame)
+            if entries >= self.checkpoint_entries or size > max(
+                self._checkpoint_bytes.get(data_type, 0), self.MIN_CHECKPOINT_BYTES
+            ):
+                written += self._write_checkpoint(data_type, snapshot())
+                logger.info(f"🗜️  Checkpointed {data_type} after {entries} logged changes")
+            return written
+
+
+class RedisBackend(CacheBackend):
+    """
+    Snapshots stored as JSON strings in a Redis-protocol key-value store
+
+    Every save also publishes '<node_id>:<data_type>' on a channel; other
+    nodes reload that snapshot, so their in-memory caches stay warm without
+    polling. Pass `client` to use a stand-in such as fakeredis.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str = settings.REDIS_URL, prefix: str = settings.REDIS_KEY_PREFIX, client: Any = None):
+        if client is None:
+            import redis  # Optional dependency, only needed for this backend
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self._prefix = prefix
+        self._channel = f"{prefix}:invalidate"
+        self._node_id = uuid.uuid4().hex[:12]
+        self._callbacks: List[InvalidationCallback] = []
+        self._pubsub: Any = None
+        self._listener: Optional[threading.Thread] = None
+
+    def ping(self) -> None:
+        """Round-trip to the server (raises if it is unreachable)"""
+        self._client.ping()
+
+    def _key(self, data_type: str) -> str:
+        return f"{self._prefix}:{data_type}"
+
+    def load(self, data_type: str) -> Optional[Dict[str, Any]]:
+        raw = self._client.get(self._key(data_type))
+        return json.loads(raw) if raw else None
+
+    def save(self, data_type: str, data: Dict[str, Any]) -> Optional[int]:
+        payload = json.dumps(data, ensure_ascii=False).encode()
+        self._client.set(self._key(data_type), payload)
+        self._client.publish(self._channel, f"{self._node_id}:{data_type}")
+        return len(payload)
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        self._callbacks.append(callback)
+        if self._listener is not None:
+            return
+
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self._channel)
+
+        def listen():
+            for message in self._pubsub.listen():
+                raw = message.get("data")
+                if isinstance(raw, bytes):
+                    raw = raw.decode()
+                if not isinstance(raw, str) or ":" not in raw:
+                    continue
+                node_id, data_type = raw.split(":", 1)
+                if node_id == self._node_id:
+                    continue  # Our own save
+                for cb in self._callbacks:
+                    try:
+                        cb(data_type)
+                    except Exception as e:
+                        logger.error(f"Invalidation callback failed for {data_type}: {e}")
+
+        self._listener = threading.Thread(target=listen, name="cache-invalidation", daemon=True)
+        self._listener.start()
+        logger.info(f"📡 Subscribed to cache invalidations on {self._channel}")
+
+    def close(self) -> None:
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+def create_backend(name: str = settings.CACHE_BACKEND) -> CacheBackend:
+    """Build the configured backend, falling back to local files if it can't start"""
+    if name == "memory":
+        return MemoryBackend()
+    if name == "log":
+        backend = LogBackend()
+        logger.info(f"🗄️  Using log cache backend in {settings.DATA_DIR} ({backend.codec.name})")
+        return backend
+    if name == "redis":
+        try:
+            backend = RedisBackend()
+            backend.ping()  # from_url() is lazy: connect now so an unreachable server falls back here
+            logger.info(f"🗄️  Using Redis cache backend at {settings.REDIS_URL}")
+            return backend
+        except Exception as e:
+            logger.error(f"❌ Redis backend unavailable ({e}) - falling back to local files")
+    elif name != "file":
+        logger.warning(f"⚠️  Unknown cache backend '{name}' - using local files")
+    return LocalFileBackend()
@@ -1,18 +1,77 @@
-import json
+import pickle
 import threading
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from config import settings
+from cache.indexes import SortedIndex
+from cache.columnar import ColumnarView
+from cache.aggregates import MarketAggregates
+from cache.freshness import FreshnessTracker
+from cache.shared_snapshot import SharedSnapshot
+from cache.backends import CacheBackend, LocalFileBackend, create_backend
+from cache.records import Quote, SymbolTable, compact_many, to_dicts
+import metrics
 import logging
 
 logger = logging.getLogger(__name__)
 
+# listener(item_key, previous records by symbol/code, updated records)
+UpdateListener = Callable[[str, Dict[str, Quote], List[Quote]], None]
+
+
+# Cache list -> asset type used in freshness reports
+ASSET_OF_ITEM: Dict[str, str] = {
+    "bist100": "stocks",
+    "forex": "forex",
+    "commodities": "commodities",
+    "funds": "funds",
+}
+
+
+# Every cached list
+ITEM_KEYS: Tuple[str, ...] = tuple(ASSET_OF_ITEM)
+
+
+# Persisted data type -> the cache lists it holds
+ITEMS_OF_DATA_TYPE: Dict[str, Tuple[str, ...]] = {
+    "market": ("bist100", "forex", "commodities"),
+    "funds": ("funds",),
+}
+
+
+# Asset type -> the cache lists whose writes change what it serves. Market
+# lists share one last_updated timestamp, so each market asset depends on all three.
+VERSION_ITEMS_OF_ASSET: Dict[str, Tuple[str, ...]] = {
+    asset: next(items for items in ITEMS_OF_DATA_TYPE.values() if item in items)
+    for item, asset in ASSET_OF_ITEM.items()
+}
+
+
+def record_key(record: Dict[str, Any]) -> Optional[str]:
+    """Identity of a cached record: 'symbol' for market items, 'code' for funds"""
+    return record.get("symbol") or record.get("code")
+
+
+def sector_of(symbol: str) -> str:
+    """Sector from the static classification table"""
+    return settings.STOCK_SECTORS.get(symbol, "Other")
+
+
 class CacheManager:
     """
-    Thread-safe cache manager with in-memory storage and JSON persistence.
+    Thread-safe cache manager with in-memory storage and pluggable
+    persistence (local JSON files, memory, or a Redis-protocol store).
+    
+    Records are stored as compact Quote objects (see cache.records): they
+    read like the fetcher's dicts but share per-symbol metadata and keep
+    timestamps as epoch integers. Incoming dicts are compacted on write.
     """
     
-    def __init__(self):
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        """
+        Args:
+            backend: Persistence/distribution backend (defaults to settings.CACHE_BACKEND)
+        """
         self._cache: Dict[str, Any] = {
             "bist100": [],
             "forex": [],
@@ -24,75 +83,282 @@ class CacheManager:
             }
         }
         self._lock = threading.Lock()
-        self._load_from_disk()
-    
-    def _load_from_disk(self):
-        """Load cached data from JSON files on startup"""
+        self._symbols = SymbolTable()  # Interned per-symbol metadata shared by all records
+        self._version = 0  # Bumped on every write; lets readers detect changes cheaply
+        self._item_versions: Dict[str, int] = {key: 0 for key in ITEM_KEYS}  # Version of each list's last write
+        self._followed_versions: Dict[str, int] = {}  # Leader's item versions last adopted (followers)
+        self._stocks_by_symbol: Dict[str, Quote] = {}
+        self._stock_indexes: Dict[str, SortedIndex] = {
+            field: SortedIndex(field) for field in settings.MOVER_FIELDS
+        }
+        self._stock_columns = ColumnarView(settings.SCREENER_FIELDS, category_of=sector_of)
+        self._aggregates = MarketAggregates(sector_of, settings.MARKET_INDEX_BASE)
+        self._freshness = FreshnessTracker()
+        self._listeners: List[UpdateListener] = []
+        self._follow_stop = threading.Event()
+        self._follow_thread: Optional[threading.Thread] = None
+        self._backend = backend or create_backend()
+        self._load_from_backend()
         try:
-            # Load market data (stocks, forex, commodities)
-            try:
-                with open(settings.MARKET_DATA_FILE, 'r', encoding='utf-8') as f:
-                    market_data = json.load(f)
-                    with self._lock:
-                        self._cache["bist100"] = market_data.get("bist100", [])
-                        self._cache["forex"] = market_data.get("forex", [])
-                        self._cache["commodities"] = market_data.get("commodities", [])
-                        self._cache["last_updated"]["stocks"] = market_data.get("last_updated")
-                    logger.info("Market data loaded from disk")
-            except FileNotFoundError:
-                logger.info("No existing market data file found")
-            
-            # Load funds data
-            try:
-                with open(settings.FUNDS_DATA_FILE, 'r', encoding='utf-8') as f:
-                    funds_data = json.load(f)
-                    with self._lock:
-                        self._cache["funds"] = funds_data.get("funds", [])
-                        self._cache["last_updated"]["funds"] = funds_data.get("last_updated")
-                    logger.info("Funds data loaded from disk")
-            except FileNotFoundError:
-                logger.info("No existing funds data file found")
-                
+            self._backend.subscribe(self._on_invalidation)
         except Exception as e:
-            logger.error(f"Error loading cache from disk: {e}")
+            # Shared backend reachable at startup but not for pub/sub: don't serve a cache that never syncs
+            logger.error(f"❌ {self._backend.name} backend subscription failed ({e}) - falling back to local files")
+            self._backend = LocalFileBackend()
+            self._load_from_backend()
     
-    def _save_to_disk(self, data_type: str):
-        """Persist cache to disk"""
-        try:
+    def _compact(self, records: List[Dict[str, Any]], source: Optional[str] = None) -> List[Quote]:
+        """Incoming records -> Quotes (records without a symbol/code are dropped)"""
+        return compact_many(records, self._symbols, source)
+    
+    def _apply_persisted(self, data_type: str, data: Dict[str, Any], restored: bool = False):
+        """
+        Adopt a persisted snapshot for one data type
+        
+        Args:
+            restored: True at startup, marks every record's source as 'disk'
+        """
+        keys = ITEMS_OF_DATA_TYPE[data_type]
+        # Records read back at startup were not fetched by this run
+        compacted = {key: self._compact(data.get(key, []), "disk" if restored else None) for key in keys}
+        with self._lock:
+            for key in keys:
+                self._cache[key] = compacted[key]
             if data_type == "market":
-                data = {
-                    "bist100": self._cache["bist100"],
-                    "forex": self._cache["forex"],
-                    "commodities": self._cache["commodities"],
-                    "last_updated": self._cache["last_updated"]["stocks"]
-                }
-                with open(settings.MARKET_DATA_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                logger.info("Market data saved to disk")
-                
+                self._cache["last_updated"]["stocks"] = data.get("last_updated")
+                self._rebuild_stock_indexes()
+                self._track_item("forex")
+                self._track_item("commodities")
             elif data_type == "funds":
-                data = {
-                    "funds": self._cache["funds"],
-                    "last_updated": self._cache["last_updated"]["funds"]
-                }
-                with open(settings.FUNDS_DATA_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                logger.info("Funds data saved to disk")
+                self._cache["last_updated"]["funds"] = data.get("last_updated")
+                self._track_item("funds")
+            # Keep version numbers aligned with the node that saved the snapshot
+            self._version = max(self._version + 1, data.get("version", 0))
+            for key in keys:
+                self._item_versions[key] = self._version
+    
+    def _load_from_backend(self):
+        """Load cached data from the configured backend on startup"""
+        for data_type, label in (("market", "Market data"), ("funds", "Funds data")):
+            try:
+                data = self._backend.load(data_type)
+                if data is None:
+                    logger.info(f"No existing {label.lower()} found in {self._backend.name} backend")
+                    continue
+                self._apply_persisted(data_type, data, restored=True)
+                logger.info(f"{label} loaded from {self._backend.name} backend")
+            except Exception as e:
+                logger.error(f"Error loading {label.lower()} from {self._backend.name} backend: {e}")
+    
+    def _on_invalidation(self, data_type: str):
+        """Another node saved a newer snapshot: reload it so this node stays warm"""
+        try:
+            data = self._backend.load(data_type)
+            if data is not None:
+                self._apply_persisted(data_type, data)
+                logger.info(f"♻️  Reloaded {data_type} snapshot after remote update")
+        except Exception as e:
+            logger.error(f"Error reloading {data_type} after invalidation: {e}")
+    
+    def _snapshot(self, data_type: str) -> Dict[str, Any]:
+        """Full persisted form of one data type (references taken under the lock, converted outside it)"""
+        with self._lock:
+            lists = {key: self._cache[key] for key in ITEMS_OF_DATA_TYPE[data_type]}
+            last_updated = self._cache["last_updated"]["stocks" if data_type == "market" else "funds"]
+            version = self._version
+        data: Dict[str, Any] = {key: to_dicts(records) for key, records in lists.items()}
+        data["last_updated"] = last_updated
+        data["version"] = version
+        return data
+    
+    def _change(
+        self,
+        data_type: str,
+        item_key: str,
+        records: List[Quote],
+        replace: bool,
+        removed: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Describe one write for incremental backends (caller holds the lock, version already bumped)"""
+        change = {
+            "item": item_key,
+            "op": "replace" if replace else "upsert",
+            "records": records,
+            "last_updated": self._cache["last_updated"]["stocks" if data_type == "market" else "funds"],
+            "version": self._version
+        }
+        if removed:
+            change["removed"] = removed  # Keys an upsert evicted
+        return change
+    
+    def _save_to_backend(self, data_type: str, change: Optional[Dict[str, Any]] = None):
+        """
+        Persist cache to the configured backend
+        
+        Incremental backends get only the records of `change`; the others
+        get the full snapshot of the data type.
+        """
+        if data_type not in ITEMS_OF_DATA_TYPE:
+            return
+        label = "Market data" if data_type == "market" else "Funds data"
+        try:
+            if change is not None and self._backend.incremental:
+                entry = {**change, "records": to_dicts(change["records"])}
+                written = self._backend.append(data_type, entry, lambda: self._snapshot(data_type))
+                records = len(entry["records"])
+                logger.info(f"{label} change logged to {self._backend.name} backend ({records} records)")
+            else:
+                data = self._snapshot(data_type)
+                written = self._backend.save(data_type, data)
+                records = sum(len(data[key]) for key in ITEMS_OF_DATA_TYPE[data_type])
+                logger.info(f"{label} saved to {self._backend.name} backend")
+            
+            metrics.cache_persisted_records.inc(records, data_type=data_type)
+            if written is not None:
+                metrics.cache_persisted_bytes.inc(written, data_type=data_type)
                 
         except Exception as e:
-            logger.error(f"Error saving cache to disk: {e}")
+            logger.error(f"Error saving cache to {self._backend.name} backend: {e}")
+    
+    def _rebuild_stock_indexes(self):
+        """Rebuild all derived stock views from the stock list (caller holds the lock)"""
+        self._stocks_by_symbol = {s["symbol"]: s for s in self._cache["bist100"] if s.get("symbol")}
+        for index in self._stock_indexes.values():
+            index.rebuild(self._cache["bist100"])
+        self._stock_columns.rebuild(self._cache["bist100"])
+        self._aggregates.rebuild(self._cache["bist100"])
+        self._freshness.replace("stocks", self._stocks_by_symbol)
+    
+    def _index_stock(self, stock: Quote):
+        """Patch a single stock into all derived views (caller holds the lock)"""
+        for index in self._stock_indexes.values():
+            index.upsert(stock)
+        self._stock_columns.upsert(stock)
+        self._aggregates.upsert(stock)
+        self._freshness.upsert("stocks", stock["symbol"], stock)
+    
+    def _unindex_stock(self, symbol: str):
+        """Drop a single stock from all derived views (caller holds the lock)"""
+        for index in self._stock_indexes.values():
+            index.remove(symbol)
+        self._stock_columns.remove(symbol)
+        self._aggregates.remove(symbol)
+        self._freshness.remove("stocks", symbol)
+    
+    def _track_item(self, item_key: str):
+        """Refresh freshness entries of a fully replaced list (caller holds the lock)"""
+        self._freshness.replace(
+            ASSET_OF_ITEM[item_key],
+            {record_key(r): r for r in self._cache[item_key] if record_key(r)}
+        )
+    
+    def add_listener(self, listener: UpdateListener):
+        """
+        Register a callback fired after every write
+        
+        Listeners run on the writer's thread (outside the cache lock) and
+        receive the previous records for the touched keys plus the new ones,
+        so they can react to the delta without rescanning the cache.
+        """
+        self._listeners.append(listener)
+    
+    def _commit_write(self, data_type: str, change: Dict[str, Any], previous: Dict[str, Quote]):
+        """Persist, count and fan out a write (called after the lock is released)"""
+        item_key, updated = change["item"], change["records"]
+        metrics.cache_writes.inc(item=item_key)
+        metrics.cache_records_changed.inc(len(updated), item=item_key)
+        self._save_to_backend(data_type, change)
+        self._notify_listeners(item_key, previous, updated)
+    
+    def _notify_listeners(self, item_key: str, previous: Dict[str, Quote], updated: List[Quote]):
+        """Fan a write out to all listeners (errors are logged, never raised)"""
+        for listener in self._listeners:
+            try:
+                listener(item_key, previous, updated)
+            except Exception as e:
+                logger.error(f"Cache listener failed for {item_key}: {e}")
     
     def _update_market_item(self, item_key: str, data: List[Dict[str, Any]]):
         """Generic method to update market items (DRY principle)"""
+        data = self._compact(data)
         with self._lock:
+            previous = {record_key(r): r for r in self._cache[item_key]}
             self._cache[item_key] = data
             self._cache["last_updated"]["stocks"] = datetime.now().isoformat()
-        self._save_to_disk("market")
+            if item_key == "bist100":
+                self._rebuild_stock_indexes()
+            else:
+                self._track_item(item_key)
+            self._version += 1
+            self._item_versions[item_key] = self._version
+            change = self._change("market", item_key, data, replace=True)
+        self._commit_write("market", change, previous)
     
     def update_stocks(self, stocks_data: List[Dict[str, Any]]):
-        """Update BIST100 stocks cache"""
+        """Replace the whole BIST100 stocks cache"""
         self._update_market_item("bist100", stocks_data)
     
+    def upsert_stocks(self, stocks_data: List[Dict[str, Any]], group: Optional[List[str]] = None):
+        """
+        Merge a group of freshly fetched stocks into the cache
+        
+        Existing symbols are replaced in place and new ones are appended.
+        Symbols of `group` missing from the fetch (delisted, no longer quoted)
+        are evicted, like the scheduler's old full-list rewrite did. Only the
+        touched symbols are patched into the leaderboard indexes, the columnar
+        screener view and the market aggregates; the stock list itself is
+        copied once per write, since readers may still hold the previous one.
+        
+        Args:
+            stocks_data: Fetched stock records
+            group: Symbols the fetch asked for (None: evict nothing)
+        """
+        incoming = {s.key: s for s in self._compact(stocks_data)}
+        if not incoming:
+            return
+        
+        with self._lock:
+            evicted = [
+                symbol for symbol in dict.fromkeys(group or ())
+                if symbol not in incoming and symbol in self._stocks_by_symbol
+            ]
+            previous = {
+                symbol: self._stocks_by_symbol[symbol]
+                for symbol in (*incoming, *evicted) if symbol in self._stocks_by_symbol
+            }
+            for symbol, stock in incoming.items():
+                # Re-assigning an existing key keeps its original position
+                self._stocks_by_symbol[symbol] = stock
+                self._index_stock(stock)
+            for symbol in evicted:
+                del self._stocks_by_symbol[symbol]
+                self._unindex_stock(symbol)
+            self._cache["bist100"] = list(self._stocks_by_symbol.values())
+            self._cache["last_updated"]["stocks"] = datetime.now().isoformat()
+            self._version += 1
+            self._item_versions["bist100"] = self._version
+            change = self._change("market", "bist100", list(incoming.values()), replace=False, removed=evicted)
+        if evicted:
+            logger.info(f"🧹 Evicted {len(evicted)} stocks missing from the fetch: {', '.join(evicted)}")
+        self._commit_write("market", change, previous)
+    
+    def retain_stocks(self, symbols: List[str]):
+        """Evict cached stocks outside `symbols` (e.g. dropped from the configured groups)"""
+        keep = set(symbols)
+        with self._lock:
+            evicted = [symbol for symbol in self._stocks_by_symbol if symbol not in keep]
+            if not evicted:
+                return
+            previous = {symbol: self._stocks_by_symbol.pop(symbol) for symbol in evicted}
+            for symbol in evicted:
+                self._unindex_stock(symbol)
+            self._cache["bist100"] = list(self._stocks_by_symbol.values())
+            self._version += 1
+            self._item_versions["bist100"] = self._version
+            change = self._change("market", "bist100", [], replace=False, removed=evicted)
+        logger.info(f"🧹 Evicted {len(evicted)} stocks no longer scheduled: {', '.join(evicted)}")
+        self._commit_write("market", change, previous)
+    
     def update_forex(self, forex_data: List[Dict[str, Any]]):
         """Update forex cache"""
         self._update_market_item("forex", forex_data)
@@ -103,40 +369,264 @@ class CacheManager:
     
     def update_funds(self, funds_data: List[Dict[str, Any]]):
         """Update funds cache"""
+        funds_data = self._compact(funds_data)
         with self._lock:
+            previous = {record_key(r): r for r in self._cache["funds"]}
             self._cache["funds"] = funds_data
             self._cache["last_updated"]["funds"] = datetime.now().isoformat()
-        self._save_to_disk("funds")
+            self._track_item("funds")
+            self._version += 1
+            self._item_versions["funds"] = self._version
+            change = self._change("funds", "funds", funds_data, replace=True)
+        self._commit_write("funds", change, previous)
     
     def get_all_data(self) -> Dict[str, Any]:
         """Get all cached data (thread-safe read)"""
         with self._lock:
             return self._cache.copy()
     
-    def get_stocks(self) -> List[Dict[str, Any]]:
+    def get_stocks(self) -> List[Quote]:
         """Get BIST100 stocks"""
         with self._lock:
             return self._cache["bist100"].copy()
     
-    def get_forex(self) -> List[Dict[str, Any]]:
+    def get_forex(self) -> List[Quote]:
         """Get forex data"""
         with self._lock:
             return self._cache["forex"].copy()
     
-    def get_commodities(self) -> List[Dict[str, Any]]:
+    def get_commodities(self) -> List[Quote]:
         """Get commodities data"""
         with self._lock:
             return self._cache["commodities"].copy()
     
-    def get_funds(self) -> List[Dict[str, Any]]:
+    def get_funds(self) -> List[Quote]:
         """Get funds data"""
         with self._lock:
             return self._cache["funds"].copy()
     
+    def get_listing(self, item_key: str) -> Tuple[List[Quote], int, Any]:
+        """
+        One cached list with the version and update time it belongs to
+        
+        Returns:
+            (records, version of the list's last write, last_updated), read
+            together under the lock; the list itself is returned (writers
+            replace lists, never mutate them)
+        """
+        with self._lock:
+            last_updated = self._cache["last_updated"]["funds" if item_key == "funds" else "stocks"]
+            return self._cache[item_key], self._item_versions[item_key], last_updated
+    
+    def get_quote(self, symbol: str) -> Optional[Quote]:
+        """Cached stock, forex or commodity record for a Yahoo symbol (None if not scheduled)"""
+        with self._lock:
+            stock = self._stocks_by_symbol.get(symbol)
+            if stock is not None:
+                return stock
+            for item_key in ("forex", "commodities"):
+                for record in self._cache[item_key]:
+                    if record.get("symbol") == symbol:
+                        return record
+        return None
+    
     def get_last_updated(self) -> Dict[str, Any]:
         """Get last update timestamps"""
         with self._lock:
             return self._cache["last_updated"].copy()
+    
+    def get_version(self, assets: Optional[Tuple[str, ...]] = None) -> int:
+        """
+        Get the cache version (monotonic write counter)
+        
+        Args:
+            assets: Asset types (stocks, forex, commodities, funds) to scope the
+                    version to: the version of the last write that changed any
+                    of their data, so other assets' writes leave it unchanged
+        """
+        if assets is None:
+            return self._version
+        with self._lock:
+            return max(
+                self._item_versions[item] for asset in assets for item in VERSION_ITEMS_OF_ASSET[asset]
+            )
+    
+    def get_movers(self, by: str, n: int = 10, descending: bool = True) -> List[Quote]:
+        """
+        Get the top n stocks ranked by a leaderboard field
+        
+        Args:
+            by: One of settings.MOVER_FIELDS
+            n: Number of stocks to return
+            descending: True for top gainers/most active, False for losers
+        
+        Returns:
+            List of stock dictionaries, best ranked first
+        """
+        index = self._stock_indexes.get(by)
+        if index is None:
+            raise ValueError(f"Unsupported ranking field: {by}")
+        
+        with self._lock:
+            return [self._stocks_by_symbol[symbol] for symbol in index.top(n, descending)]
+    
+    def screen_stocks(
+        self,
+        conditions: List[Tuple[str, str, Tuple[float, ...]]],
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        limit: Optional[int] = None,
+        sectors: Optional[List[str]] = None
+    ) -> List[Quote]:
+        """
+        Run a vectorized screen over the columnar stock view
+        
+        Args:
+            conditions: Parsed (field, operator, values) filters
+            sort_by: Field to order by (one of settings.SCREENER_FIELDS)
+            descending: Sort direction
+            limit: Max stocks to return
+            sectors: Keep only stocks in these sectors
+        
+        Returns:
+            Matching stock dictionaries in result order
+        """
+        with self._lock:
+            symbols = self._stock_columns.select(conditions, sort_by, descending, limit, sectors)
+            return [self._stocks_by_symbol[symbol] for symbol in symbols]
+    
+    def get_market_summary(self) -> Dict[str, Any]:
+        """Get index proxy, breadth and per-sector aggregates"""
+        with self._lock:
+            summary = self._aggregates.snapshot()
+            summary["last_updated"] = self._cache["last_updated"]["stocks"]
+            return summary
+    
+    def get_freshness_report(self, slo_seconds: Dict[str, float]) -> Dict[str, Any]:
+        """Staleness percentiles, source mix and SLO breaches per asset type"""
+        with self._lock:
+            return self._freshness.report(slo_seconds)
+    
+    def get_freshness(self, asset: str) -> List[Dict[str, Any]]:
+        """Per-record fetched_at / source / age_seconds for one asset type"""
+        with self._lock:
+            return self._freshness.entries(asset)
+    
+    def get_stale_keys(self, asset: str, slo_seconds: float) -> List[str]:
+        """Symbols (or fund codes) breaching the SLO, oldest first"""
+        with self._lock:
+            return self._freshness.stale(asset, slo_seconds)
+
+    @property
+    def is_shared(self) -> bool:
+        """True if the backend already distributes snapshots between nodes"""
+        return self._backend.shared
+    
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Snapshot of the raw cache for publishing to other workers
+        
+        Lists are replaced (never mutated) on write, so the references stay
+        consistent after the lock is released.
+        """
+        with self._lock:
+            state: Dict[str, Any] = {key: self._cache[key] for key in ITEM_KEYS}
+            state["last_updated"] = self._cache["last_updated"].copy()
+            state["item_versions"] = self._item_versions.copy()
+            state["version"] = self._version
+            return state
+    
+    def _replace_state(self, state: Dict[str, Any]):
+        """
+        Adopt a snapshot published by the leader
+        
+        Lists arrive pickled one by one; only those whose item version moved
+        since the last adopted snapshot are unpickled, compacted and have
+        their derived views rebuilt.
+        """
+        versions: Dict[str, int] = state.get("item_versions", {})
+        changed = [key for key in ITEM_KEYS if key not in versions or versions[key] != self._followed_versions.get(key)]
+        compacted = {key: self._compact(pickle.loads(state["lists"][key])) for key in changed}
+        with self._lock:
+            for key, records in compacted.items():
+                self._cache[key] = records
+            self._cache["last_updated"] = state.get("last_updated", {"stocks": None, "funds": None})
+            if "bist100" in compacted:
+                self._rebuild_stock_indexes()
+            for key in ("forex", "commodities", "funds"):
+                if key in compacted:
+                    self._track_item(key)
+            # Same version numbers in every worker keep version-derived keys consistent
+            self._version = state.get("version", self._version + 1)
+            for key in compacted:
+                self._item_versions[key] = versions.get(key, self._version)
+        self._followed_versions = dict(versions)
+    
+    def start_publishing(self, snapshot: SharedSnapshot):
+        """
+        Leader: publish the current state now and after every write
+        
+        Each list is pickled once per item version, so a stock group write
+        re-serializes the stock list only, not the funds.
+        """
+        encoded: Dict[str, Tuple[int, bytes]] = {}  # item -> (item version, pickled list)
+        
+        def publish(*_: Any):
+            state = self.export_state()
+            lists: Dict[str, bytes] = {}
+            for key in ITEM_KEYS:
+                version = state["item_versions"][key]
+                cached = encoded.get(key)
+                if cached is None or cached[0] != version:
+                    cached = encoded[key] = (version, pickle.dumps(state[key], protocol=pickle.HIGHEST_PROTOCOL))
+                lists[key] = cached[1]
+                del state[key]
+            state["lists"] = lists
+            snapshot.publish(state)
+        
+        publish()
+        self.add_listener(publish)
+        logger.info(f"📡 Publishing cache snapshots to {snapshot.path}")
+    
+    def start_following(
+        self,
+        snapshot: SharedSnapshot,
+        poll_seconds: float,
+        try_promote: Optional[Callable[[], bool]] = None
+    ):
+        """
+        Follower: mirror the leader's snapshots from a background thread
+        
+        Args:
+            snapshot: Shared region written by the leader
+            poll_seconds: How often to check the sequence word
+            try_promote: Called every poll; returning True means this worker
+                took over leadership, which ends following
+        """
+        def follow():
+            while not self._follow_stop.is_set():
+                try:
+                    state = snapshot.read_if_changed()
+                    if state is not None:
+                        self._replace_state(state)
+                    if try_promote is not None and try_promote():
+                        logger.info("👑 Promoted to leader - stopped following snapshots")
+                        return
+                except Exception as e:
+                    logger.error(f"Error following shared snapshot: {e}")
+                self._follow_stop.wait(poll_seconds)
+        
+        self._follow_stop.clear()
+        self._follow_thread = threading.Thread(target=follow, name="cache-follower", daemon=True)
+        self._follow_thread.start()
+        logger.info(f"📥 Following cache snapshots from {snapshot.path}")
+    
+    def stop_following(self):
+        """Stop the follower thread (no-op for the leader)"""
+        self._follow_stop.set()
+        if self._follow_thread is not None:
+            self._follow_thread.join(timeout=5)
+            self._follow_thread = None
 
 # Global cache instance
 cache = CacheManager()
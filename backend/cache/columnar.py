@@ -0,0 +1,177 @@
+"""
+Columnar View
+Struct-of-arrays (NumPy) mirror of cached quotes for vectorized screening
+"""
+from typing import Dict, List, Any, Optional, Tuple, Callable
+import numpy as np
+
+# Comparison operators understood by ColumnarView.select
+OPERATORS: Dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "=": np.equal,
+    "!=": np.not_equal,
+}
+
+
+class ColumnarView:
+    """
+    One float64 array per numeric field, one row per symbol
+
+    Rows are patched in place as groups are upserted; missing values are
+    stored as NaN so they never match a filter and always sort last. An
+    optional categorical column (e.g. sector) is kept as integer codes.
+    """
+
+    def __init__(
+        self,
+        fields: List[str],
+        initial_capacity: int = 128,
+        category_of: Optional[Callable[[str], str]] = None
+    ):
+        """
+        Args:
+            fields: Numeric record fields to mirror
+            initial_capacity: Rows pre-allocated before the first resize
+            category_of: Maps a symbol to its category (e.g. sector)
+        """
+        self.fields = list(fields)
+        self._capacity = initial_capacity
+        self._size = 0
+        self._symbols: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._columns: Dict[str, np.ndarray] = {
+            field: np.full(initial_capacity, np.nan) for field in self.fields
+        }
+        self._category_of = category_of
+        self._category_ids: Dict[str, int] = {}
+        self._categories = np.full(initial_capacity, -1, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self) -> None:
+        """Double the capacity of every column (amortized O(1) appends)"""
+        new_capacity = self._capacity * 2
+        for field, column in self._columns.items():
+            grown = np.full(new_capacity, np.nan)
+            grown[:self._size] = column[:self._size]
+            self._columns[field] = grown
+        categories = np.full(new_capacity, -1, dtype=np.int32)
+        categories[:self._size] = self._categories[:self._size]
+        self._categories = categories
+        self._capacity = new_capacity
+
+    @staticmethod
+    def _to_float(raw_value: Any) -> float:
+        if raw_value is None:
+            return np.nan
+        try:
+            return float(raw_value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """Patch (or append) the row for a single record"""
+        symbol = record.get("symbol")
+        if not symbol:
+            return
+
+        row = self._rows.get(symbol)
+        if row is None:
+            if self._size == self._capacity:
+                self._grow()
+            row = self._size
+            self._rows[symbol] = row
+            self._symbols.append(symbol)
+            self._size += 1
+            if self._category_of is not None:
+                category = self._category_of(symbol)
+                code = self._category_ids.setdefault(category.lower(), len(self._category_ids))
+                self._categories[row] = code
+
+        for field, column in self._columns.items():
+            column[row] = self._to_float(record.get(field))
+
+    def remove(self, symbol: str) -> None:
+        """Drop a symbol's row (the last row moves into its slot)"""
+        row = self._rows.pop(symbol, None)
+        if row is None:
+            return
+        last = self._size - 1
+        if row != last:
+            moved = self._symbols[last]
+            for column in self._columns.values():
+                column[row] = column[last]
+            self._categories[row] = self._categories[last]
+            self._symbols[row] = moved
+            self._rows[moved] = row
+        for column in self._columns.values():
+            column[last] = np.nan
+        self._categories[last] = -1
+        self._symbols.pop()
+        self._size -= 1
+
+    def rebuild(self, records: List[Dict[str, Any]]) -> None:
+        """Rebuild all columns from scratch (startup / full replace)"""
+        self._size = 0
+        self._symbols = []
+        self._rows = {}
+        for column in self._columns.values():
+            column.fill(np.nan)
+        self._categories.fill(-1)
+        for record in records:
+            self.upsert(record)
+
+    def select(
+        self,
+        conditions: List[Tuple[str, str, Tuple[float, ...]]],
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        limit: Optional[int] = None,
+        categories: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Vectorized filter + sort over all rows
+
+        Args:
+            conditions: (field, operator, values) triples; operator is one of
+                OPERATORS or 'between' (two values, inclusive)
+            sort_by: Field to order results by (None keeps row order)
+            descending: Sort direction
+            limit: Max symbols to return
+            categories: Keep only rows in one of these categories (case-insensitive)
+
+        Returns:
+            Matching symbols in result order
+        """
+        n = self._size
+        mask = np.ones(n, dtype=bool)
+
+        for field, op, values in conditions:
+            column = self._columns[field][:n]
+            if op == "between":
+                low, high = values
+                mask &= (column >= low) & (column <= high)
+            else:
+                # NaN != x is True: missing values must not match '!=' either
+                mask &= OPERATORS[op](column, values[0]) & ~np.isnan(column)
+
+        if categories:
+            codes = [self._category_ids[c.lower()] for c in categories if c.lower() in self._category_ids]
+            mask &= np.isin(self._categories[:n], codes)
+
+        rows = np.flatnonzero(mask)
+
+        if sort_by is not None and rows.size:
+            keys = self._columns[sort_by][rows]
+            # NaN sorts last in both directions
+            order = np.argsort(-keys if descending else keys, kind="stable")
+            rows = rows[order]
+
+        if limit is not None:
+            rows = rows[:limit]
+
+        return [self._symbols[row] for row in rows]
@@ -0,0 +1,131 @@
+"""
+Freshness Tracker
+Per-record fetch time and data source (live / mock / disk / replay) for SLO reporting
+"""
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from cache.records import Quote
+
+# Where a cached record came from
+SOURCES = ("live", "mock", "disk", "replay")
+
+# Sources judged by age alone: replay stands in for live during soak tests, and
+# disk records keep the fetched_at of the live fetch they were persisted from
+FRESH_SOURCES = ("live", "replay", "disk")
+
+# key -> (fetched_at epoch seconds or None, source)
+Entry = Tuple[Optional[float], str]
+
+
+def _parse_timestamp(raw_value: Any) -> Optional[float]:
+    if not raw_value:
+        return None
+    try:
+        return datetime.fromisoformat(str(raw_value)).timestamp()
+    except ValueError:
+        return None
+
+
+class FreshnessTracker:
+    """
+    Fetch time and source of every cached record, grouped by asset type
+
+    Entries are derived from the records themselves ('timestamp' is set by
+    the fetcher, 'source' by the fetcher or the mock generator), so the
+    tracker is patched on the same writes as the other derived views.
+    """
+
+    def __init__(self):
+        self._assets: Dict[str, Dict[str, Entry]] = {}
+
+    @staticmethod
+    def _entry(record: Dict[str, Any]) -> Entry:
+        fetched_at = record.fetched_at if isinstance(record, Quote) else _parse_timestamp(record.get("timestamp"))
+        return (fetched_at, record.get("source") or "live")
+
+    def upsert(self, asset: str, key: str, record: Dict[str, Any]) -> None:
+        """Patch one record's entry"""
+        self._assets.setdefault(asset, {})[key] = self._entry(record)
+
+    def remove(self, asset: str, key: str) -> None:
+        """Drop one record's entry"""
+        self._assets.get(asset, {}).pop(key, None)
+
+    def replace(self, asset: str, records: Dict[str, Dict[str, Any]]) -> None:
+        """Replace all entries of an asset type (full-replace writes)"""
+        self._assets[asset] = {key: self._entry(record) for key, record in records.items()}
+
+    def stale(self, asset: str, slo_seconds: float, now: Optional[float] = None) -> List[str]:
+        """
+        Keys breaching the SLO, oldest first
+
+        A record breaches when it is older than the SLO, has no timestamp,
+        or is mock data. Records restored from disk are judged by the age of
+        their original fetch, so a restart alone does not breach anything.
+        """
+        now = now if now is not None else datetime.now().timestamp()
+        breaching: List[Tuple[float, str]] = []
+        for key, (fetched_at, source) in self._assets.get(asset, {}).items():
+            age = now - fetched_at if fetched_at is not None else float("inf")
+            if age > slo_seconds or source not in FRESH_SOURCES:
+                breaching.append((age, key))
+        breaching.sort(reverse=True)
+        return [key for _, key in breaching]
+
+    def entries(self, asset: str, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Per-record freshness for one asset type"""
+        now = now if now is not None else datetime.now().timestamp()
+        return [
+            {
+                "key": key,
+                "fetched_at": datetime.fromtimestamp(fetched_at).isoformat() if fetched_at is not None else None,
+                "source": source,
+                "age_seconds": round(now - fetched_at, 1) if fetched_at is not None else None,
+            }
+            for key, (fetched_at, source) in self._assets.get(asset, {}).items()
+        ]
+
+    def report(self, slo_seconds: Dict[str, float], now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Staleness percentiles and SLO compliance per asset type
+
+        Args:
+            slo_seconds: asset type -> max acceptable age
+            now: Reference time (epoch seconds)
+        """
+        now = now if now is not None else datetime.now().timestamp()
+        assets: Dict[str, Any] = {}
+        for asset, entries in self._assets.items():
+            slo = slo_seconds.get(asset)
+            ages = np.array(
+                [now - fetched_at for fetched_at, _ in entries.values() if fetched_at is not None],
+                dtype=np.float64
+            )
+            sources = {source: 0 for source in SOURCES}
+            for _, source in entries.values():
+                sources[source] = sources.get(source, 0) + 1
+
+            breaching = len(self.stale(asset, slo, now)) if slo is not None else None
+            if ages.size:
+                p50, p90, p99 = np.percentile(ages, [50, 90, 99])
+                age_stats: Optional[Dict[str, float]] = {
+                    "p50": round(float(p50), 1),
+                    "p90": round(float(p90), 1),
+                    "p99": round(float(p99), 1),
+                    "max": round(float(ages.max()), 1),
+                }
+            else:
+                age_stats = None
+
+            assets[asset] = {
+                "count": len(entries),
+                "slo_seconds": slo,
+                "breaching": breaching,
+                "within_slo_percent": (
+                    round((1 - breaching / len(entries)) * 100, 2) if breaching is not None and entries else None
+                ),
+                "age_seconds": age_stats,
+                "sources": sources,
+            }
+        return assets
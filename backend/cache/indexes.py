@@ -0,0 +1,95 @@
+"""
+Sorted Indexes
+Leaderboard indexes over cached quotes, maintained incrementally on write
+"""
+import math
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple, Any
+
+
+class SortedIndex:
+    """
+    Ascending (value, symbol) index for a single numeric field
+
+    Each upsert costs O(log n) to locate plus a list shift, and reading
+    the top/bottom k entries is a plain slice - O(k).
+    """
+
+    def __init__(self, field: str):
+        """
+        Args:
+            field: Record field this index is sorted by (e.g. 'volume')
+        """
+        self.field = field
+        self._entries: List[Tuple[float, str]] = []
+        self._values: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _rank_value(raw_value: Any) -> Optional[float]:
+        """Field value as a sortable float, or None if the record can't be ranked"""
+        if raw_value is None:
+            return None
+        try:
+            value = float(raw_value)
+        except (TypeError, ValueError):
+            return None
+        # NaN compares false with everything: it would break the bisect order
+        return None if math.isnan(value) else value
+
+    def _remove(self, symbol: str) -> None:
+        old_value = self._values.pop(symbol, None)
+        if old_value is None:
+            return
+        pos = bisect_left(self._entries, (old_value, symbol))
+        if pos < len(self._entries) and self._entries[pos] == (old_value, symbol):
+            del self._entries[pos]
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """Insert or move a record's position in the index"""
+        symbol = record.get("symbol")
+        if not symbol:
+            return
+        self._remove(symbol)
+
+        value = self._rank_value(record.get(self.field))
+        if value is None:
+            return  # Records without a usable value are simply not ranked
+
+        self._values[symbol] = value
+        insort(self._entries, (value, symbol))
+
+    def remove(self, symbol: str) -> None:
+        """Drop a symbol from the index"""
+        self._remove(symbol)
+
+    def rebuild(self, records: List[Dict[str, Any]]) -> None:
+        """Rebuild the whole index from scratch (startup / full replace)"""
+        self._entries = []
+        self._values = {}
+        for record in records:
+            symbol = record.get("symbol")
+            value = self._rank_value(record.get(self.field))
+            if symbol and value is not None:
+                self._values[symbol] = value
+        self._entries = sorted((value, symbol) for symbol, value in self._values.items())
+
+    def top(self, n: int, descending: bool = True) -> List[str]:
+        """
+        Return up to n symbols from the requested end of the index
+
+        Args:
+            n: Number of symbols to return
+            descending: True for largest first, False for smallest first
+        """
+        if n <= 0:
+            return []
+        if descending:
+            return [symbol for _, symbol in reversed(self._entries[-n:])]
+        return [symbol for _, symbol in self._entries[:n]]
+
+    def value_of(self, symbol: str) -> Optional[float]:
+        """Current indexed value for a symbol, if ranked"""
+        return self._values.get(symbol)
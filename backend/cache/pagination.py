@@ -0,0 +1,125 @@
+"""
+Cursor Pagination
+Stable pages over the cached stock and fund lists, with cursors pinned to
+the version of the list the listing started at
+"""
+import base64
+import binascii
+import json
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from config import settings
+from cache.cache_manager import cache, CacheManager
+from cache.records import Quote, to_dicts
+
+
+def encode_cursor(item_key: str, version: int, after: str) -> str:
+    """Opaque cursor: list, pinned version and the last key already returned"""
+    raw = json.dumps({"i": item_key, "v": version, "k": after}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, item_key: str) -> Tuple[int, str]:
+    """
+    Cursor -> (version, last key returned)
+
+    Raises:
+        ValueError: Malformed cursor, or one issued for another list
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        version, after = int(data["v"]), str(data["k"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if data.get("i") != item_key:
+        raise ValueError("Cursor belongs to another listing")
+    return version, after
+
+
+class _Listing:
+    """One list at one version, sorted by key"""
+
+    __slots__ = ("records", "keys", "last_updated")
+
+    def __init__(self, source: List[Quote], last_updated: Any):
+        self.records = sorted(source, key=lambda record: record.key)
+        self.keys = [record.key for record in self.records]
+        self.last_updated = last_updated
+
+
+class Paginator:
+    """
+    Keyset pagination over cache lists
+
+    Pages are ordered by symbol / fund code. The first page pins the list's
+    version (that of its last write; writes to other lists don't move it)
+    into the cursor, and later pages are cut from that same sorted snapshot
+    while it is retained (the last `retained_versions` versions), so a
+    refresh landing mid-listing can't skip or repeat rows.
+    Once a pinned version has been dropped, paging continues after the last
+    key on current data and the page says `"consistent": false`.
+    """
+
+    def __init__(self, manager: CacheManager = cache, retained_versions: int = settings.PAGE_SNAPSHOT_VERSIONS):
+        self.manager = manager
+        self.retained_versions = retained_versions
+        self._listings: Dict[str, "OrderedDict[int, _Listing]"] = {}
+        self._lock = threading.Lock()
+
+    def _current(self, item_key: str) -> Tuple[int, _Listing]:
+        records, version, last_updated = self.manager.get_listing(item_key)
+        with self._lock:
+            listings = self._listings.setdefault(item_key, OrderedDict())
+            listing = listings.get(version)
+            if listing is None:
+                listing = listings[version] = _Listing(records, last_updated)
+                while len(listings) > self.retained_versions:
+                    listings.popitem(last=False)
+            return version, listing
+
+    def page(self, item_key: str, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of a cached list
+
+        Args:
+            item_key: "bist100" or "funds"
+            limit: Rows per page
+            cursor: next_cursor of the previous page (None for the first page)
+
+        Returns:
+            {"items", "count", "total", "next_cursor", "version", "consistent", "last_updated"}
+
+        Raises:
+            ValueError: Malformed cursor
+        """
+        version, listing = self._current(item_key)
+        after: Optional[str] = None
+        consistent = True
+        if cursor is not None:
+            pinned, after = decode_cursor(cursor, item_key)
+            with self._lock:
+                retained = self._listings[item_key].get(pinned)
+            if retained is not None:
+                version, listing = pinned, retained
+            else:
+                consistent = False
+
+        start = bisect_right(listing.keys, after) if after is not None else 0
+        records = listing.records[start:start + limit]
+        more = start + limit < len(listing.records)
+        return {
+            "items": to_dicts(records),
+            "count": len(records),
+            "total": len(listing.records),
+            "next_cursor": encode_cursor(item_key, version, records[-1].key) if more and records else None,
+            "version": version,
+            "consistent": consistent,
+            "last_updated": listing.last_updated,
+        }
+
+
+# Global paginator
+paginator = Paginator()
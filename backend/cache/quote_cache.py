@@ -0,0 +1,95 @@
+"""
+Quote Cache
+Bounded LRU/TTL tier for long-tail symbols fetched on demand (outside the
+scheduled BIST100 universe)
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+import metrics
+
+# symbol -> (record, stored_at monotonic seconds)
+Entry = Tuple[Dict[str, Any], float]
+
+
+class QuoteCache:
+    """
+    LRU cache of quote records with a freshness window and a hard expiry
+
+    Entries younger than `fresh_seconds` are fresh, older ones are served
+    as stale (and should be refreshed) until `max_age_seconds`, after which
+    they are dropped. When full, the least recently read symbol is evicted.
+    """
+
+    def __init__(self, max_entries: int, fresh_seconds: float, max_age_seconds: float):
+        """
+        Args:
+            max_entries: Size cap (LRU eviction above it)
+            fresh_seconds: Age below which an entry is fresh
+            max_age_seconds: Age above which an entry is expired and dropped
+        """
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._entries
+
+    def get(self, symbol: str, now: Optional[float] = None) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Look a symbol up and mark it recently used
+
+        Returns:
+            (record or None, stale)
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                metrics.quote_cache_requests.inc(result="miss")
+                return None, False
+            record, stored_at = entry
+            age = now - stored_at
+            if age > self.max_age_seconds:
+                del self._entries[symbol]
+                metrics.quote_cache_evictions.inc(reason="expired")
+                metrics.quote_cache_size.set(len(self._entries))
+                metrics.quote_cache_requests.inc(result="miss")
+                return None, False
+            self._entries.move_to_end(symbol)
+        stale = age > self.fresh_seconds
+        metrics.quote_cache_requests.inc(result="stale" if stale else "hit")
+        return record, stale
+
+    def put_many(self, records: List[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """Store fetched records, evicting least recently used symbols past the cap"""
+        now = now if now is not None else time.monotonic()
+        evicted = 0
+        with self._lock:
+            for record in records:
+                symbol = record.get("symbol")
+                if not symbol:
+                    continue
+                self._entries[symbol] = (record, now)
+                self._entries.move_to_end(symbol)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            size = len(self._entries)
+        if evicted:
+            metrics.quote_cache_evictions.inc(evicted, reason="capacity")
+        metrics.quote_cache_size.set(size)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "fresh_seconds": self.fresh_seconds,
+            "max_age_seconds": self.max_age_seconds,
+        }
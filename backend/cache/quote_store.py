@@ -0,0 +1,115 @@
+"""
+Quote Store
+SQLite tables shared by the workers of one deployment: followers queue
+on-demand symbols for the leader, the leader stores what it fetched
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+# (symbol, record or None if Yahoo has no quote for it, fetched_at epoch seconds)
+Row = Tuple[str, Optional[Dict[str, Any]], float]
+
+
+class QuoteStore:
+    """
+    On-demand request queue and fetched quotes in one WAL database
+
+    Every fetched batch gets the next sequence number, so a follower reads
+    only what is new since its last poll (one indexed range query).
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite file (lives in the data directory)
+        """
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The database, opened (and created if needed) on first use; call with _lock held"""
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS quote_requests (
+                    symbol TEXT PRIMARY KEY,
+                    requested_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS quotes (
+                    symbol TEXT PRIMARY KEY,
+                    record TEXT,
+                    fetched_at REAL NOT NULL,
+                    seq INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_quotes_seq ON quotes(seq);
+            """)
+            db.commit()
+            self._db = db
+        return self._db
+
+    def request(self, symbols: List[str]) -> None:
+        """Queue symbols for the leader (already queued ones keep their place)"""
+        if not symbols:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            with db:
+                db.executemany(
+                    "INSERT OR IGNORE INTO quote_requests (symbol, requested_at) VALUES (?, ?)",
+                    [(symbol, now) for symbol in symbols]
+                )
+
+    def take_requests(self) -> List[str]:
+        """Remove and return every queued symbol, oldest first (leader)"""
+        with self._lock:
+            db = self._connection()
+            with db:
+                rows = db.execute("SELECT symbol FROM quote_requests ORDER BY requested_at").fetchall()
+                db.execute("DELETE FROM quote_requests")
+        return [symbol for (symbol,) in rows]
+
+    def put(self, records: List[Dict[str, Any]], missing: List[str], max_age_seconds: float) -> None:
+        """Store one fetched batch and drop entries older than max_age_seconds (leader)"""
+        now = time.time()
+        rows = [(record["symbol"], json.dumps(record, default=str)) for record in records]
+        rows.extend((symbol, None) for symbol in missing)
+        with self._lock:
+            db = self._connection()
+            with db:
+                seq = db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM quotes").fetchone()[0]
+                db.executemany(
+                    "INSERT OR REPLACE INTO quotes (symbol, record, fetched_at, seq) VALUES (?, ?, ?, ?)",
+                    [(symbol, record, now, seq) for symbol, record in rows]
+                )
+                db.execute("DELETE FROM quotes WHERE fetched_at < ?", (now - max_age_seconds,))
+
+    def updated_since(self, seq: int) -> Tuple[List[Row], int]:
+        """
+        Quotes stored after sequence number `seq` (followers)
+
+        Returns:
+            (rows, sequence number to pass next time)
+        """
+        with self._lock:
+            db = self._connection()
+            rows = db.execute(
+                "SELECT symbol, record, fetched_at, seq FROM quotes WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+        if not rows:
+            return [], seq
+        return [
+            (symbol, json.loads(record) if record is not None else None, fetched_at)
+            for symbol, record, fetched_at, _ in rows
+        ], rows[-1][3]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
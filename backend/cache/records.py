@@ -0,0 +1,239 @@
+"""
+Compact Records
+Slotted, read-only quote records for the cache: timestamps as epoch
+microseconds and per-symbol metadata (key, name, pair, field layout) held
+once in a shared table instead of being repeated in every record
+"""
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Record fields with a dedicated slot; anything else goes to Quote.extra
+META_FIELDS = ("symbol", "code", "name", "pair")
+VALUE_SLOTS: Dict[str, str] = {
+    "price": "price",
+    "rate": "price",  # forex quotes its price as 'rate'
+    "change": "change",
+    "change_percent": "change_percent",
+    "volume": "volume",
+    "market_cap": "market_cap",
+    "source": "source",
+}
+
+
+def to_epoch_us(raw_value: Any) -> Optional[int]:
+    """ISO timestamp (naive local, as the fetchers write it) -> epoch microseconds"""
+    if not isinstance(raw_value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(raw_value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        return None  # Would not render back identically; kept verbatim in extra
+    return round(parsed.timestamp() * 1_000_000)
+
+
+@lru_cache(maxsize=4096)
+def iso_timestamp(epoch_us: int) -> str:
+    """Epoch microseconds -> the ISO string the fetcher wrote (records of a batch share it)"""
+    seconds, micros = divmod(epoch_us, 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=micros).isoformat()
+
+
+class SymbolMeta:
+    """Per-symbol metadata shared by every record of that symbol"""
+
+    __slots__ = ("key_field", "key", "name", "pair", "fields")
+
+    def __init__(self, key_field: str, key: str, name: Any, pair: Any, fields: Tuple[str, ...]):
+        self.key_field = key_field
+        self.key = key
+        self.name = name
+        self.pair = pair
+        self.fields = fields  # Record keys in their original order
+
+
+class SymbolTable:
+    """
+    Interned SymbolMeta per record key
+
+    A symbol keeps one SymbolMeta for as long as its name, pair and field
+    layout stay the same, so a refresh only allocates the changing values.
+    Writers may compact concurrently: a race at worst creates two equal
+    metas for a symbol, so the table needs no lock of its own.
+    """
+
+    def __init__(self):
+        self._metas: Dict[str, SymbolMeta] = {}
+        self._layouts: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._metas)
+
+    def meta(self, key_field: str, key: str, name: Any, pair: Any, fields: Tuple[str, ...]) -> SymbolMeta:
+        meta = self._metas.get(key)
+        if meta is not None and meta.key_field == key_field and meta.name == name and meta.pair == pair and meta.fields == fields:
+            return meta
+        fields = self._layouts.setdefault(fields, tuple(sys.intern(field) for field in fields))
+        meta = SymbolMeta(
+            sys.intern(key_field),
+            sys.intern(key),
+            sys.intern(name) if isinstance(name, str) else name,
+            sys.intern(pair) if isinstance(pair, str) else pair,
+            fields
+        )
+        self._metas[meta.key] = meta
+        return meta
+
+
+class Quote(Mapping):
+    """
+    One cached record
+
+    Reads like the dict the fetcher produced (`record["price"]`,
+    `record.get("symbol")`, `{**record}`, JSON encoding via `to_dict()`),
+    'timestamp' included, but is a single slotted object: no per-record
+    dict, ISO string or name. Treat it as immutable; writers build new ones.
+    """
+
+    __slots__ = ("meta", "price", "change", "change_percent", "volume", "market_cap", "epoch_us", "source", "extra")
+
+    def __init__(self, meta: SymbolMeta, epoch_us: Optional[int] = None, extra: Optional[Dict[str, Any]] = None):
+        self.meta = meta
+        self.price: Any = None
+        self.change: Any = None
+        self.change_percent: Any = None
+        self.volume: Any = None
+        self.market_cap: Any = None
+        self.epoch_us = epoch_us
+        self.source: Any = None
+        self.extra = extra
+
+    def __getitem__(self, field: str) -> Any:
+        meta = self.meta
+        if field not in meta.fields:
+            if self.extra is not None and field in self.extra:
+                return self.extra[field]
+            raise KeyError(field)
+        if field == "timestamp":
+            return iso_timestamp(self.epoch_us)  # type: ignore[arg-type]
+        slot = VALUE_SLOTS.get(field)
+        if slot is not None:
+            return getattr(self, slot)
+        if field == meta.key_field:
+            return meta.key
+        return meta.name if field == "name" else meta.pair
+
+    def get(self, field: str, default: Any = None) -> Any:
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def __contains__(self, field: object) -> bool:
+        return field in self.meta.fields or (self.extra is not None and field in self.extra)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.meta.fields
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self.meta.fields) + (len(self.extra) if self.extra is not None else 0)
+
+    def __repr__(self) -> str:
+        return f"Quote({self.to_dict()!r})"
+
+    @property
+    def key(self) -> str:
+        return self.meta.key
+
+    @property
+    def fetched_at(self) -> Optional[float]:
+        """Fetch time in epoch seconds (None if the record had no usable timestamp)"""
+        return self.epoch_us / 1_000_000 if self.epoch_us is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record as the plain dict the fetcher produced"""
+        return {field: self[field] for field in self}
+
+    def project(self, fields: Tuple[str, ...]) -> Dict[str, Any]:
+        """Only `fields`, None where missing (the shape of the response models)"""
+        return {field: self.get(field) for field in fields}
+
+
+def compact(record: Mapping, table: SymbolTable, source: Optional[str] = None) -> Optional[Quote]:
+    """
+    Build a Quote from a fetched (or persisted) record
+
+    Args:
+        record: Dict with 'symbol' or 'code'
+        table: Metadata table shared by the cache
+        source: Override the record's source (e.g. 'disk' when restoring);
+            mock records keep 'mock' so a restart cannot pass them off as real
+
+    Returns:
+        The Quote, or None if the record has no symbol/code
+    """
+    if source is not None and record.get("source") == "mock":
+        source = None
+    if isinstance(record, Quote):
+        if source is None or record.source == source:
+            return record
+        record = record.to_dict()
+
+    key_field = "symbol" if record.get("symbol") else "code"
+    key = record.get(key_field)
+    if not key:
+        return None
+
+    fields: List[str] = []
+    extra: Optional[Dict[str, Any]] = None
+    epoch_us: Optional[int] = None
+    for field, value in record.items():
+        if field == "timestamp":
+            epoch_us = to_epoch_us(value)
+            if epoch_us is None:
+                extra = extra or {}
+                extra[field] = value
+                continue
+        elif field not in VALUE_SLOTS and field not in META_FIELDS:
+            extra = extra or {}
+            extra[field] = value
+            continue
+        elif field in META_FIELDS and field not in (key_field, "name", "pair"):
+            # The other key field ('code' on a symbol record): rare, kept verbatim
+            extra = extra or {}
+            extra[field] = value
+            continue
+        fields.append(field)
+    if source is not None and "source" not in fields:
+        fields.append("source")
+
+    quote = Quote(table.meta(key_field, key, record.get("name"), record.get("pair"), tuple(fields)), epoch_us, extra)
+    quote.price = record.get("price", record.get("rate"))
+    quote.change = record.get("change")
+    quote.change_percent = record.get("change_percent")
+    quote.volume = record.get("volume")
+    quote.market_cap = record.get("market_cap")
+    source = source if source is not None else record.get("source")
+    quote.source = sys.intern(source) if isinstance(source, str) else source
+    return quote
+
+
+def compact_many(records: List[Mapping], table: SymbolTable, source: Optional[str] = None) -> List[Quote]:
+    """compact() a list, dropping records without a symbol/code"""
+    quotes = []
+    for record in records:
+        quote = compact(record, table, source)
+        if quote is not None:
+            quotes.append(quote)
+    return quotes
+
+
+def to_dicts(records: List[Mapping]) -> List[Dict[str, Any]]:
+    """Plain dicts for JSON persistence"""
+    return [record.to_dict() if isinstance(record, Quote) else dict(record) for record in records]
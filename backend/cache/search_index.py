@@ -0,0 +1,180 @@
+"""
+Search Index
+Sorted-prefix token index with Turkish-aware case folding, for type-ahead
+lookups over symbols, fund codes and names
+"""
+import re
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Turkish dotted/dotless I lowercase differently from str.lower(); everything
+# is then folded to ASCII so "is", "İŞ" and "iş" all match
+_TURKISH_UPPER = str.maketrans({"İ": "i", "I": "ı"})
+_ASCII = str.maketrans({"ı": "i", "ş": "s", "ğ": "g", "ü": "u", "ö": "o", "ç": "c", "â": "a", "î": "i", "û": "u"})
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Yahoo market markers glued to a symbol (THYAO.IS, TRY=X, GC=F): as tokens, "is"
+# would match every BIST stock, so they are cut before tokenizing
+_SYMBOL_SUFFIX = re.compile(r"(?<=[a-z0-9])(?:\.is|=x|=f)(?![a-z0-9])")
+_MAX_CHAR = chr(0x10FFFF)  # Sorts after any character a prefix can be followed by
+
+
+def fold(text: str) -> str:
+    """Case- and diacritic-insensitive form of `text` (Turkish casing rules)"""
+    return text.translate(_TURKISH_UPPER).lower().translate(_ASCII)
+
+
+def tokenize(text: str) -> List[str]:
+    """Folded alphanumeric tokens, symbol suffixes dropped ("THYAO.IS" -> ["thyao"])"""
+    return _TOKEN.findall(_SYMBOL_SUFFIX.sub("", fold(text)))
+
+
+def prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    """[start, end) of the sorted `keys` starting with `prefix`"""
+    start = bisect_left(keys, prefix)
+    return start, bisect_left(keys, prefix + _MAX_CHAR, start)
+
+
+def _insert(keys: List[str], doc_ids: List[str], key: str, doc_id: str) -> None:
+    """Insert into parallel columns kept sorted by (key, doc_id)"""
+    i = bisect_left(keys, key)
+    while i < len(keys) and keys[i] == key and doc_ids[i] < doc_id:
+        i += 1
+    keys.insert(i, key)
+    doc_ids.insert(i, doc_id)
+
+
+def _remove(keys: List[str], doc_ids: List[str], key: str, doc_id: str) -> None:
+    i = bisect_left(keys, key)
+    while i < len(keys) and keys[i] == key:
+        if doc_ids[i] == doc_id:
+            del keys[i]
+            del doc_ids[i]
+            return
+        i += 1
+
+
+class PrefixIndex:
+    """
+    Documents searchable by token prefix, ranked for type-ahead
+
+    A document has a key (symbol / fund code), a name and optional extra
+    texts. Three sorted columns are kept: every folded token, the folded
+    keys and the folded names, each next to its doc id, so the documents
+    starting with a prefix form one contiguous range found by two
+    bisections. A query matches documents having a token that starts with
+    each query token.
+
+    Documents can be added and removed one at a time (list inserts, no
+    rebuild). Not thread-safe: callers serialize writes against reads.
+    """
+
+    def __init__(self, documents: Optional[Dict[str, Tuple[str, ...]]] = None):
+        """
+        Args:
+            documents: doc_id -> (key, name, *extra texts), bulk-loaded
+        """
+        # doc_id -> (folded key, folded name, tokens)
+        self._docs: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+            doc_id: self._fields(texts) for doc_id, texts in (documents or {}).items()
+        }
+        self._tokens, self._token_docs = self._columns(
+            (token, doc_id) for doc_id, (_, _, tokens) in self._docs.items() for token in tokens
+        )
+        self._keys, self._key_docs = self._columns((key, doc_id) for doc_id, (key, _, _) in self._docs.items())
+        self._names, self._name_docs = self._columns((name, doc_id) for doc_id, (_, name, _) in self._docs.items())
+
+    @staticmethod
+    def _fields(texts: Tuple[str, ...]) -> Tuple[str, str, Tuple[str, ...]]:
+        key, name = texts[0], (texts[1] if len(texts) > 1 else "") or ""
+        tokens = sorted({token for text in texts if text for token in tokenize(text)})
+        return fold(key), fold(name), tuple(tokens)
+
+    @staticmethod
+    def _columns(pairs: Iterable[Tuple[str, str]]) -> Tuple[List[str], List[str]]:
+        """Parallel (sorted values, doc ids) columns: bisect on the first, slice the second"""
+        ordered = sorted(pairs)
+        return [value for value, _ in ordered], [doc_id for _, doc_id in ordered]
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._docs
+
+    def add(self, doc_id: str, *texts: str) -> None:
+        """Index (or re-index) a document: key, name, then any extra texts"""
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        key, name, tokens = self._docs[doc_id] = self._fields(texts)
+        for token in tokens:
+            _insert(self._tokens, self._token_docs, token, doc_id)
+        _insert(self._keys, self._key_docs, key, doc_id)
+        _insert(self._names, self._name_docs, name, doc_id)
+
+    def remove(self, doc_id: str) -> None:
+        fields = self._docs.pop(doc_id, None)
+        if fields is None:
+            return
+        key, name, tokens = fields
+        for token in tokens:
+            _remove(self._tokens, self._token_docs, token, doc_id)
+        _remove(self._keys, self._key_docs, key, doc_id)
+        _remove(self._names, self._name_docs, name, doc_id)
+
+    def _prefixed(self, prefix: str) -> Set[str]:
+        """Documents with a token starting with `prefix`"""
+        start, end = prefix_range(self._tokens, prefix)
+        return set(self._token_docs[start:end])
+
+    def matches(self, query: str) -> Set[str]:
+        """Documents matching every token of `query` by prefix (unranked)"""
+        tokens = tokenize(query)
+        if not tokens:
+            return set()
+        # Longest tokens first: they have the narrowest ranges
+        tokens.sort(key=len, reverse=True)
+        found = self._prefixed(tokens[0])
+        for token in tokens[1:]:
+            if not found:
+                break
+            found &= self._prefixed(token)
+        return found
+
+    def search(self, query: str, limit: int = 20, accept: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """
+        Best `limit` doc ids for `query`
+
+        Ranked: exact key, key prefix, name prefix (by name), then any
+        token match (by key). Each tier is walked in sorted order and the
+        walk stops at `limit`, so broad one-letter queries that match most
+        documents cost about as much as narrow ones.
+
+        Args:
+            accept: Keep only doc ids it returns True for
+        """
+        matches = self.matches(query)
+        if accept is not None:
+            matches = {doc_id for doc_id in matches if accept(doc_id)}
+        if not matches:
+            return []
+        folded = fold(query.strip())
+        ranked: List[str] = []
+        seen: Set[str] = set()
+
+        def take(doc_ids: List[str]) -> bool:
+            for doc_id in doc_ids:
+                if doc_id in matches and doc_id not in seen:
+                    seen.add(doc_id)
+                    ranked.append(doc_id)
+                    if len(ranked) == limit:
+                        return True
+            return len(ranked) == len(matches)
+
+        start, end = prefix_range(self._keys, folded)  # An exact key sorts first in its range
+        if take(self._key_docs[start:end]):
+            return ranked
+        start, end = prefix_range(self._names, folded)
+        if take(self._name_docs[start:end]):
+            return ranked
+        take(self._key_docs)
+        return ranked
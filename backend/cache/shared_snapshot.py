@@ -0,0 +1,185 @@
+"""
+Shared Snapshot - Single Fetcher, Many Readers
+The leader process publishes cache snapshots into an mmap'd file guarded by a
+sequence word (seqlock); follower workers poll it and copy new versions in.
+
+Followers keep their own unpickled copy (and derived views) rather than
+reading records out of the mapped buffer: every read path works on Quote
+objects, so the gain is one fetcher instead of N and a cheap "nothing
+changed" check, not lower memory per worker.
+"""
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from typing import Dict, Any, Optional, IO
+import logging
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Header: sequence word (odd while a write is in progress), payload length,
+# and the version of a snapshot the leader failed to publish (0 = none)
+_SEQUENCE = struct.Struct("<Q")
+_LENGTH = struct.Struct("<Q")
+_FAILED = struct.Struct("<Q")
+_FAILED_OFFSET = _SEQUENCE.size + _LENGTH.size
+_HEADER_SIZE = _FAILED_OFFSET + _FAILED.size
+
+
+class SharedSnapshot:
+    """
+    Seqlock-protected snapshot region backed by a memory-mapped file
+
+    Writers bump the sequence to an odd value, copy the payload, then bump it
+    to the next even value. Readers retry if the sequence is odd or changed
+    while they were copying, so they never observe a torn snapshot.
+
+    A snapshot that doesn't fit the region is not published: the leader
+    records its version in the header instead, so every worker can report
+    that followers are serving older data (status(), /health, /metrics).
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Args:
+            path: Backing file (lives in the data directory)
+            max_bytes: Fixed size of the mapped region
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < max_bytes:
+                os.ftruncate(fd, max_bytes)
+            self._mm = mmap.mmap(fd, max_bytes)
+        finally:
+            os.close(fd)
+        self._write_lock = threading.Lock()
+        self._last_sequence = 0
+        self.version: Optional[int] = None  # Of the last snapshot published or read here
+        self.payload_bytes = 0
+        self.publish_failures = 0
+
+    def _sequence(self) -> int:
+        return _SEQUENCE.unpack_from(self._mm, 0)[0]
+
+    def failed_version(self) -> Optional[int]:
+        """Version the leader could not publish since its last successful snapshot (None if none)"""
+        return _FAILED.unpack_from(self._mm, _FAILED_OFFSET)[0] or None
+
+    def publish(self, state: Dict[str, Any]) -> bool:
+        """
+        Write a new snapshot (leader only)
+
+        Snapshots older than the last one published are skipped: writers
+        publish from their own threads and may finish out of order.
+
+        Returns:
+            False if the serialized snapshot does not fit the region
+        """
+        version = state.get("version")
+        payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._write_lock:
+            if version is not None and self.version is not None and version < self.version:
+                return True
+            if _HEADER_SIZE + len(payload) > self.max_bytes:
+                self.publish_failures += 1
+                _FAILED.pack_into(self._mm, _FAILED_OFFSET, version or 1)
+                metrics.shared_snapshot_publish_failures.inc()
+                logger.error(
+                    f"❌ Snapshot too large for shared region ({len(payload)} bytes > {self.max_bytes}) - "
+                    f"followers keep serving version {self.version}"
+                )
+                return False
+
+            sequence = self._sequence()
+            writing = sequence + 1 if sequence % 2 == 0 else sequence + 2  # Recover from a crashed writer
+            _SEQUENCE.pack_into(self._mm, 0, writing)
+            self._mm[_HEADER_SIZE:_HEADER_SIZE + len(payload)] = payload
+            _LENGTH.pack_into(self._mm, _SEQUENCE.size, len(payload))
+            _FAILED.pack_into(self._mm, _FAILED_OFFSET, 0)
+            _SEQUENCE.pack_into(self._mm, 0, writing + 1)
+            self._last_sequence = writing + 1
+            self.version = version
+            self.payload_bytes = len(payload)
+        metrics.shared_snapshot_bytes.set(len(payload))
+        return True
+
+    def read_if_changed(self, retries: int = 50) -> Optional[Dict[str, Any]]:
+        """
+        Return the latest snapshot if it changed since the last read
+
+        Costs one 8-byte read when nothing changed.
+        """
+        for _ in range(retries):
+            before = self._sequence()
+            if before == 0 or before == self._last_sequence:
+                return None
+            if before % 2:
+                time.sleep(0.001)  # Writer in progress
+                continue
+            length = _LENGTH.unpack_from(self._mm, _SEQUENCE.size)[0]
+            payload = self._mm[_HEADER_SIZE:_HEADER_SIZE + length]
+            if self._sequence() == before:
+                self._last_sequence = before
+                state = pickle.loads(payload)
+                self.version = state.get("version")
+                self.payload_bytes = length
+                return state
+        logger.warning("⚠️  Gave up reading shared snapshot (writer too busy)")
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot health for /health: followers are behind while failed_version is set"""
+        failed = self.failed_version()
+        metrics.shared_snapshot_behind.set(1.0 if failed else 0.0)
+        return {
+            "version": self.version,
+            "bytes": self.payload_bytes,
+            "max_bytes": self.max_bytes,
+            "failed_version": failed,
+            "publish_failures": self.publish_failures,
+        }
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+class LeaderLock:
+    """
+    Non-blocking exclusive file lock deciding which worker owns the scheduler
+
+    The OS releases the lock when the holder exits, so a follower can take
+    over by retrying try_acquire().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._handle: Optional[IO[str]] = None
+
+    @property
+    def held(self) -> bool:
+        return self._handle is not None
+
+    def try_acquire(self) -> bool:
+        if self._handle is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            # No flock (Windows): single-process deployment only
+            logger.warning("⚠️  File locking unavailable - assuming leadership")
+            self._handle = open(self.path, "a")
+            return True
+
+        handle = open(self.path, "a")
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._handle = handle
+        return True
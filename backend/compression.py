@@ -0,0 +1,165 @@
+"""
+Response Compression
+gzip / brotli negotiation and per-cache-version precompressed JSON bodies
+for the snapshot endpoints (everything else goes through GZipMiddleware)
+"""
+import gzip
+import json
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+from config import settings
+import metrics
+
+# Preferred first when the client accepts several with the same q-value
+ENCODINGS = ("br", "gzip")
+
+
+def _brotli() -> Any:
+    """brotli module if installed (optional dependency), else None"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ENCODINGS if _brotli() is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, supported: Tuple[str, ...]) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header
+
+    Returns:
+        "br", "gzip" or None (identity)
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+
+    best: Optional[str] = None
+    best_q = 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _brotli().compress(body, quality=settings.PRECOMPRESS_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.PRECOMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def render_json(content: Any) -> bytes:
+    """Same bytes FastAPI's JSONResponse would send"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class _Variants:
+    """Rendered body of one key at one cache version, plus its compressed forms"""
+
+    __slots__ = ("version", "body", "encoded")
+
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        self.encoded: Dict[str, bytes] = {}
+
+
+class PrecompressedResponses:
+    """
+    JSON bodies rendered once per cache version, compressed once per encoding
+
+    Snapshot endpoints return the same bytes to every client until the
+    cache version moves, so rendering and compressing per request would be
+    wasted work. Bodies below `min_bytes` are always sent uncompressed.
+
+    lookup() never blocks and is safe on the event loop: a new version is
+    published by swapping in a fresh _Variants, and an encoding by a single
+    dict store. get() does the rendering and compressing, so callers on the
+    event loop run it in the threadpool.
+    """
+
+    def __init__(self, min_bytes: int = settings.COMPRESSION_MIN_BYTES):
+        self.min_bytes = min_bytes
+        self.supported = supported_encodings()
+        self._entries: Dict[str, _Variants] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _cached(self, key: str, version: int, encoding: Optional[str]) -> Optional[Tuple[bytes, Optional[str]]]:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            return None
+        if encoding is None or len(entry.body) < self.min_bytes:
+            return entry.body, None
+        body = entry.encoded.get(encoding)
+        return (body, encoding) if body is not None else None
+
+    def lookup(self, key: str, version: int, accept_encoding: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """
+        Body for `key` at `version` if it is already rendered in the negotiated encoding
+
+        Returns:
+            (body, content encoding or None for identity), or None on a miss
+        """
+        cached = self._cached(key, version, negotiate(accept_encoding, self.supported))
+        if cached is not None:
+            metrics.cache_requests.inc(cache="responses", result="hit")
+        return cached
+
+    def get(self, key: str, version: int, build: Callable[[], Any], accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """
+        Body for `key` at `version` in the best encoding the client accepts
+
+        Blocking: renders and compresses on a miss.
+
+        Args:
+            build: Produces the JSON content; only called when the version moved
+
+        Returns:
+            (body, content encoding or None for identity)
+        """
+        encoding = negotiate(accept_encoding, self.supported)
+        # Per-key lock: concurrent requests for a new version wait for one render instead of all rendering
+        with self._key_lock(key):
+            cached = self._cached(key, version, encoding)
+            if cached is not None:
+                metrics.cache_requests.inc(cache="responses", result="hit")
+                return cached
+
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                entry = _Variants(version, render_json(build()))
+                self._entries[key] = entry
+                metrics.response_renders.inc(route=key, encoding="identity")
+            metrics.cache_requests.inc(cache="responses", result="miss")
+
+            if encoding is None or len(entry.body) < self.min_bytes:
+                return entry.body, None
+            body = entry.encoded[encoding] = compress(entry.body, encoding)
+            metrics.response_renders.inc(route=key, encoding=encoding)
+            return body, encoding
+
+
+# Global precompressed response store
+snapshot_responses = PrecompressedResponses()
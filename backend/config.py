@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Dict, FrozenSet, Optional
 
 class Settings:
     """Application configuration"""
@@ -11,17 +11,50 @@ class Settings:
     
     # Paths
     BASE_DIR: str = os.path.dirname(os.path.abspath(__file__))
-    DATA_DIR: str = os.path.join(BASE_DIR, "data")
+    DATA_DIR: str = os.getenv("ALGORIST_DATA_DIR", os.path.join(BASE_DIR, "data"))
     
     # Cache files
     MARKET_DATA_FILE: str = os.path.join(DATA_DIR, "market_data.json")
     FUNDS_DATA_FILE: str = os.path.join(DATA_DIR, "funds_data.json")
+    ALERTS_DB_FILE: str = os.path.join(DATA_DIR, "alerts.db")
+    
+    # Cache backend: file (JSON under DATA_DIR) | log (change log + checkpoints) | memory | redis
+    CACHE_BACKEND: str = os.getenv("ALGORIST_CACHE_BACKEND", "file")
+    LOG_CHECKPOINT_ENTRIES: int = int(os.getenv("ALGORIST_LOG_CHECKPOINT_ENTRIES", "1000"))  # Compact the log after this many changes
+    REDIS_URL: str = os.getenv("ALGORIST_REDIS_URL", "redis://localhost:6379/0")
+    REDIS_KEY_PREFIX: str = "algorist"
+    
+    # Multi-worker deployment: one leader runs the scheduler and publishes
+    # snapshots, the other workers copy them in as they change.
+    # auto = first worker to grab LEADER_LOCK_FILE leads, standalone = no sharing.
+    # Defaults to auto only when several workers are started (WEB_CONCURRENCY is
+    # what uvicorn and gunicorn read for their worker count), so a single process
+    # never creates the snapshot file or takes the lock.
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    WORKER_ROLE: str = os.getenv("ALGORIST_ROLE", "auto" if WEB_CONCURRENCY > 1 else "standalone")  # auto | leader | follower | standalone
+    LEADER_LOCK_FILE: str = os.path.join(DATA_DIR, "leader.lock")
+    SHARED_SNAPSHOT_FILE: str = os.path.join(DATA_DIR, "snapshot.shm")
+    SHARED_SNAPSHOT_MAX_BYTES: int = 64 * 1024 * 1024
+    SHARED_SNAPSHOT_POLL_SECONDS: float = 0.5
     
     # Scheduler intervals
     HIGH_FREQ_INTERVAL_MINUTES: int = 15  # Full cycle: Every 15 minutes
     STOCK_GROUP_INTERVAL_MINUTES: int = 3  # Each group: Every 3 minutes
     FUND_FETCH_TIMES: List[str] = ["10:00", "14:00", "18:00"]  # Group B: 3x daily
     
+    # Fund catalog: every TEFAS fund's name, type and company, refreshed daily
+    FUND_CATALOG_FILE: str = os.path.join(DATA_DIR, "fund_catalog.json")
+    FUND_CATALOG_TIME: str = "09:30"  # Before the first Group B fetch
+    FUND_CATALOG_MAX_AGE_HOURS: int = 24  # Older at startup -> refreshed right away
+    FUND_KINDS: Dict[str, str] = {  # TEFAS fund kind -> type label
+        "YAT": "Mutual Fund",
+        "EMK": "Pension Fund",
+        "BYF": "Exchange Traded Fund",
+    }
+    FUND_CATALOG_RELOAD_SECONDS: int = 60  # Followers check the file for a newer catalog this often
+    FUND_SEARCH_MAX_LIMIT: int = 50
+    SEARCH_MAX_LIMIT: int = 50  # /api/search results per query
+    
     # BIST100 Stock Symbols - ALL 100 stocks split into 5 groups (20 each)
     # Each group fetched every 3 minutes to avoid rate limiting
     # Cycle: 0min → 3min → 6min → 9min → 12min → repeats at 15min
@@ -67,6 +100,65 @@ class Settings:
         BIST100_GROUP_4 + BIST100_GROUP_5
     )
     
+    # Static sector classification for the BIST universe (used by market
+    # aggregates and the screener). Unlisted symbols fall back to "Other".
+    STOCK_SECTORS: Dict[str, str] = {
+        # Banking & financials
+        "GARAN.IS": "Banking", "AKBNK.IS": "Banking", "YKBNK.IS": "Banking",
+        "ISCTR.IS": "Banking", "HALKB.IS": "Banking", "VAKBN.IS": "Banking",
+        "TSKB.IS": "Banking", "SKBNK.IS": "Banking",
+        "TURSG.IS": "Insurance", "ISMEN.IS": "Financial Services",
+        # Holdings
+        "SAHOL.IS": "Holding", "KCHOL.IS": "Holding", "DOHOL.IS": "Holding",
+        "ALARK.IS": "Holding", "GLYHO.IS": "Holding", "IHLAS.IS": "Holding",
+        "NTHOL.IS": "Holding",
+        # Industrials
+        "EREGL.IS": "Metals", "KRDMD.IS": "Metals", "BRSAN.IS": "Metals", "IZMDC.IS": "Metals",
+        "SISE.IS": "Glass & Ceramics", "TRKCM.IS": "Glass & Ceramics",
+        "PETKM.IS": "Chemicals", "SASA.IS": "Chemicals", "SODA.IS": "Chemicals",
+        "GUBRF.IS": "Chemicals", "AKSA.IS": "Chemicals", "KLKIM.IS": "Chemicals",
+        "MERCN.IS": "Chemicals",
+        "OYAKC.IS": "Construction Materials", "CIMSA.IS": "Construction Materials",
+        "KUTPO.IS": "Construction Materials", "KONYA.IS": "Construction Materials",
+        "GENTS.IS": "Construction Materials",
+        "ENKAI.IS": "Construction",
+        "TMSN.IS": "Machinery", "MAKTK.IS": "Machinery",
+        "ASELS.IS": "Defense",
+        "KORDS.IS": "Textiles", "VAKKO.IS": "Textiles",
+        # Automotive
+        "TOASO.IS": "Automotive", "FROTO.IS": "Automotive", "TTRAK.IS": "Automotive",
+        "DOAS.IS": "Automotive", "GOODY.IS": "Automotive", "KARSN.IS": "Automotive",
+        "OTKAR.IS": "Automotive", "PARSN.IS": "Automotive", "EGEEN.IS": "Automotive",
+        # Energy & mining
+        "TUPRS.IS": "Energy", "ODAS.IS": "Energy", "ENJSA.IS": "Energy",
+        "AYGAZ.IS": "Energy", "ZOREN.IS": "Energy",
+        "KOZAL.IS": "Mining", "KOZAA.IS": "Mining", "PRKME.IS": "Mining",
+        # Transportation & telecom
+        "THYAO.IS": "Transportation", "PGSUS.IS": "Transportation", "TAVHL.IS": "Transportation",
+        "TTKOM.IS": "Telecom", "TCELL.IS": "Telecom",
+        # Technology
+        "KONTR.IS": "Technology", "INDES.IS": "Technology", "LOGO.IS": "Technology",
+        "REEDR.IS": "Technology",
+        # Consumer
+        "VESTL.IS": "Consumer Durables", "ARCLK.IS": "Consumer Durables",
+        "KLMSN.IS": "Consumer Durables", "VESBE.IS": "Consumer Durables",
+        "YATAS.IS": "Consumer Durables",
+        "BIMAS.IS": "Retail", "MGROS.IS": "Retail", "SOKM.IS": "Retail",
+        "MAVI.IS": "Retail", "TKNSA.IS": "Retail", "CRFSA.IS": "Retail",
+        "AEFES.IS": "Food & Beverage", "ULKER.IS": "Food & Beverage",
+        "CCOLA.IS": "Food & Beverage", "TATGD.IS": "Food & Beverage",
+        "TBORG.IS": "Food & Beverage", "KERVT.IS": "Food & Beverage",
+        "PINSU.IS": "Food & Beverage",
+        "BJKAS.IS": "Sports",
+        # Healthcare
+        "MPARK.IS": "Healthcare", "SELEC.IS": "Healthcare", "GENIL.IS": "Healthcare",
+        "TRILC.IS": "Healthcare",
+        # Real estate
+        "EKGYO.IS": "Real Estate", "SNGYO.IS": "Real Estate", "DZGYO.IS": "Real Estate",
+        "IHLGM.IS": "Real Estate", "NUGYO.IS": "Real Estate", "RYGYO.IS": "Real Estate",
+        "SRVGY.IS": "Real Estate", "TRGYO.IS": "Real Estate",
+    }
+    
     # Forex pairs
     FOREX_SYMBOLS: List[str] = [
         "TRY=X",      # USD/TRY
@@ -80,9 +172,119 @@ class Settings:
         "SI=F"   # Silver Futures
     ]
     
+    # Leaderboard (movers) indexes maintained by the cache
+    MOVER_FIELDS: List[str] = ["change_percent", "volume", "market_cap"]
+    MOVERS_MAX_LIMIT: int = 50
+    
+    # Screener: numeric fields mirrored into the columnar (NumPy) stock view
+    SCREENER_FIELDS: List[str] = ["price", "change", "change_percent", "volume", "market_cap"]
+    SCREENER_MAX_LIMIT: int = 500
+    
+    # Cursor pagination for /api/stocks and /api/funds (ordered by symbol / fund code)
+    PAGE_DEFAULT_LIMIT: int = 100
+    PAGE_MAX_LIMIT: int = 1000
+    PAGE_SNAPSHOT_VERSIONS: int = 16  # Versions a cursor can stay pinned to (a few refresh cycles)
+    
+    # Market summary: cap-weighted index proxy starts at this level
+    MARKET_INDEX_BASE: float = 10000.0
+    
+    # Freshness SLO: max acceptable age per asset type (seconds)
+    FRESHNESS_SLO_SECONDS: Dict[str, int] = {
+        "stocks": int(os.getenv("ALGORIST_FRESHNESS_SLO_SECONDS", "1200")),  # One cycle + 5 min slack
+        "forex": int(os.getenv("ALGORIST_FRESHNESS_SLO_SECONDS", "1200")),
+        "commodities": int(os.getenv("ALGORIST_FRESHNESS_SLO_SECONDS", "1200")),
+        "funds": 86400,  # Funds price once a day
+    }
+    FRESHNESS_CHECK_MINUTES: int = 5  # How often the scheduler re-fetches SLO breaches
+    FRESHNESS_MAX_REFETCH: int = 10   # Max stale symbols re-fetched per check
+    
+    # Circuit breakers (one per Yahoo endpoint): open after N consecutive failures,
+    # then probe once per timeout; each failed probe doubles the wait up to the max
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("ALGORIST_BREAKER_FAILURE_THRESHOLD", "3"))
+    BREAKER_TIMEOUT_SECONDS: int = int(os.getenv("ALGORIST_BREAKER_TIMEOUT_SECONDS", "300"))
+    BREAKER_MAX_TIMEOUT_SECONDS: int = int(os.getenv("ALGORIST_BREAKER_MAX_TIMEOUT_SECONDS", "1800"))
+    
+    # On-demand quotes for symbols outside the scheduled universe: misses are
+    # fetched in the background (rate limited) into a bounded LRU/TTL tier
+    ON_DEMAND_CACHE_SIZE: int = int(os.getenv("ALGORIST_ON_DEMAND_CACHE_SIZE", "5000"))
+    ON_DEMAND_FRESH_SECONDS: int = 900      # Older entries are served with stale=true and refreshed
+    ON_DEMAND_MAX_AGE_SECONDS: int = 86400  # Older entries are dropped
+    ON_DEMAND_BATCH_SIZE: int = 5           # Symbols per upstream request (one Yahoo chunk, no throttle)
+    ON_DEMAND_MIN_INTERVAL_SECONDS: float = float(os.getenv("ALGORIST_ON_DEMAND_MIN_INTERVAL_SECONDS", "10"))
+    ON_DEMAND_MAX_PENDING: int = 500        # Queue cap; further misses are not queued
+    ON_DEMAND_MAX_SYMBOLS: int = 50         # Max symbols per /api/quotes request
+    ON_DEMAND_DB_FILE: str = os.path.join(DATA_DIR, "on_demand.db")  # Leader/follower mode: misses forwarded to the leader
+    ON_DEMAND_SYNC_SECONDS: float = 1.0     # Followers forward misses and pick up the leader's quotes this often
+    
+    # Response compression: snapshot endpoints are compressed once per cache
+    # version (brotli if installed, gzip), the rest per request by GZipMiddleware
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("ALGORIST_COMPRESSION_MIN_BYTES", "1024"))  # Smaller bodies go out as-is
+    GZIP_LEVEL: int = 6                  # Per-request gzip (middleware)
+    PRECOMPRESS_GZIP_LEVEL: int = 9      # Paid once per cache version, so compress harder
+    PRECOMPRESS_BROTLI_QUALITY: int = 9  # 10-11 cost seconds per MB
+    
+    # HTTP caching for read endpoints: max-age runs until the next scheduled
+    # refresh of the data behind the endpoint, ETags follow the cache version
+    HTTP_CACHE_FALLBACK_SECONDS: int = 60   # max-age when no schedule is known (followers, scheduler stopped)
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 3600  # Cap (funds refresh only 3x a day; manual refreshes happen)
+    HTTP_CACHE_STALE_SECONDS: int = int(os.getenv("ALGORIST_HTTP_STALE_SECONDS", "60"))  # stale-while-revalidate
+    
+    # Ghost Mode mock data: one-factor correlated GBM around the last known prices
+    MOCK_SEED: Optional[int] = int(os.environ["ALGORIST_MOCK_SEED"]) if os.getenv("ALGORIST_MOCK_SEED") else None
+    MOCK_CORRELATION: float = 0.5  # Share of variance explained by the market-wide shock
+    MOCK_STEP_SECONDS: int = 900   # Simulated time per generate call (one fetch cycle)
+    MOCK_VOLATILITY: Dict[str, float] = {"stocks": 0.35, "forex": 0.10, "commodities": 0.20}  # Annualized
+    
+    # Replay mode: recorded or synthetic ticks replace Yahoo/TEFAS for load and soak tests
+    REPLAY_SOURCE: Optional[str] = os.getenv("ALGORIST_REPLAY") or None  # "synthetic" or a JSONL tick file
+    REPLAY_SPEED: float = float(os.getenv("ALGORIST_REPLAY_SPEED", "1440"))  # Simulated seconds per second (1 day/min)
+    REPLAY_SYMBOLS: int = int(os.getenv("ALGORIST_REPLAY_SYMBOLS", "10000"))  # Synthetic universe size
+    REPLAY_FUNDS: int = int(os.getenv("ALGORIST_REPLAY_FUNDS", "500"))
+    
+    # Alerts
+    ALERT_RECENT_EVENTS: int = 1000  # Max triggered alerts returned to polling clients
+    
     # API Settings
     CORS_ORIGINS: List[str] = ["*"]  # In production, specify your Flutter app's origin
     
+    # Admission control: per-client token buckets, per-route concurrency caps
+    # and priority load shedding, applied before a request reaches its handler
+    ADMISSION_ENABLED: bool = os.getenv("ALGORIST_ADMISSION", "on") != "off"
+    RATE_LIMIT_BACKEND: str = os.getenv("ALGORIST_RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_PER_SECOND: float = float(os.getenv("ALGORIST_RATE_LIMIT_PER_SECOND", "20"))  # Tokens refilled per client
+    RATE_LIMIT_BURST: float = float(os.getenv("ALGORIST_RATE_LIMIT_BURST", "60"))  # Bucket size
+    RATE_LIMIT_MAX_CLIENTS: int = 100_000  # Buckets kept in memory (least recently seen dropped first)
+    RATE_LIMIT_KEY_HEADER: str = "X-API-Key"  # Client key; falls back to the client IP
+    # Keys allowed their own bucket; any other X-API-Key value is ignored (else random keys dodge the limit)
+    RATE_LIMIT_API_KEYS: FrozenSet[str] = frozenset(
+        key.strip() for key in os.getenv("ALGORIST_RATE_LIMIT_API_KEYS", "").split(",") if key.strip()
+    )
+    RATE_LIMIT_TRUST_FORWARDED: bool = os.getenv("ALGORIST_TRUST_FORWARDED", "off") == "on"  # Behind a proxy
+    ADMISSION_EXEMPT_PATHS: List[str] = ["/health", "/metrics"]
+    # Priority per path prefix (longest match wins, unlisted paths are "standard")
+    ROUTE_PRIORITIES: Dict[str, str] = {
+        "/api/market-data": "snapshot",
+        "/api/stocks": "snapshot",
+        "/api/forex": "snapshot",
+        "/api/commodities": "snapshot",
+        "/api/funds": "snapshot",
+        "/api/market-summary": "snapshot",
+        "/api/search": "snapshot",  # One call per keystroke, sub-millisecond
+        "/api/screener": "expensive",
+        "/api/portfolio/value/batch": "expensive",
+        "/api/refresh": "expensive",
+    }
+    REQUEST_COSTS: Dict[str, float] = {"snapshot": 1, "standard": 2, "expensive": 5}  # Tokens per request
+    # Requests in flight (all routes) at which each priority is shed with a 503
+    SHED_THRESHOLDS: Dict[str, int] = {"expensive": 32, "standard": 128, "snapshot": 512}
+    # Concurrent requests per path prefix; extra requests get a 503 instead of queueing
+    ROUTE_CONCURRENCY: Dict[str, int] = {
+        "/api/screener": 8,
+        "/api/portfolio/value/batch": 4,
+        "/api/refresh": 1,
+        "/api/quotes": 16,
+    }
+    
     # Logging
     LOG_LEVEL: str = "INFO"
 
@@ -2,18 +2,41 @@
 Algorist Backend - Financial Data Service
 FastAPI application serving cached market data
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, Response
+from starlette.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
-import uvicorn
 import logging
+import math
 import time
-from typing import Any
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
 
 from config import settings
+import metrics
+from compression import snapshot_responses, render_json
+from admission import AdmissionMiddleware
 from cache.cache_manager import cache
+from cache.records import to_dicts
+from cache.pagination import paginator
+from cache.shared_snapshot import SharedSnapshot, LeaderLock
+from cache.quote_store import QuoteStore
 from scheduler import data_scheduler
-from models.schemas import MarketDataResponse, HealthResponse
+from models.schemas import (
+    MarketDataResponse, HealthResponse, PortfolioValueRequest, PortfolioBatchValueRequest, AlertRuleCreate,
+    StockData, ForexData, CommodityData, FundData
+)
+from services.screener import parse_conditions
+from services.portfolio_service import portfolio_service
+from services.alert_service import alert_service
+from services.replay_service import create_replay_engine
+from services.yahoo_service import yahoo_service
+from services.quote_service import quote_service
+from services.fund_catalog import fund_catalog
+from services.search_service import search_service, ASSETS
 
 # Configure logging
 logging.basicConfig(
@@ -25,25 +48,99 @@ logger = logging.getLogger(__name__)
 # Global state
 app_start_time = time.time()
 
+# Response model fields per cache list: /api/market-data projects the cached
+# records onto these directly instead of building a Pydantic object per record
+MARKET_DATA_FIELDS = {
+    "bist100": tuple(StockData.model_fields),
+    "forex": tuple(ForexData.model_fields),
+    "commodities": tuple(CommodityData.model_fields),
+    "funds": tuple(FundData.model_fields),
+}
+leader_lock = LeaderLock(settings.LEADER_LOCK_FILE)
+worker_role = "standalone"
+shared_snapshot: Optional[SharedSnapshot] = None  # Leader/follower mode only
+
+def start_background_jobs(snapshot: Optional[SharedSnapshot]) -> None:
+    """Start the once-per-deployment jobs (leader / standalone worker only)"""
+    global worker_role
+    worker_role = "leader" if snapshot is not None else "standalone"
+    if snapshot is not None:
+        cache.start_publishing(snapshot)
+    
+    # Start the alert engine before the first fetch lands
+    alert_service.start()
+    
+    # On-demand quotes: fetch for every worker (only one process fetches upstream)
+    if settings.WORKER_ROLE != "standalone":
+        quote_service.lead(quote_service.store or QuoteStore(settings.ON_DEMAND_DB_FILE))
+    
+    # Replay mode: synthetic / recorded ticks instead of Yahoo and TEFAS
+    replay_engine = create_replay_engine()
+    if replay_engine is not None:
+        data_scheduler.use_replay(replay_engine, settings.REPLAY_SPEED)
+        quote_service.source = replay_engine
+    
+    # Start the scheduler
+    data_scheduler.start()
+
 # Lifespan context manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage startup and shutdown events"""
+    global worker_role, shared_snapshot
+    
     # Startup
     logger.info("🚀 Starting Algorist Backend...")
     logger.info(f"📂 Data directory: {settings.DATA_DIR}")
     logger.info(f"⏰ Group A interval: {settings.HIGH_FREQ_INTERVAL_MINUTES} minutes")
     logger.info(f"⏰ Group B times: {', '.join(settings.FUND_FETCH_TIMES)}")
     
-    # Start the scheduler
-    data_scheduler.start()
+    # Every worker serves the alert endpoints; only the scheduler owner evaluates rules
+    alert_service.open()
+    
+    role = settings.WORKER_ROLE
+    if role == "standalone":
+        start_background_jobs(None)
+    elif cache.is_shared:
+        # Shared backend (Redis): nodes sync through pub/sub invalidation,
+        # so only the configured fetcher node runs the scheduler
+        if role == "follower":
+            worker_role = "follower"
+            quote_service.follow(QuoteStore(settings.ON_DEMAND_DB_FILE))
+            logger.info(f"📥 Worker {os.getpid()} follows the {settings.CACHE_BACKEND} backend")
+        else:
+            start_background_jobs(None)
+            worker_role = "leader"
+    else:
+        # Only one worker fetches upstream; the rest serve its snapshots
+        snapshot = shared_snapshot = SharedSnapshot(settings.SHARED_SNAPSHOT_FILE, settings.SHARED_SNAPSHOT_MAX_BYTES)
+        if role == "leader" or (role == "auto" and leader_lock.try_acquire()):
+            logger.info(f"👑 Worker {os.getpid()} is the leader")
+            start_background_jobs(snapshot)
+        else:
+            worker_role = "follower"
+            quote_service.follow(QuoteStore(settings.ON_DEMAND_DB_FILE))
+            logger.info(f"📥 Worker {os.getpid()} is a follower")
+            
+            def try_promote() -> bool:
+                # Take over if the leader process went away
+                if role != "auto" or not leader_lock.try_acquire():
+                    return False
+                start_background_jobs(snapshot)
+                return True
+            
+            cache.start_following(snapshot, settings.SHARED_SNAPSHOT_POLL_SECONDS, try_promote)
+    
     logger.info("✅ Backend started successfully")
     
     yield  # Application runs
     
     # Shutdown
     logger.info("🛑 Shutting down Algorist Backend...")
+    cache.stop_following()
     data_scheduler.shutdown()
+    alert_service.shutdown()
+    quote_service.stop()
     logger.info("✅ Shutdown complete")
 
 # Create FastAPI app with lifespan
@@ -56,6 +153,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limits, concurrency caps and load shedding (inside CORS, so rejections stay readable to browsers)
+app.add_middleware(AdmissionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -65,6 +165,93 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request gzip for dynamic responses (snapshot endpoints arrive precompressed and pass through)
+app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES, compresslevel=settings.GZIP_LEVEL)
+
+# Request metrics (outermost, so it also times CORS handling and sees compressed sizes)
+app.add_middleware(metrics.MetricsMiddleware)
+
+ALL_ASSETS = ("stocks", "forex", "commodities", "funds")
+
+def cache_control(assets: Tuple[str, ...]) -> str:
+    """
+    Cache-Control for data refreshed by the given assets' jobs
+    
+    Responses stay fresh until the next scheduled refresh, so a proxy or CDN
+    in front of the API asks the origin about once per refresh interval.
+    """
+    next_run = data_scheduler.next_refresh(assets)
+    if next_run is None:
+        max_age = settings.HTTP_CACHE_FALLBACK_SECONDS
+    else:
+        seconds = (next_run - datetime.now(timezone.utc)).total_seconds()
+        max_age = min(max(math.ceil(seconds), 0), settings.HTTP_CACHE_MAX_AGE_SECONDS)
+    return f"public, max-age={max_age}, stale-while-revalidate={settings.HTTP_CACHE_STALE_SECONDS}"
+
+def cache_headers(assets: Tuple[str, ...], version: int) -> Dict[str, str]:
+    """
+    Caching headers for a response derived from `assets` at `version`
+    (cache.get_version(assets))
+    
+    The ETag is weak: the same version may go out gzip-, brotli- or
+    un-encoded, and Vary keeps those apart in shared caches.
+    """
+    return {
+        "Cache-Control": cache_control(assets),
+        "ETag": f'W/"{version}"',
+        "Vary": "Accept-Encoding"
+    }
+
+def not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match matches `etag` (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+async def snapshot_response(request: Request, key: str, build: Callable[[], Any], assets: Tuple[str, ...]) -> Response:
+    """
+    JSON derived purely from the cache, rendered and compressed once per version of its assets
+    
+    Hits are served straight from memory; a miss renders and compresses in
+    the threadpool so the event loop keeps serving other requests.
+    
+    Args:
+        key: Name of the payload (one per endpoint)
+        build: Produces the content; skipped while its assets' version is unchanged
+        assets: Cached asset types the payload comes from (sets max-age and the ETag)
+    """
+    version = cache.get_version(assets)
+    headers = cache_headers(assets, version)
+    if not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    accept_encoding = request.headers.get("accept-encoding", "")
+    cached = snapshot_responses.lookup(key, version, accept_encoding)
+    if cached is None:
+        cached = await run_in_threadpool(snapshot_responses.get, key, version, build, accept_encoding)
+    body, encoding = cached
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+def versioned_response(request: Request, build: Callable[[], Any], assets: Tuple[str, ...]) -> Response:
+    """
+    JSON derived from the cache and the query string, with the same caching
+    headers as snapshot_response (rendered per request, gzip by middleware)
+    """
+    version = cache.get_version(assets)
+    headers = cache_headers(assets, version)
+    if not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(render_json(build()), media_type="application/json", headers=headers)
+
+def page_content(item_key: str, name: str, limit: Optional[int], cursor: Optional[str]) -> dict[str, Any]:
+    """One cursor page of a cached list, rows under `name` like the unpaginated response"""
+    page = paginator.page(item_key, limit or settings.PAGE_DEFAULT_LIMIT, cursor)
+    return {name: page.pop("items"), **page}
+
 @app.get("/", tags=["Root"])
 async def root() -> dict[str, Any]:
     """Root endpoint"""
@@ -74,7 +261,17 @@ async def root() -> dict[str, Any]:
         "status": "running",
         "endpoints": {
             "market_data": "/api/market-data",
+            "movers": "/api/movers",
+            "screener": "/api/screener",
+            "market_summary": "/api/market-summary",
+            "quotes": "/api/quotes",
+            "search": "/api/search",
+            "fund_search": "/api/funds/search",
+            "freshness": "/api/freshness",
+            "portfolio_value": "/api/portfolio/value",
+            "alerts": "/api/alerts",
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -88,16 +285,30 @@ async def health_check() -> HealthResponse:
     scheduler_status = data_scheduler.get_status()
     uptime = time.time() - app_start_time
     last_fetch_data: dict[str, Any] = scheduler_status.get("last_fetch", {})  # type: ignore
+    snapshot_status = shared_snapshot.status() if shared_snapshot is not None else None
     
     return HealthResponse(
-        status="ok",
+        # Degraded: the leader's latest snapshot didn't fit the shared region, followers serve older data
+        status="degraded" if snapshot_status and snapshot_status["failed_version"] else "ok",
         scheduler_status="running" if scheduler_status["running"] else "stopped",
         last_fetch=last_fetch_data,
-        uptime_seconds=round(uptime, 2)
+        uptime_seconds=round(uptime, 2),
+        worker_role=worker_role,
+        ghost_mode=yahoo_service.use_mock_data,
+        circuit_breakers=yahoo_service.get_breaker_status(),
+        shared_snapshot=snapshot_status
     )
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def prometheus_metrics() -> PlainTextResponse:
+    """Prometheus metrics for this worker (text exposition format)"""
+    metrics.cache_version.set(cache.get_version())
+    if shared_snapshot is not None:
+        shared_snapshot.status()  # Refreshes the "behind" gauge
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/market-data", response_model=MarketDataResponse, tags=["Market Data"])
-async def get_market_data():
+async def get_market_data(request: Request) -> Response:
     """
     Get all cached market data
     
@@ -108,76 +319,371 @@ async def get_market_data():
     - TEFAS funds
     - Last update timestamps
     
-    This endpoint serves cached data, so it's extremely fast (< 10ms)
+    This endpoint serves cached data, so it's extremely fast (< 10ms);
+    the body is rendered and gzip/brotli-compressed once per cache version
     """
-    try:
+    def build() -> dict[str, Any]:
         data = cache.get_all_data()
-        
-        return MarketDataResponse(
-            bist100=data.get("bist100", []),
-            forex=data.get("forex", []),
-            commodities=data.get("commodities", []),
-            funds=data.get("funds", []),
-            last_updated=data.get("last_updated", {
-                "stocks": None,
-                "funds": None
-            })
-        )
+        content: dict[str, Any] = {
+            key: [record.project(fields) for record in data.get(key, [])]
+            for key, fields in MARKET_DATA_FIELDS.items()
+        }
+        content["last_updated"] = data.get("last_updated", {
+            "stocks": None,
+            "funds": None
+        })
+        return content
+    
+    try:
+        return await snapshot_response(request, "market-data", build, ALL_ASSETS)
     
     except Exception as e:
         logger.error(f"Error retrieving market data: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/api/stocks", tags=["Market Data"])
-async def get_stocks() -> dict[str, Any]:
-    """Get BIST100 stocks only"""
+async def get_stocks(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_MAX_LIMIT, description="Page size (paginates, ordered by symbol)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+) -> Response:
+    """
+    Get BIST100 stocks only
+    
+    Without `limit`/`cursor` the whole list is returned. With them, pages are
+    ordered by symbol and `next_cursor` stays pinned to the cache version of
+    the first page, so a refresh mid-listing can't skip or repeat rows.
+    """
     try:
-        return {
-            "stocks": cache.get_stocks(),
-            "last_updated": cache.get_last_updated()["stocks"]
-        }
+        if limit is None and cursor is None:
+            return await snapshot_response(request, "stocks", lambda: {
+                "stocks": to_dicts(cache.get_stocks()),
+                "last_updated": cache.get_last_updated()["stocks"]
+            }, ("stocks",))
+        return versioned_response(request, lambda: page_content("bist100", "stocks", limit, cursor), ("stocks",))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving stocks: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/api/forex", tags=["Market Data"])
-async def get_forex() -> dict[str, Any]:
+async def get_forex(request: Request) -> Response:
     """Get Forex pairs only"""
     try:
-        return {
-            "forex": cache.get_forex(),
+        return await snapshot_response(request, "forex", lambda: {
+            "forex": to_dicts(cache.get_forex()),
             "last_updated": cache.get_last_updated()["stocks"]
-        }
+        }, ("forex",))
     except Exception as e:
         logger.error(f"Error retrieving forex: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/api/commodities", tags=["Market Data"])
-async def get_commodities() -> dict[str, Any]:
+async def get_commodities(request: Request) -> Response:
     """Get Commodities only"""
     try:
-        return {
-            "commodities": cache.get_commodities(),
+        return await snapshot_response(request, "commodities", lambda: {
+            "commodities": to_dicts(cache.get_commodities()),
             "last_updated": cache.get_last_updated()["stocks"]
-        }
+        }, ("commodities",))
     except Exception as e:
         logger.error(f"Error retrieving commodities: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/api/funds", tags=["Market Data"])
-async def get_funds() -> dict[str, Any]:
-    """Get TEFAS funds only"""
+async def get_funds(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_MAX_LIMIT, description="Page size (paginates, ordered by fund code)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+) -> Response:
+    """Get TEFAS funds only (paginated like /api/stocks when `limit`/`cursor` is given)"""
     try:
-        return {
-            "funds": cache.get_funds(),
-            "last_updated": cache.get_last_updated()["funds"]
-        }
+        if limit is None and cursor is None:
+            return await snapshot_response(request, "funds", lambda: {
+                "funds": to_dicts(cache.get_funds()),
+                "last_updated": cache.get_last_updated()["funds"]
+            }, ("funds",))
+        return versioned_response(request, lambda: page_content("funds", "funds", limit, cursor), ("funds",))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving funds: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/api/funds/search", tags=["Market Data"])
+async def search_funds(
+    q: str = Query(..., min_length=1, max_length=100, description="Fund code or name prefix, e.g. 'AK' or 'altın'"),
+    limit: int = Query(20, ge=1, le=settings.FUND_SEARCH_MAX_LIMIT)
+) -> dict[str, Any]:
+    """
+    Search the full TEFAS fund catalog by code or name
+    
+    Matches funds having a code/name token that starts with each query token
+    (case- and Turkish-diacritic-insensitive); answered from an in-memory
+    prefix index in well under a millisecond.
+    """
+    try:
+        funds = fund_catalog.search(q, limit)
+        return {"query": q, "count": len(funds), "funds": funds, "catalog_updated": fund_catalog.updated_at}
+    except Exception as e:
+        logger.error(f"Error searching funds: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/api/search", tags=["Market Data"])
+async def search(
+    q: str = Query(..., min_length=1, max_length=100, description="Symbol, fund code or name prefix, e.g. 'thy' or 'garanti'"),
+    limit: int = Query(10, ge=1, le=settings.SEARCH_MAX_LIMIT),
+    asset: List[str] = Query([], description="Restrict to stocks, forex, commodities and/or funds")
+) -> dict[str, Any]:
+    """
+    Type-ahead search across stocks, forex, commodities and funds
+    
+    Every query token must prefix a symbol/code or name token (case- and
+    Turkish-diacritic-insensitive: 'is' finds 'İŞ'). Answered from an
+    in-memory prefix index updated as the cache refreshes, so it is cheap
+    enough to call on every keystroke.
+    """
+    unknown = [a for a in asset if a not in ASSETS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid asset '{unknown[0]}'. Use one of: {', '.join(ASSETS)}"
+        )
+    
+    try:
+        results = search_service.search(q, limit, asset)
+        return {"query": q, "count": len(results), "results": results}
+    except Exception as e:
+        logger.error(f"Error searching: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/api/movers", tags=["Market Data"])
+async def get_movers(
+    request: Request,
+    by: str = Query("change_percent", description="Ranking field: change_percent, volume or market_cap"),
+    n: int = Query(10, ge=1, le=settings.MOVERS_MAX_LIMIT, description="Number of stocks to return"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="desc = gainers/most active, asc = losers")
+) -> Response:
+    """
+    Get top gainers/losers/most active BIST100 stocks
+    
+    Served from sorted indexes maintained on every cache write, so each
+    request costs O(n) in the stocks returned, regardless of universe size.
+    """
+    if by not in settings.MOVER_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid 'by' field. Use one of: {', '.join(settings.MOVER_FIELDS)}"
+        )
+    
+    try:
+        return versioned_response(request, lambda: {
+            "by": by,
+            "order": order,
+            "movers": to_dicts(cache.get_movers(by, n, descending=(order == "desc"))),
+            "last_updated": cache.get_last_updated()["stocks"]
+        }, ("stocks",))
+    except Exception as e:
+        logger.error(f"Error retrieving movers: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+# Plain def: FastAPI runs it in the threadpool, so a large screen doesn't stall the event loop
+@app.get("/api/screener", tags=["Market Data"])
+def screen_stocks(
+    request: Request,
+    filter: List[str] = Query([], description="Conditions like 'change_percent>2', 'volume>5e6', 'market_cap between 1e9 and 5e10'"),
+    sort: Optional[str] = Query(None, description="Field to sort by"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=settings.SCREENER_MAX_LIMIT),
+    sector: List[str] = Query([], description="Keep only these sectors (e.g. Banking)")
+) -> Response:
+    """
+    Screen BIST100 stocks with filter conditions
+    
+    Runs vectorized over the NumPy columnar view kept in sync with the cache,
+    so it is cheap enough to call on every keystroke.
+    """
+    try:
+        conditions = parse_conditions(filter, settings.SCREENER_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if sort is not None and sort not in settings.SCREENER_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort field. Use one of: {', '.join(settings.SCREENER_FIELDS)}"
+        )
+    
+    try:
+        def build() -> dict[str, Any]:
+            stocks = cache.screen_stocks(conditions, sort, descending=(order == "desc"), limit=limit, sectors=sector)
+            return {
+                "count": len(stocks),
+                "stocks": to_dicts(stocks),
+                "last_updated": cache.get_last_updated()["stocks"]
+            }
+        
+        return versioned_response(request, build, ("stocks",))
+    except Exception as e:
+        logger.error(f"Error running screener: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/api/market-summary", tags=["Market Data"])
+async def get_market_summary(request: Request) -> Response:
+    """
+    Get market-level aggregates
+    
+    Returns a cap-weighted index proxy, advance/decline breadth, turnover and
+    per-sector mean change, all maintained incrementally as groups refresh.
+    """
+    try:
+        return await snapshot_response(request, "market-summary", cache.get_market_summary, ("stocks",))
+    except Exception as e:
+        logger.error(f"Error retrieving market summary: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/api/quotes", tags=["Market Data"])
+async def get_quotes(
+    symbols: str = Query(..., description="Comma-separated Yahoo symbols (THYAO.IS,AAPL,TRY=X)")
+) -> dict[str, Any]:
+    """
+    Get quotes for any Yahoo symbols without waiting on Yahoo
+    
+    Cached symbols are returned immediately with a `stale` flag; stale
+    long-tail symbols are refreshed in the background. Symbols never seen
+    before are listed under `pending` and fetched in the background (poll
+    again), symbols Yahoo has no quote for under `not_found`.
+    """
+    requested = list(dict.fromkeys(
+        quote_service.normalize(symbol) for symbol in symbols.split(",") if symbol.strip()
+    ))
+    if not requested:
+        raise HTTPException(status_code=400, detail="No symbols given")
+    if len(requested) > settings.ON_DEMAND_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many symbols ({len(requested)}). Max: {settings.ON_DEMAND_MAX_SYMBOLS}"
+        )
+    invalid = [symbol for symbol in requested if not quote_service.is_valid(symbol)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid symbols: {', '.join(invalid)}")
+    
+    try:
+        return quote_service.get_quotes(requested)
+    except Exception as e:
+        logger.error(f"Error retrieving quotes: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/api/freshness", tags=["Market Data"])
+async def get_freshness(
+    slo_seconds: Optional[int] = Query(None, ge=1, description="Override the configured SLO for every asset type"),
+    asset: Optional[str] = Query(None, description="Include per-record details for: stocks, forex, commodities or funds")
+) -> dict[str, Any]:
+    """
+    Get data freshness against the staleness SLO
+    
+    Reports age percentiles, the live/mock/disk source mix and SLO breaches
+    per asset type. Records older than the SLO or served from mock data count
+    as breaching; records restored from disk are judged by their fetch time.
+    """
+    slo = {name: slo_seconds or default for name, default in settings.FRESHNESS_SLO_SECONDS.items()}
+    if asset is not None and asset not in slo:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid asset '{asset}'. Use one of: {', '.join(slo)}"
+        )
+    
+    try:
+        response: dict[str, Any] = {"assets": cache.get_freshness_report(slo)}
+        if asset is not None:
+            response["records"] = sorted(
+                cache.get_freshness(asset),
+                key=lambda r: r["age_seconds"] if r["age_seconds"] is not None else float("inf"),
+                reverse=True
+            )
+        return response
+    except Exception as e:
+        logger.error(f"Error building freshness report: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/api/portfolio/value", tags=["Portfolio"])
+async def value_portfolio(request: PortfolioValueRequest) -> dict[str, Any]:
+    """
+    Value a portfolio against cached prices
+    
+    Returns per-position and total market value, cost and P&L in TRY and USD.
+    FX conversion uses the cached TRY=X / EURTRY=X / GBPTRY=X rates.
+    """
+    try:
+        result = portfolio_service.value_portfolio(request.holdings)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error valuing portfolio: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    result["last_updated"] = cache.get_last_updated()
+    return result
+
+# Plain def: valuing up to a batch of portfolios is CPU work, kept off the event loop
+@app.post("/api/portfolio/value/batch", tags=["Portfolio"])
+def value_portfolios(request: PortfolioBatchValueRequest) -> dict[str, Any]:
+    """Value many portfolios in one vectorized pass (same shape as /api/portfolio/value per item)"""
+    try:
+        results = portfolio_service.value_portfolios([p.holdings for p in request.portfolios])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error valuing portfolios: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    return {
+        "portfolios": results,
+        "last_updated": cache.get_last_updated()
+    }
+
+# Plain def (all alert endpoints): SQLite calls hold a lock and block, so they run in the threadpool
+@app.post("/api/alerts", tags=["Alerts"])
+def create_alert(rule: AlertRuleCreate) -> dict[str, Any]:
+    """
+    Create a price or percent-move alert
+    
+    Alerts fire once, when a cache update crosses the threshold.
+    """
+    try:
+        return alert_service.create_rule(rule.symbol, rule.kind, rule.threshold, rule.client_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating alert: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/api/alerts", tags=["Alerts"])
+def list_alerts(client_id: Optional[str] = None) -> dict[str, Any]:
+    """List active alert rules"""
+    try:
+        return {"alerts": alert_service.list_rules(client_id)}
+    except Exception as e:
+        logger.error(f"Error listing alerts: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/api/alerts/triggered", tags=["Alerts"])
+def list_triggered_alerts(client_id: Optional[str] = None) -> dict[str, Any]:
+    """Recently triggered alerts, newest first"""
+    return {"alerts": alert_service.get_recent_alerts(client_id)}
+
+@app.delete("/api/alerts/{rule_id}", tags=["Alerts"])
+def delete_alert(rule_id: int) -> dict[str, str]:
+    """Delete an alert rule"""
+    if not alert_service.delete_rule(rule_id):
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return {"status": "success", "message": f"Alert {rule_id} deleted"}
+
+# Refresh endpoints are plain def: they block on Yahoo / TEFAS for seconds to minutes,
+# so FastAPI runs them in the threadpool instead of on the event loop
 @app.post("/api/refresh/stocks", tags=["Admin"])
-async def force_refresh_stocks() -> dict[str, str]:
+def force_refresh_stocks() -> dict[str, str]:
     """Force immediate refresh of Stock Group 1 + Forex + Commodities (Admin endpoint)"""
     try:
         logger.info("🔄 Manual refresh triggered for Stock Group 1")
@@ -188,7 +694,7 @@ async def force_refresh_stocks() -> dict[str, str]:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/refresh/funds", tags=["Admin"])
-async def force_refresh_funds() -> dict[str, str]:
+def force_refresh_funds() -> dict[str, str]:
     """Force immediate refresh of TEFAS Funds (Admin endpoint)"""
     try:
         logger.info("🔄 Manual refresh triggered for TEFAS Funds")
@@ -198,7 +704,20 @@ async def force_refresh_funds() -> dict[str, str]:
         logger.error(f"Error in manual refresh: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/refresh/fund-catalog", tags=["Admin"])
+def force_refresh_fund_catalog() -> dict[str, Any]:
+    """Force immediate refresh of the TEFAS fund catalog (Admin endpoint)"""
+    try:
+        logger.info("🔄 Manual refresh triggered for the fund catalog")
+        count = fund_catalog.refresh()
+        return {"status": "success", "message": f"Fund catalog refreshed ({count} funds)"}
+    except Exception as e:
+        logger.error(f"Error in manual refresh: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
+    import uvicorn
+    
     # Run the server
     logger.info(f"🌐 Starting server on {settings.HOST}:{settings.PORT}")
     uvicorn.run(
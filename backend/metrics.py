@@ -0,0 +1,359 @@
+"""
+Metrics - Prometheus Text Exposition
+Dependency-free counters, gauges and histograms plus an ASGI middleware for
+per-route request metrics. Recording is a dict lookup and a few additions
+under an uncontended lock, cheap enough for the read path.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple, Any, Optional, Callable, Awaitable
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets in seconds (1ms .. 60s; upstream fetches land in the tail)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+SIZE_BUCKETS: Tuple[float, ...] = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Shared bookkeeping for one metric family"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def total(self) -> float:
+        """Sum over every label set"""
+        with self._lock:
+            return sum(self._values.values())
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution (cumulative buckets rendered at scrape time)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels: str) -> "_Timer":
+        """Context manager observing the elapsed wall time"""
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(s[0]), s[1], s[2]) for key, s in self._series.items()]
+        lines: List[str] = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self._histogram = histogram
+        self._labels = labels
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class MetricsRegistry:
+    """Holds all metric families and renders them for /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Any) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the metrics the backend records
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "algorist_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+http_responses = registry.counter(
+    "algorist_http_responses_total", "HTTP responses by route and status code (304 = not modified)",
+    ("method", "route", "status")
+)
+http_response_bytes = registry.histogram(
+    "algorist_http_response_bytes", "HTTP response body size by route (after compression)", ("route",), SIZE_BUCKETS
+)
+http_response_encoding = registry.counter(
+    "algorist_http_response_encoding_total", "HTTP responses by route and content encoding", ("route", "encoding")
+)
+response_renders = registry.counter(
+    "algorist_response_renders_total",
+    "Snapshot bodies rendered (identity) or compressed (gzip/br); about one per cache version",
+    ("route", "encoding")
+)
+cache_requests = registry.counter(
+    "algorist_cache_requests_total", "Lookups in derived caches by result (hit/miss)", ("cache", "result")
+)
+fetch_duration = registry.histogram(
+    "algorist_fetch_duration_seconds", "Scheduled fetch duration per group", ("group",)
+)
+fetch_chunk_duration = registry.histogram(
+    "algorist_fetch_chunk_duration_seconds", "Yahoo quote fetch duration per chunk"
+)
+throttle_sleep_seconds = registry.counter(
+    "algorist_throttle_sleep_seconds_total", "Time spent sleeping in the Yahoo throttle"
+)
+circuit_breaker_transitions = registry.counter(
+    "algorist_circuit_breaker_transitions_total", "Circuit breaker state transitions", ("breaker", "state")
+)
+circuit_breaker_state = registry.gauge(
+    "algorist_circuit_breaker_open", "1 if the circuit breaker is OPEN, 0.5 if HALF_OPEN, else 0", ("breaker",)
+)
+mock_fallbacks = registry.counter(
+    "algorist_mock_fallback_total", "Ghost Mode mock data served instead of live data", ("asset",)
+)
+tefas_fund_fetch_duration = registry.histogram(
+    "algorist_tefas_fund_fetch_seconds", "TEFAS fetch latency per fund"
+)
+cache_writes = registry.counter(
+    "algorist_cache_writes_total", "Cache write operations by list", ("item",)
+)
+cache_records_changed = registry.counter(
+    "algorist_cache_records_changed_total", "Records passed to cache writes", ("item",)
+)
+cache_persisted_records = registry.counter(
+    "algorist_cache_persisted_records_total", "Records serialized by the persistence backend", ("data_type",)
+)
+cache_persisted_bytes = registry.counter(
+    "algorist_cache_persisted_bytes_total", "Bytes written by the persistence backend", ("data_type",)
+)
+cache_version = registry.gauge("algorist_cache_version", "Current cache version (write counter)")
+quote_cache_requests = registry.counter(
+    "algorist_quote_cache_requests_total", "On-demand quote tier lookups by result (hit/stale/miss)", ("result",)
+)
+quote_cache_evictions = registry.counter(
+    "algorist_quote_cache_evictions_total", "On-demand quote tier evictions by reason (capacity/expired)", ("reason",)
+)
+quote_cache_size = registry.gauge("algorist_quote_cache_entries", "Symbols held in the on-demand quote tier")
+on_demand_fetches = registry.counter(
+    "algorist_on_demand_fetch_total", "On-demand background fetches by outcome", ("outcome",)
+)
+on_demand_pending = registry.gauge("algorist_on_demand_pending", "Symbols queued for an on-demand fetch")
+upstream_calls = registry.counter(
+    "algorist_upstream_calls_total",
+    "Upstream fetch calls by flight and role (leader = went upstream, shared = joined an in-flight call)",
+    ("flight", "role")
+)
+
+admission_rejections = registry.counter(
+    "algorist_admission_rejections_total",
+    "Requests rejected before their handler by route and reason (rate_limited/concurrency/shed)",
+    ("route", "reason")
+)
+requests_in_flight = registry.gauge(
+    "algorist_requests_in_flight", "Admitted requests currently being handled by priority", ("priority",)
+)
+rate_limit_clients = registry.gauge("algorist_rate_limit_clients", "Client token buckets held by the rate limiter")
+
+shared_snapshot_bytes = registry.gauge("algorist_shared_snapshot_bytes", "Size of the last snapshot published to followers")
+shared_snapshot_publish_failures = registry.counter(
+    "algorist_shared_snapshot_publish_failures_total", "Snapshots too large for the shared region (not published)"
+)
+shared_snapshot_behind = registry.gauge(
+    "algorist_shared_snapshot_behind", "1 while the leader's latest snapshot could not be published to followers"
+)
+
+
+ASGIApp = Callable[[Dict[str, Any], Callable[[], Awaitable[Any]], Callable[[Any], Awaitable[None]]], Awaitable[None]]
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and body size per route
+
+    Routes are labelled by their path template (e.g. /api/alerts/{rule_id}),
+    unmatched paths share one label to keep cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status: List[int] = [500]
+        body_bytes: List[int] = [0]
+        encoding: List[str] = ["identity"]
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-encoding":
+                        encoding[0] = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                body_bytes[0] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route: Optional[Any] = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_request_duration.observe(time.perf_counter() - start, method=method, route=route_label)
+            http_responses.inc(method=method, route=route_label, status=str(status[0]))
+            http_response_bytes.observe(body_bytes[0], route=route_label)
+            http_response_encoding.inc(route=route_label, encoding=encoding[0])
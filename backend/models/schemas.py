@@ -12,6 +12,7 @@ class StockData(BaseModel):
     volume: Optional[int] = None
     market_cap: Optional[float] = None
     timestamp: datetime = Field(default_factory=datetime.now)
+    source: Optional[str] = None  # live | mock | disk | replay
 
 class ForexData(BaseModel):
     """Forex pair data model"""
@@ -20,6 +21,7 @@ class ForexData(BaseModel):
     change: float
     change_percent: float
     timestamp: datetime = Field(default_factory=datetime.now)
+    source: Optional[str] = None  # live | mock | disk | replay
 
 class CommodityData(BaseModel):
     """Commodity data model"""
@@ -29,6 +31,7 @@ class CommodityData(BaseModel):
     change: float
     change_percent: float
     timestamp: datetime = Field(default_factory=datetime.now)
+    source: Optional[str] = None  # live | mock | disk | replay
 
 class FundData(BaseModel):
     """TEFAS fund data model"""
@@ -38,6 +41,7 @@ class FundData(BaseModel):
     change: float
     change_percent: float
     timestamp: datetime = Field(default_factory=datetime.now)
+    source: Optional[str] = None  # live | mock | disk | replay
 
 class MarketDataResponse(BaseModel):
     """Complete market data response"""
@@ -56,3 +60,29 @@ class HealthResponse(BaseModel):
     scheduler_status: str
     last_fetch: Dict[str, Any]
     uptime_seconds: float
+    worker_role: Optional[str] = None
+    ghost_mode: Optional[bool] = None
+    circuit_breakers: Optional[Dict[str, Any]] = None
+    shared_snapshot: Optional[Dict[str, Any]] = None  # Leader/follower mode: version, bytes, failed_version
+
+class PortfolioHolding(BaseModel):
+    """Single portfolio position to value"""
+    symbol: str = Field(..., description="Stock symbol (THYAO.IS), fund code (TCD), forex (TRY=X / USD) or commodity (GC=F)")
+    quantity: float
+    cost_basis: float = Field(0.0, description="Purchase price per unit, in `currency`")
+    currency: str = Field("TRY", description="Currency of cost_basis: TRY, USD, EUR or GBP")
+
+class PortfolioValueRequest(BaseModel):
+    """Portfolio valuation request"""
+    holdings: List[PortfolioHolding]
+
+class PortfolioBatchValueRequest(BaseModel):
+    """Batch valuation request (many portfolios priced in one pass)"""
+    portfolios: List[PortfolioValueRequest]
+
+class AlertRuleCreate(BaseModel):
+    """New price / percent-move alert rule"""
+    symbol: str
+    kind: str = Field(..., description="price_above, price_below, change_above or change_below")
+    threshold: float
+    client_id: Optional[str] = None
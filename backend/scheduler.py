@@ -2,37 +2,85 @@
 Scheduler Configuration
 Manages background jobs for data fetching
 """
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
 import logging
 from config import settings
 from cache.cache_manager import cache
+import metrics
 from services.yahoo_service import yahoo_service
 from services.tefas_service import tefas_service
+from services.fund_catalog import fund_catalog
 
 logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+# Cached asset types refreshed by each job (the freshness re-fetch only patches SLO breaches)
+def _job_assets(job_id: str) -> Tuple[str, ...]:
+    if job_id in ("stock_group_1", "initial_group_a"):
+        return ("stocks", "forex", "commodities")
+    if job_id.startswith("stock_group_"):
+        return ("stocks",)
+    if job_id.startswith("group_b") or job_id == "initial_group_b":
+        return ("funds",)
+    return ()
+
 class DataScheduler:
     """Background scheduler for periodic data fetching"""
     
     def __init__(self):
-        self.scheduler = BackgroundScheduler(
-            timezone="Europe/Istanbul",  # Turkish timezone
-            job_defaults={
-                'coalesce': True,
-                'max_instances': 1,
-                'misfire_grace_time': 300  # 5 minutes grace period
-            }
-        )
+        self._scheduler: Optional["BackgroundScheduler"] = None  # Created on first use (followers never need it)
         self.last_fetch_times: Dict[str, Optional[str]] = {
             "stocks": None,
             "forex": None,
             "commodities": None,
             "funds": None
         }
+        # Data sources and pacing (swapped out by use_replay for soak tests)
+        self.market_source: Any = yahoo_service
+        self.fund_source: Any = tefas_service
+        self.stock_groups: List[List[str]] = [
+            settings.BIST100_GROUP_1,
+            settings.BIST100_GROUP_2,
+            settings.BIST100_GROUP_3,
+            settings.BIST100_GROUP_4,
+            settings.BIST100_GROUP_5
+        ]
+        self.time_scale: float = 1.0
+    
+    @property
+    def scheduler(self) -> "BackgroundScheduler":
+        if self._scheduler is None:
+            from apscheduler.schedulers.background import BackgroundScheduler
+            self._scheduler = BackgroundScheduler(
+                timezone="Europe/Istanbul",  # Turkish timezone
+                job_defaults={
+                    'coalesce': True,
+                    'max_instances': 1,
+                    'misfire_grace_time': 300  # 5 minutes grace period
+                }
+            )
+        return self._scheduler
+    
+    def use_replay(self, engine: Any, time_scale: float = 1.0) -> None:
+        """
+        Feed the cache from a replay engine instead of Yahoo / TEFAS
+        
+        Args:
+            engine: ReplayEngine (same fetch interface as the live services)
+            time_scale: Simulated seconds per wall-clock second; job intervals shrink by this factor
+        """
+        self.market_source = engine
+        self.fund_source = engine
+        self.stock_groups = engine.stock_groups(len(self.stock_groups))
+        self.time_scale = max(time_scale, 1.0)
+        logger.info(f"🎬 Scheduler in replay mode ({self.time_scale:g}x)")
+    
+    def _scaled(self, minutes: float) -> timedelta:
+        """Wall-clock duration of a simulated interval"""
+        return timedelta(minutes=minutes / self.time_scale)
     
     def _fetch_stock_group_generic(self, group_symbols: list[str], group_name: str, include_forex_commodities: bool = False) -> None:
         """
@@ -47,23 +95,24 @@ class DataScheduler:
             logger.info(f"⏰ Fetching: {group_name}" + (" + Forex + Commodities" if include_forex_commodities else ""))
             
             # Fetch stock group
-            stocks = yahoo_service.fetch_stock_group(group_symbols, group_name)
+            with metrics.fetch_duration.time(group=group_name):
+                stocks = self.market_source.fetch_stock_group(group_symbols, group_name)
             if stocks:
-                current_stocks = cache.get_stocks()
-                # Remove old stocks from this group, add new ones
-                updated_stocks = [s for s in current_stocks if s['symbol'] not in group_symbols]
-                updated_stocks.extend(stocks)
-                cache.update_stocks(updated_stocks)
+                # Merge this group into the cache (indexes update incrementally);
+                # group symbols the fetch no longer returns are evicted
+                cache.upsert_stocks(stocks, group=group_symbols)
                 self.last_fetch_times["stocks"] = datetime.now().isoformat()
             
             # Optionally fetch forex and commodities (Group 1 only)
             if include_forex_commodities:
-                forex = yahoo_service.fetch_forex()
+                with metrics.fetch_duration.time(group="Forex"):
+                    forex = self.market_source.fetch_forex()
                 if forex:
                     cache.update_forex(forex)
                     self.last_fetch_times["forex"] = datetime.now().isoformat()
                 
-                commodities = yahoo_service.fetch_commodities()
+                with metrics.fetch_duration.time(group="Commodities"):
+                    commodities = self.market_source.fetch_commodities()
                 if commodities:
                     cache.update_commodities(commodities)
                     self.last_fetch_times["commodities"] = datetime.now().isoformat()
@@ -74,23 +123,59 @@ class DataScheduler:
     
     def fetch_stock_group_1(self):
         """Fetch BIST100 Group 1 + Forex + Commodities (minute 0)"""
-        self._fetch_stock_group_generic(settings.BIST100_GROUP_1, "Stock Group 1", include_forex_commodities=True)
+        self._fetch_stock_group_generic(self.stock_groups[0], "Stock Group 1", include_forex_commodities=True)
     
     def fetch_stock_group_2(self):
         """Fetch BIST100 Group 2 (minute 3)"""
-        self._fetch_stock_group_generic(settings.BIST100_GROUP_2, "Stock Group 2")
+        self._fetch_stock_group_generic(self.stock_groups[1], "Stock Group 2")
     
     def fetch_stock_group_3(self):
         """Fetch BIST100 Group 3 (minute 6)"""
-        self._fetch_stock_group_generic(settings.BIST100_GROUP_3, "Stock Group 3")
+        self._fetch_stock_group_generic(self.stock_groups[2], "Stock Group 3")
     
     def fetch_stock_group_4(self):
         """Fetch BIST100 Group 4 (minute 9)"""
-        self._fetch_stock_group_generic(settings.BIST100_GROUP_4, "Stock Group 4")
+        self._fetch_stock_group_generic(self.stock_groups[3], "Stock Group 4")
     
     def fetch_stock_group_5(self):
         """Fetch BIST100 Group 5 (minute 12)"""
-        self._fetch_stock_group_generic(settings.BIST100_GROUP_5, "Stock Group 5")
+        self._fetch_stock_group_generic(self.stock_groups[4], "Stock Group 5")
+    
+    def refetch_stale_data(self):
+        """
+        Re-fetch records breaching the freshness SLO ahead of their group's slot
+        
+        The stalest stocks go first (capped per run so the throttle budget stays
+        with the regular groups). Skipped while Yahoo is in Ghost Mode, where a
+        re-fetch would only produce more mock data.
+        """
+        if self.market_source.use_mock_data:
+            return
+        
+        try:
+            slo = settings.FRESHNESS_SLO_SECONDS
+            stale_stocks = cache.get_stale_keys("stocks", slo["stocks"])[:settings.FRESHNESS_MAX_REFETCH]
+            if stale_stocks:
+                logger.info(f"⏳ Re-fetching {len(stale_stocks)} stale stocks: {', '.join(stale_stocks)}")
+                with metrics.fetch_duration.time(group="Stale Refetch"):
+                    stocks = self.market_source.fetch_stock_group(stale_stocks, "Stale Refetch")
+                if stocks:
+                    cache.upsert_stocks(stocks)
+                    self.last_fetch_times["stocks"] = datetime.now().isoformat()
+            
+            if cache.get_stale_keys("forex", slo["forex"]):
+                forex = self.market_source.fetch_forex()
+                if forex:
+                    cache.update_forex(forex)
+                    self.last_fetch_times["forex"] = datetime.now().isoformat()
+            
+            if cache.get_stale_keys("commodities", slo["commodities"]):
+                commodities = self.market_source.fetch_commodities()
+                if commodities:
+                    cache.update_commodities(commodities)
+                    self.last_fetch_times["commodities"] = datetime.now().isoformat()
+        except Exception as e:
+            logger.error(f"❌ Error in stale data refetch: {e}", exc_info=True)
     
     def fetch_group_b_data(self):
         """
@@ -101,11 +186,12 @@ class DataScheduler:
             logger.info("⏰ Scheduled fetch: Group B data (TEFAS funds)")
             
             # Fetch funds data
-            funds_data = tefas_service.fetch_all_funds()
+            with metrics.fetch_duration.time(group="Group B"):
+                funds_data = self.fund_source.fetch_all_funds()
             
             # Update cache
             if funds_data:
-                cache.update_funds(funds_data)
+                cache.update_funds(fund_catalog.with_names(funds_data))
                 self.last_fetch_times["funds"] = datetime.now().isoformat()
                 logger.info(f"✅ Updated {len(funds_data)} TEFAS funds")
             else:
@@ -116,8 +202,17 @@ class DataScheduler:
         except Exception as e:
             logger.error(f"❌ Error in Group B fetch: {e}", exc_info=True)
     
+    def refresh_fund_catalog(self):
+        """Daily: full TEFAS fund list with names, type and company"""
+        try:
+            fund_catalog.refresh()
+        except Exception as e:
+            logger.error(f"❌ Error refreshing fund catalog: {e}", exc_info=True)
+    
     def setup_jobs(self):
         """Configure all scheduled jobs"""
+        from apscheduler.triggers.cron import CronTrigger
+        from apscheduler.triggers.interval import IntervalTrigger
         
         # STOCK GROUPS: Every 15 minutes with 3-minute offsets
         stock_groups = [
@@ -129,12 +224,12 @@ class DataScheduler:
         ]
         
         for idx, (fetch_func, offset_minutes, job_name) in enumerate(stock_groups, 1):
-            start_date = datetime.now() + timedelta(minutes=offset_minutes) if offset_minutes > 0 else None
+            start_date = datetime.now() + self._scaled(offset_minutes) if offset_minutes > 0 else None
             
             self.scheduler.add_job(
                 fetch_func,
                 trigger=IntervalTrigger(
-                    minutes=settings.HIGH_FREQ_INTERVAL_MINUTES,
+                    seconds=self._scaled(settings.HIGH_FREQ_INTERVAL_MINUTES).total_seconds(),
                     start_date=start_date
                 ),
                 id=f'stock_group_{idx}',
@@ -143,40 +238,113 @@ class DataScheduler:
             )
             logger.info(f"📅 Scheduled {job_name.split('+')[0].strip()}: Every {settings.HIGH_FREQ_INTERVAL_MINUTES} minutes (offset {offset_minutes})")
         
+        # FRESHNESS: Re-fetch SLO breaches between regular group slots
+        self.scheduler.add_job(
+            self.refetch_stale_data,
+            trigger=IntervalTrigger(
+                seconds=self._scaled(settings.FRESHNESS_CHECK_MINUTES).total_seconds(),
+                start_date=datetime.now() + self._scaled(settings.FRESHNESS_CHECK_MINUTES)
+            ),
+            id='freshness_refetch',
+            name='Re-fetch stale data (freshness SLO)',
+            replace_existing=True
+        )
+        logger.info(f"📅 Scheduled stale data refetch: Every {settings.FRESHNESS_CHECK_MINUTES} minutes")
+        
         # GROUP B: 3 times daily at specific times (TEFAS Funds)
-        for fetch_time in settings.FUND_FETCH_TIMES:
-            hour, minute = fetch_time.split(":")
-            
+        if self.time_scale > 1:
+            # Replay: wall-clock cron times mean nothing, spread the runs over a simulated day
+            per_day = len(settings.FUND_FETCH_TIMES)
             self.scheduler.add_job(
                 self.fetch_group_b_data,
+                trigger=IntervalTrigger(seconds=self._scaled(24 * 60 / per_day).total_seconds()),
+                id='group_b_replay',
+                name='Fetch Group B (replay)',
+                replace_existing=True
+            )
+            logger.info(f"📅 Scheduled Group B: {per_day}x per simulated day")
+        else:
+            for fetch_time in settings.FUND_FETCH_TIMES:
+                hour, minute = fetch_time.split(":")
+            
+                self.scheduler.add_job(
+                    self.fetch_group_b_data,
+                    trigger=CronTrigger(hour=int(hour), minute=int(minute)),
+                    id=f'group_b_job_{fetch_time}',
+                    name=f'Fetch Group B (TEFAS Funds) at {fetch_time}',
+                    replace_existing=True
+                )
+                logger.info(f"📅 Scheduled Group B: Daily at {fetch_time}")
+            
+            # FUND CATALOG: once a day, before the first Group B fetch (replay funds aren't in TEFAS)
+            hour, minute = settings.FUND_CATALOG_TIME.split(":")
+            self.scheduler.add_job(
+                self.refresh_fund_catalog,
                 trigger=CronTrigger(hour=int(hour), minute=int(minute)),
-                id=f'group_b_job_{fetch_time}',
-                name=f'Fetch Group B (TEFAS Funds) at {fetch_time}',
+                id='fund_catalog',
+                name=f'Refresh TEFAS fund catalog at {settings.FUND_CATALOG_TIME}',
                 replace_existing=True
             )
-            logger.info(f"📅 Scheduled Group B: Daily at {fetch_time}")
+            logger.info(f"📅 Scheduled fund catalog: Daily at {settings.FUND_CATALOG_TIME}")
+            if fund_catalog.is_stale():
+                self.scheduler.add_job(
+                    self.refresh_fund_catalog,
+                    id='initial_fund_catalog',
+                    name='Initial fetch: TEFAS fund catalog',
+                    replace_existing=True
+                )
         
-        # Initial fetch on startup (run immediately)
-        logger.info("🚀 Running initial data fetch...")
-        self.fetch_stock_group_1()  # Fetch Group 1 + Forex + Commodities immediately
-        self.fetch_group_b_data()  # Fetch Group B immediately
+        # Initial fetch as one-off jobs that fire as soon as the scheduler starts,
+        # so startup (and /health) never waits on Yahoo or TEFAS
+        self.scheduler.add_job(
+            self.fetch_stock_group_1,
+            id='initial_group_a',
+            name='Initial fetch: Stock Group 1 + Forex + Commodities',
+            replace_existing=True
+        )
+        self.scheduler.add_job(
+            self.fetch_group_b_data,
+            id='initial_group_b',
+            name='Initial fetch: Group B (TEFAS Funds)',
+            replace_existing=True
+        )
+        logger.info("🚀 Initial data fetch queued (runs in the background)")
     
     def start(self) -> None:
         """Start the scheduler"""
+        # Stocks restored from disk that no group fetches anymore would never refresh
+        cache.retain_stocks([symbol for group in self.stock_groups for symbol in group])
         self.setup_jobs()
         self.scheduler.start()
         logger.info("✅ Scheduler started successfully")
     
     def shutdown(self) -> None:
         """Gracefully shutdown the scheduler"""
-        if self.scheduler.running:
-            self.scheduler.shutdown(wait=True)
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.shutdown(wait=True)
             logger.info("🛑 Scheduler shut down")
     
+    def next_refresh(self, assets: Tuple[str, ...]) -> Optional[datetime]:
+        """
+        Earliest upcoming run of a job that refreshes any of `assets`
+        
+        Returns:
+            Timezone-aware run time, or None if the scheduler isn't running here
+        """
+        if self._scheduler is None or not self._scheduler.running:
+            return None
+        runs = [
+            job.next_run_time for job in self._scheduler.get_jobs()
+            if job.next_run_time is not None and set(assets) & set(_job_assets(job.id))
+        ]
+        return min(runs, default=None)
+    
     def get_status(self) -> Dict[str, Any]:
         """Get scheduler status"""
         jobs: list[Dict[str, Any]] = []
-        for job in self.scheduler.get_jobs():
+        if self._scheduler is None:
+            return {"running": False, "jobs": jobs, "last_fetch": self.last_fetch_times}
+        for job in self._scheduler.get_jobs():
             jobs.append({
                 "id": job.id,
                 "name": job.name,
@@ -184,7 +352,7 @@ class DataScheduler:
             })
         
         return {
-            "running": self.scheduler.running,
+            "running": self._scheduler.running,
             "jobs": jobs,
             "last_fetch": self.last_fetch_times
         }
@@ -0,0 +1,471 @@
+"""
+Alert Service - Price & Percent-Move Notifications
+Rules live in SQLite; per-symbol sorted threshold books are evaluated with
+bisect on every cache write, so only rules that were actually crossed are touched.
+"""
+import sqlite3
+import threading
+import queue
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+from config import settings
+from cache.cache_manager import cache, record_key
+
+logger = logging.getLogger(__name__)
+
+ABOVE = "above"
+BELOW = "below"
+
+# Rule kind -> (record field, crossing direction)
+ALERT_KINDS: Dict[str, Tuple[str, str]] = {
+    "price_above": ("price", ABOVE),
+    "price_below": ("price", BELOW),
+    "change_above": ("change_percent", ABOVE),
+    "change_below": ("change_percent", BELOW),
+}
+
+# Sorts after any real rule id for the same threshold
+_MAX_ID = float("inf")
+
+
+def _field_value(record: Optional[Dict[str, Any]], field: str) -> Optional[float]:
+    """Numeric field of a cached record (forex rows carry 'rate' instead of 'price')"""
+    if record is None:
+        return None
+    raw_value: Any = record.get(field)
+    if raw_value is None and field == "price":
+        raw_value = record.get("rate")
+    try:
+        return float(raw_value) if raw_value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_satisfied(direction: str, threshold: float, value: float) -> bool:
+    """True if a rule's condition already holds for `value`"""
+    return value >= threshold if direction == ABOVE else value <= threshold
+
+
+def _cached_record(symbol: str) -> Optional[Dict[str, Any]]:
+    """Current cached record for a market symbol or fund code"""
+    record = cache.get_quote(symbol)
+    if record is not None:
+        return record
+    return next((fund for fund in cache.get_funds() if fund.get("code") == symbol), None)
+
+
+class ThresholdBook:
+    """
+    Sorted (threshold, rule_id) lists for one symbol + field
+
+    'above' rules fire when the value rises through the threshold
+    (old < t <= new), 'below' rules when it falls through it (new <= t < old).
+    """
+
+    def __init__(self):
+        self.above: List[Tuple[float, int]] = []
+        self.below: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.above) + len(self.below)
+
+    def add(self, direction: str, threshold: float, rule_id: int) -> None:
+        insort(self.above if direction == ABOVE else self.below, (threshold, rule_id))
+
+    def remove(self, direction: str, threshold: float, rule_id: int) -> None:
+        entries = self.above if direction == ABOVE else self.below
+        pos = bisect_left(entries, (threshold, rule_id))
+        if pos < len(entries) and entries[pos] == (threshold, rule_id):
+            del entries[pos]
+
+    def pop_crossed(self, old: Optional[float], new: float) -> List[int]:
+        """
+        Remove and return the ids of every rule crossed by old -> new
+
+        With no previous value every rule already satisfied by `new` fires.
+        """
+        fired: List[int] = []
+
+        if self.above and (old is None or new > old):
+            lo = 0 if old is None else bisect_right(self.above, (old, _MAX_ID))
+            hi = bisect_right(self.above, (new, _MAX_ID))
+            if hi > lo:
+                fired.extend(rule_id for _, rule_id in self.above[lo:hi])
+                del self.above[lo:hi]
+
+        if self.below and (old is None or new < old):
+            lo = bisect_left(self.below, (new, -1))
+            hi = len(self.below) if old is None else bisect_left(self.below, (old, -1))
+            if hi > lo:
+                fired.extend(rule_id for _, rule_id in self.below[lo:hi])
+                del self.below[lo:hi]
+
+        return fired
+
+
+class AlertNotifier:
+    """Delivery hook for triggered alerts - subclass and override notify()"""
+
+    def notify(self, alert: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class LogNotifier(AlertNotifier):
+    """Default notifier: writes triggered alerts to the log"""
+
+    def notify(self, alert: Dict[str, Any]) -> None:
+        logger.info(
+            f"🔔 Alert #{alert['id']} {alert['symbol']} {alert['kind']} {alert['threshold']} "
+            f"(value: {alert['triggered_value']})"
+        )
+
+
+class AlertService:
+    """
+    Alert rules engine fed by CacheManager write notifications
+
+    The rules database is opened on first use (lifespan opens it at startup),
+    never at import. Only the worker that evaluates rules (start()) holds
+    the in-memory threshold books.
+    """
+
+    def __init__(self, db_path: str = settings.ALERTS_DB_FILE):
+        """
+        Args:
+            db_path: SQLite file holding the rules table
+        """
+        self.db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._books: Dict[str, Dict[str, ThresholdBook]] = {}
+        self._outbox: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._max_rule_id = 0
+        self._rules_dirty = False  # Set by create_rule: new rules to load before the next evaluation
+        self._data_version: Optional[int] = None  # Bumped by SQLite when another connection commits
+        self._notifier: AlertNotifier = LogNotifier()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._subscribed = False
+
+    def open(self) -> None:
+        """Open (and create if needed) the rules database"""
+        with self._db_lock:
+            if self._db is not None:
+                return
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL lets API workers add rules while the leader evaluates them
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS alert_rules (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    threshold REAL NOT NULL,
+                    client_id TEXT,
+                    active INTEGER NOT NULL DEFAULT 1,
+                    created_at TEXT NOT NULL,
+                    triggered_at TEXT,
+                    triggered_value REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_alert_rules_symbol ON alert_rules(symbol, active);
+                CREATE INDEX IF NOT EXISTS idx_alert_rules_client ON alert_rules(client_id, active);
+                CREATE INDEX IF NOT EXISTS idx_alert_rules_triggered ON alert_rules(triggered_at);
+            """)
+            db.commit()
+            self._db = db
+
+    def _connection(self) -> sqlite3.Connection:
+        """The rules database, opened on first use (call without holding _db_lock)"""
+        if self._db is None:
+            self.open()
+        assert self._db is not None
+        return self._db
+
+    def _load_rules(self) -> None:
+        """Build the in-memory threshold books from active rules"""
+        db = self._connection()
+        with self._db_lock:
+            self._data_version = db.execute("PRAGMA data_version").fetchone()[0]
+            rows = db.execute(
+                "SELECT id, symbol, kind, threshold FROM alert_rules WHERE active = 1"
+            ).fetchall()
+
+        with self._lock:
+            self._books = {}
+            for rule_id, symbol, kind, threshold in rows:
+                field, direction = ALERT_KINDS[kind]
+                book = self._books.setdefault(symbol, {}).setdefault(field, ThresholdBook())
+                (book.above if direction == ABOVE else book.below).append((threshold, rule_id))
+                self._max_rule_id = max(self._max_rule_id, rule_id)
+            # One sort per list instead of 1M insorts
+            for books in self._books.values():
+                for book in books.values():
+                    book.above.sort()
+                    book.below.sort()
+
+        logger.info(f"🔔 Loaded {len(rows)} active alert rules for {len(self._books)} symbols")
+
+    def _rules_changed(self) -> bool:
+        """
+        True if rules may have been added since the last load
+
+        Rules created here set a flag; rules created by other workers show
+        up as a new PRAGMA data_version (a counter read, no table access).
+        """
+        if self._rules_dirty:
+            self._rules_dirty = False
+            return True
+        db = self._connection()
+        with self._db_lock:
+            version = db.execute("PRAGMA data_version").fetchone()[0]
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    def _load_new_rules(self) -> None:
+        """
+        Pick up rules added since the last load (by this or any other worker)
+
+        Rule ids are monotonic, so this is a single indexed range query.
+        """
+        db = self._connection()
+        with self._db_lock:
+            rows = db.execute(
+                "SELECT id, symbol, kind, threshold FROM alert_rules WHERE id > ? AND active = 1",
+                (self._max_rule_id,)
+            ).fetchall()
+
+        with self._lock:
+            for rule_id, symbol, kind, threshold in rows:
+                if rule_id <= self._max_rule_id:
+                    continue  # Loaded concurrently
+                field, direction = ALERT_KINDS[kind]
+                self._books.setdefault(symbol, {}).setdefault(field, ThresholdBook()).add(direction, threshold, rule_id)
+                self._max_rule_id = rule_id
+
+    @staticmethod
+    def _row_to_rule(row: Tuple[Any, ...]) -> Dict[str, Any]:
+        rule_id, symbol, kind, threshold, client_id, active, created_at, triggered_at, triggered_value = row
+        return {
+            "id": rule_id,
+            "symbol": symbol,
+            "kind": kind,
+            "threshold": threshold,
+            "client_id": client_id,
+            "active": bool(active),
+            "created_at": created_at,
+            "triggered_at": triggered_at,
+            "triggered_value": triggered_value
+        }
+
+    def _get_rule(self, rule_id: int) -> Optional[Dict[str, Any]]:
+        db = self._connection()
+        with self._db_lock:
+            row = db.execute("SELECT * FROM alert_rules WHERE id = ?", (rule_id,)).fetchone()
+        return self._row_to_rule(row) if row else None
+
+    def set_notifier(self, notifier: AlertNotifier) -> None:
+        """Plug in a delivery backend (push, webhook, ...)"""
+        self._notifier = notifier
+
+    def create_rule(self, symbol: str, kind: str, threshold: float, client_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Store a rule and add it to the symbol's threshold book
+
+        A rule the cached value already satisfies can't be crossed by a
+        later write, so it is stored as triggered and notified right away.
+
+        Raises:
+            ValueError: If kind is unknown
+        """
+        if kind not in ALERT_KINDS:
+            raise ValueError(f"Invalid alert kind '{kind}'. Use one of: {', '.join(ALERT_KINDS)}")
+        symbol = symbol.strip().upper()
+        field, direction = ALERT_KINDS[kind]
+        current_value = _field_value(_cached_record(symbol), field)
+        satisfied = current_value is not None and _is_satisfied(direction, float(threshold), current_value)
+
+        now = datetime.now().isoformat()
+        db = self._connection()
+        with self._db_lock:
+            if satisfied:
+                cursor = db.execute(
+                    "INSERT INTO alert_rules (symbol, kind, threshold, client_id, active, created_at, triggered_at, triggered_value) "
+                    "VALUES (?, ?, ?, ?, 0, ?, ?, ?)",
+                    (symbol, kind, float(threshold), client_id, now, now, current_value)
+                )
+            else:
+                cursor = db.execute(
+                    "INSERT INTO alert_rules (symbol, kind, threshold, client_id, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (symbol, kind, float(threshold), client_id, now)
+                )
+            db.commit()
+            rule_id = cursor.lastrowid
+
+        if satisfied:
+            self._outbox.put(rule_id)
+            self._start_dispatcher()
+        else:
+            # Goes live with the next evaluation (this worker's, or the leader's via data_version)
+            self._rules_dirty = True
+
+        rule = self._get_rule(rule_id)
+        assert rule is not None
+        return rule
+
+    def delete_rule(self, rule_id: int) -> bool:
+        """Delete a rule; returns False if it does not exist"""
+        rule = self._get_rule(rule_id)
+        if rule is None:
+            return False
+
+        if rule["active"]:
+            field, direction = ALERT_KINDS[rule["kind"]]
+            with self._lock:
+                book = self._books.get(rule["symbol"], {}).get(field)
+                if book is not None:
+                    book.remove(direction, rule["threshold"], rule_id)
+
+        db = self._connection()
+        with self._db_lock:
+            db.execute("DELETE FROM alert_rules WHERE id = ?", (rule_id,))
+            db.commit()
+        return True
+
+    def list_rules(self, client_id: Optional[str] = None, active_only: bool = True) -> List[Dict[str, Any]]:
+        """List rules, optionally for a single client"""
+        query = "SELECT * FROM alert_rules WHERE 1 = 1"
+        params: List[Any] = []
+        if client_id is not None:
+            query += " AND client_id = ?"
+            params.append(client_id)
+        if active_only:
+            query += " AND active = 1"
+        db = self._connection()
+        with self._db_lock:
+            rows = db.execute(query + " ORDER BY id", params).fetchall()
+        return [self._row_to_rule(row) for row in rows]
+
+    def get_recent_alerts(self, client_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recently triggered alerts (newest first)"""
+        query = "SELECT * FROM alert_rules WHERE triggered_at IS NOT NULL"
+        params: List[Any] = []
+        if client_id is not None:
+            query += " AND client_id = ?"
+            params.append(client_id)
+        query += " ORDER BY triggered_at DESC LIMIT ?"
+        params.append(settings.ALERT_RECENT_EVENTS)
+        db = self._connection()
+        with self._db_lock:
+            rows = db.execute(query, params).fetchall()
+        return [self._row_to_rule(row) for row in rows]
+
+    def on_cache_update(self, item_key: str, previous: Dict[str, Dict[str, Any]], updated: List[Dict[str, Any]]) -> None:
+        """
+        CacheManager listener: evaluate only the rules crossed by this write
+
+        Symbols without rules cost one dict lookup; symbols with rules cost a
+        couple of bisects per field. Crossed rules are recorded as triggered
+        before their notifications are queued.
+        """
+        if self._rules_changed():
+            self._load_new_rules()
+        now = datetime.now().isoformat()
+        fired: List[Tuple[int, float, str]] = []
+        with self._lock:
+            for record in updated:
+                key = record_key(record)
+                books = self._books.get(key) if key else None
+                if not books:
+                    continue
+                old_record = previous.get(key)
+                for field, book in books.items():
+                    new_value = _field_value(record, field)
+                    if new_value is None:
+                        continue
+                    for rule_id in book.pop_crossed(_field_value(old_record, field), new_value):
+                        fired.append((rule_id, new_value, now))
+        if fired:
+            self._record_triggers(fired)
+
+    def _record_triggers(self, fired: List[Tuple[int, float, str]]) -> None:
+        """
+        Deactivate crossed rules and record the trigger in one transaction
+
+        Only then are notifications queued, so a crash can lose a
+        notification (the trigger stays visible to polling clients) but
+        never fires a rule twice.
+        """
+        db = self._connection()
+        recorded: List[int] = []
+        try:
+            with self._db_lock, db:
+                for rule_id, value, triggered_at in fired:
+                    cursor = db.execute(
+                        "UPDATE alert_rules SET active = 0, triggered_at = ?, triggered_value = ? WHERE id = ? AND active = 1",
+                        (triggered_at, value, rule_id)
+                    )
+                    if cursor.rowcount:
+                        recorded.append(rule_id)  # Not deleted (possibly by another worker) meanwhile
+        except Exception as e:
+            logger.error(f"❌ Error recording {len(fired)} triggered alerts: {e}")
+            return
+        for rule_id in recorded:
+            self._outbox.put(rule_id)
+
+    def _dispatch_loop(self) -> None:
+        """Outbox consumer: hand recorded triggers to the notifier"""
+        while True:
+            rule_id = self._outbox.get()
+            if rule_id is None:
+                break
+            try:
+                alert = self._get_rule(rule_id)
+                if alert is None:
+                    continue  # Deleted after it triggered
+                self._notifier.notify(alert)
+            except Exception as e:
+                logger.error(f"❌ Error dispatching alert #{rule_id}: {e}")
+
+    def start(self) -> None:
+        """
+        Load the threshold books, subscribe to cache writes and start the
+        outbox dispatcher
+
+        Only the worker that owns the scheduler should evaluate rules; the
+        others just read and write the rules table.
+        """
+        if self._subscribed and self._dispatcher is not None:
+            return
+        if not self._subscribed:
+            self._load_rules()
+            cache.add_listener(self.on_cache_update)
+            self._subscribed = True
+        self._start_dispatcher()
+        logger.info("✅ Alert engine started")
+
+    def _start_dispatcher(self) -> None:
+        """Start the outbox dispatcher unless it is running (rules can trigger on any worker at creation)"""
+        with self._lock:
+            if self._dispatcher is not None:
+                return
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="alert-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def shutdown(self) -> None:
+        """Drain the outbox, stop the dispatcher and close the database"""
+        if self._dispatcher is not None:
+            self._outbox.put(None)
+            self._dispatcher.join(timeout=5)
+            self._dispatcher = None
+            logger.info("🛑 Alert engine stopped")
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# Create service instance
+alert_service = AlertService()
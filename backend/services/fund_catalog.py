@@ -0,0 +1,226 @@
+"""
+Fund Catalog - Full TEFAS Fund List
+Names, fund type and management company for every fund, refreshed daily,
+persisted under DATA_DIR and searchable by code or name prefix
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+import logging
+from config import settings
+from cache.search_index import PrefixIndex
+from services.tefas_service import tefas_service
+
+logger = logging.getLogger(__name__)
+
+# Fund titles start with the management company ("AK PORTFÖY ALTIN FONU")
+COMPANY_MARKERS = ("PORTFÖY", "PORTFOY")
+
+# Body of tefas.Crawler's fund listing request (_list_fund_codes, fonTipi set per kind).
+# One call lists every fund of a kind with its title; Crawler.fetch without a
+# fund name would instead send one request per fund, capped at fund_limit.
+FUND_LIST_QUERY: Dict[str, Any] = {
+    "dil": "TR",
+    "kurucuKodu": None,
+    "sfonTurKod": None,
+    "fonTurAciklama": None,
+    "islem": 1,
+    "fonTurKod": None,
+    "fonGrubu": None,
+    "donemGetiri1a": "1",
+    "donemGetiri3a": "1",
+    "donemGetiri6a": "1",
+    "donemGetiri1y": "1",
+    "donemGetiriyb": "1",
+    "donemGetiri3y": "1",
+    "donemGetiri5y": "1",
+    "basTarih": None,
+    "bitTarih": None,
+    "calismaTipi": 2,
+    "getiriOrani": "1",
+}
+
+
+def company_of(title: str) -> Optional[str]:
+    """Management company from a TEFAS fund title (None if the title doesn't name one)"""
+    upper = title.upper()
+    for marker in COMPANY_MARKERS:
+        index = upper.find(marker)
+        if index > 0:
+            return title[:index + len(marker)].strip()
+    return None
+
+
+class FundCatalog:
+    """
+    Every TEFAS fund with its metadata
+
+    The list comes from TEFAS's fund listing, one request per fund kind
+    (code and title per fund); the kind gives the fund type and the title the company. It
+    is saved to FUND_CATALOG_FILE so a restart doesn't need TEFAS, and
+    indexed by code and name tokens for /api/funds/search.
+    """
+
+    def __init__(self, path: str = settings.FUND_CATALOG_FILE, source: Any = tefas_service):
+        """
+        Args:
+            path: JSON file the catalog is persisted to
+            source: Object with a `crawler` (tefas.Crawler or a stand-in with the same list_endpoint/_do_post)
+        """
+        self.path = path
+        self.source = source
+        self._funds: Dict[str, Dict[str, Any]] = {}
+        self._index = PrefixIndex()
+        self.updated_at: Optional[str] = None
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None  # Of the file last loaded or saved
+        self._next_check = 0.0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._funds)
+
+    def _adopt(self, funds: List[Dict[str, Any]], updated_at: Optional[str]) -> None:
+        """Swap in a new fund list and its index (readers never see a half-built one)"""
+        by_code = {fund["code"]: fund for fund in funds}
+        index = PrefixIndex({code: (code, fund.get("name") or "") for code, fund in by_code.items()})
+        with self._lock:
+            self._funds, self._index, self.updated_at = by_code, index, updated_at
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._adopt(data.get("funds", []), data.get("updated_at"))
+            self._mtime = mtime
+            logger.info(f"📚 Fund catalog loaded: {len(self._funds)} funds")
+        except Exception as e:
+            logger.error(f"Error loading fund catalog: {e}")
+
+    def _save(self) -> None:
+        with self._lock:
+            data = {"updated_at": self.updated_at, "funds": list(self._funds.values())}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def _reload_if_changed(self) -> None:
+        """Pick up a catalog saved by another worker (the leader runs the daily job)"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + settings.FUND_CATALOG_RELOAD_SECONDS
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self._load()
+
+    def is_stale(self) -> bool:
+        """No catalog yet, or older than FUND_CATALOG_MAX_AGE_HOURS"""
+        if not self._funds or self.updated_at is None:
+            return True
+        age = datetime.now() - datetime.fromisoformat(self.updated_at)
+        return age > timedelta(hours=settings.FUND_CATALOG_MAX_AGE_HOURS)
+
+    def _fetch_kind(self, kind: str) -> List[Dict[str, Any]]:
+        """
+        All funds of one kind from TEFAS's fund listing
+
+        Raises:
+            ValueError: If TEFAS lists no funds (treated as a failed fetch)
+        """
+        crawler = self.source.crawler
+        rows = crawler._do_post(crawler.list_endpoint, {**FUND_LIST_QUERY, "fonTipi": kind})
+        funds: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            code = row.get("fonKodu")
+            if not code:
+                continue
+            title = str(row.get("fonUnvan") or code).strip()
+            funds[code] = {
+                "code": code,
+                "name": title,
+                "kind": kind,
+                "type": settings.FUND_KINDS[kind],
+                "company": company_of(title)
+            }
+        if not funds:
+            raise ValueError(f"TEFAS listed no {kind} funds")
+        return list(funds.values())
+
+    def refresh(self) -> int:
+        """
+        Re-download the catalog (daily job)
+
+        Kinds that fail or come back empty keep their previous entries, so
+        one TEFAS error doesn't shrink the catalog.
+
+        Returns:
+            Number of funds in the catalog afterwards
+        """
+        if not self.source.crawler:
+            logger.warning("⚠️  TEFAS crawler not available, fund catalog not refreshed")
+            return len(self._funds)
+
+        logger.info("📚 Refreshing TEFAS fund catalog...")
+        funds: List[Dict[str, Any]] = []
+        fetched = 0
+        for kind in settings.FUND_KINDS:
+            try:
+                funds.extend(self._fetch_kind(kind))
+                fetched += 1
+            except Exception as e:
+                logger.error(f"❌ Fund catalog fetch failed for {kind}: {e}")
+                funds.extend(fund for fund in self._funds.values() if fund.get("kind") == kind)
+        if not fetched:
+            # Nothing new: keep the catalog and its age, so it is retried while stale
+            logger.warning("⚠️  Fund catalog refresh returned no funds")
+            return len(self._funds)
+
+        self._adopt(funds, datetime.now().isoformat())
+        try:
+            self._save()
+        except Exception as e:
+            logger.error(f"Error saving fund catalog: {e}")
+        logger.info(f"✅ Fund catalog: {len(self._funds)} funds")
+        return len(self._funds)
+
+    def get_funds(self) -> List[Dict[str, Any]]:
+        """Every catalog entry (picks up a catalog saved by another worker first)"""
+        self._reload_if_changed()
+        return list(self._funds.values())
+
+    def with_names(self, funds: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fund records with the catalog name where the fetcher only had the code (new dicts, inputs untouched)"""
+        named = []
+        for fund in funds:
+            entry = self._funds.get(fund.get("code"))
+            if entry is not None and fund.get("name") in (None, "", fund.get("code")):
+                fund = {**fund, "name": entry["name"]}
+            named.append(fund)
+        return named
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Funds whose code or name has a token starting with each query token
+
+        Ranked: exact code, code prefix, name prefix, then any token match.
+        """
+        self._reload_if_changed()
+        with self._lock:
+            funds, index = self._funds, self._index
+        return [funds[code] for code in index.search(query, limit)]
+
+
+# Create catalog instance
+fund_catalog = FundCatalog()
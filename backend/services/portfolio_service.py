@@ -0,0 +1,220 @@
+"""
+Portfolio Valuation Service
+Values holdings against cached prices with vectorized (NumPy) P&L math
+"""
+import math
+from threading import Lock
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+import numpy as np
+from cache.cache_manager import cache
+import metrics
+from models.schemas import PortfolioHolding
+
+logger = logging.getLogger(__name__)
+
+# Forex symbols quoting <currency>/TRY
+FX_SYMBOLS: Dict[str, str] = {
+    "USD": "TRY=X",
+    "EUR": "EURTRY=X",
+    "GBP": "GBPTRY=X",
+}
+
+# Yahoo commodity futures are quoted in USD
+COMMODITY_CURRENCY = "USD"
+
+
+class PriceTable:
+    """
+    Flat price lookup built once per cache version
+
+    Every priceable symbol maps to a row in two parallel arrays: the price in
+    its native currency and the native-currency → TRY rate.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Args:
+            data: Snapshot from cache.get_all_data()
+        """
+        forex_rates = {item.get("symbol"): item.get("rate") for item in data.get("forex", [])}
+        self.fx: Dict[str, float] = {"TRY": 1.0}
+        for currency, symbol in FX_SYMBOLS.items():
+            rate = forex_rates.get(symbol)
+            self.fx[currency] = float(rate) if rate else np.nan
+
+        self._rows: Dict[str, int] = {}
+        prices: List[float] = []
+        rates: List[float] = []
+
+        def add(symbol: Optional[str], price: Any, currency: str) -> None:
+            if not symbol or price is None:
+                return
+            self._rows[symbol.upper()] = len(prices)
+            prices.append(float(price))
+            rates.append(self.fx[currency])
+
+        for stock in data.get("bist100", []):
+            add(stock.get("symbol"), stock.get("price"), "TRY")
+        for fund in data.get("funds", []):
+            add(fund.get("code"), fund.get("price"), "TRY")
+        for commodity in data.get("commodities", []):
+            add(commodity.get("symbol"), commodity.get("price"), COMMODITY_CURRENCY)
+        for currency, symbol in FX_SYMBOLS.items():
+            # Cash positions can be given either as the pair symbol or the currency code
+            rate = forex_rates.get(symbol)
+            add(symbol, rate, "TRY")
+            add(currency, rate, "TRY")
+        add("TRY", 1.0, "TRY")
+
+        # Sentinel NaN row at the end for unknown symbols
+        self.prices = np.array(prices + [np.nan], dtype=np.float64)
+        self.rates_to_try = np.array(rates + [np.nan], dtype=np.float64)
+        self.missing_row = len(prices)
+
+    def row_of(self, symbol: str) -> int:
+        """Row index for a symbol ('THYAO' also resolves to 'THYAO.IS')"""
+        key = symbol.strip().upper()
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows.get(f"{key}.IS", self.missing_row)
+        return row
+
+
+class PortfolioService:
+    """Value portfolios against the live cache"""
+
+    def __init__(self):
+        self._table: Optional[PriceTable] = None
+        self._table_version = -1
+        self._lock = Lock()
+
+    def _get_price_table(self) -> PriceTable:
+        """Return the price table for the current cache version (rebuilt lazily)"""
+        version = cache.get_version()
+        with self._lock:
+            if self._table is None or self._table_version != version:
+                metrics.cache_requests.inc(cache="price_table", result="miss")
+                self._table = PriceTable(cache.get_all_data())
+                self._table_version = version
+            else:
+                metrics.cache_requests.inc(cache="price_table", result="hit")
+            return self._table
+
+    @staticmethod
+    def _round(value: float, digits: int = 2) -> Optional[float]:
+        return None if math.isnan(value) else round(value, digits)
+
+    def value_portfolios(self, portfolios: List[List[PortfolioHolding]]) -> List[Dict[str, Any]]:
+        """
+        Value many portfolios in a single vectorized pass
+
+        Args:
+            portfolios: One list of holdings per portfolio
+
+        Returns:
+            One valuation dict per portfolio (positions + totals in TRY and USD);
+            positions without a price or an FX rate for their price or cost
+            currency are left out of the totals and listed in missing_symbols
+
+        Raises:
+            ValueError: If a holding uses an unsupported cost currency
+        """
+        table = self._get_price_table()
+        flat: List[Tuple[int, PortfolioHolding]] = [
+            (portfolio_id, holding)
+            for portfolio_id, holdings in enumerate(portfolios)
+            for holding in holdings
+        ]
+        n = len(flat)
+
+        for _, holding in flat:
+            if holding.currency.upper() not in table.fx:
+                raise ValueError(
+                    f"Unsupported currency '{holding.currency}' for {holding.symbol}. "
+                    f"Use one of: {', '.join(table.fx)}"
+                )
+
+        owners = np.fromiter((pid for pid, _ in flat), dtype=np.int64, count=n)
+        rows = np.fromiter((table.row_of(h.symbol) for _, h in flat), dtype=np.int64, count=n)
+        quantity = np.fromiter((h.quantity for _, h in flat), dtype=np.float64, count=n)
+        cost_basis = np.fromiter((h.cost_basis for _, h in flat), dtype=np.float64, count=n)
+        cost_rate = np.fromiter((table.fx[h.currency.upper()] for _, h in flat), dtype=np.float64, count=n)
+
+        price = table.prices[rows]
+        value_try = quantity * price * table.rates_to_try[rows]
+        cost_try = quantity * cost_basis * cost_rate
+        pnl_try = value_try - cost_try
+
+        usd_try = table.fx["USD"]
+        value_usd = value_try / usd_try
+        cost_usd = cost_try / usd_try
+        pnl_usd = pnl_try / usd_try
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pnl_percent = np.where(cost_try > 0, pnl_try / cost_try * 100, np.nan)
+
+        # Per-portfolio totals over positions with both a TRY value and a TRY cost:
+        # a cost without its FX rate would otherwise count as 0 and inflate the P&L
+        priced = ~np.isnan(value_try)
+        counted = priced & ~np.isnan(cost_try)
+        count = len(portfolios)
+        total_value_try = np.bincount(owners, weights=np.where(counted, value_try, 0.0), minlength=count)
+        total_cost_try = np.bincount(owners, weights=np.where(counted, cost_try, 0.0), minlength=count)
+        total_pnl_try = total_value_try - total_cost_try
+        with np.errstate(divide="ignore", invalid="ignore"):
+            total_pnl_percent = np.where(total_cost_try > 0, total_pnl_try / total_cost_try * 100, np.nan)
+
+        # Plain Python floats from here on: NumPy scalar access per field is slow
+        totals = zip(
+            total_value_try.tolist(), total_cost_try.tolist(),
+            total_pnl_try.tolist(), total_pnl_percent.tolist()
+        )
+        results: List[Dict[str, Any]] = [
+            {
+                "positions": [],
+                "missing_symbols": [],
+                "totals": {
+                    "value_try": self._round(t_value),
+                    "cost_try": self._round(t_cost),
+                    "pnl_try": self._round(t_pnl),
+                    "value_usd": self._round(t_value / usd_try),
+                    "cost_usd": self._round(t_cost / usd_try),
+                    "pnl_usd": self._round(t_pnl / usd_try),
+                    "pnl_percent": self._round(t_percent),
+                },
+            }
+            for t_value, t_cost, t_pnl, t_percent in totals
+        ]
+
+        columns = zip(
+            flat, priced.tolist(), counted.tolist(), price.tolist(),
+            value_try.tolist(), cost_try.tolist(), pnl_try.tolist(),
+            value_usd.tolist(), cost_usd.tolist(), pnl_usd.tolist(), pnl_percent.tolist()
+        )
+        for (pid, holding), is_priced, is_counted, p, v_try, c_try, g_try, v_usd, c_usd, g_usd, g_pct in columns:
+            if not is_counted:
+                results[pid]["missing_symbols"].append(holding.symbol)
+            results[pid]["positions"].append({
+                "symbol": holding.symbol,
+                "quantity": holding.quantity,
+                "price": self._round(p, 4),
+                "priced": is_priced,
+                "value_try": self._round(v_try),
+                "cost_try": self._round(c_try),
+                "pnl_try": self._round(g_try),
+                "value_usd": self._round(v_usd),
+                "cost_usd": self._round(c_usd),
+                "pnl_usd": self._round(g_usd),
+                "pnl_percent": self._round(g_pct),
+            })
+
+        return results
+
+    def value_portfolio(self, holdings: List[PortfolioHolding]) -> Dict[str, Any]:
+        """Value a single portfolio"""
+        return self.value_portfolios([holdings])[0]
+
+
+# Create service instance
+portfolio_service = PortfolioService()
@@ -0,0 +1,291 @@
+"""
+Quote Service - On-Demand Quotes with Stale-While-Revalidate
+Serves any Yahoo symbol without waiting on Yahoo: scheduled symbols come
+from the main cache, the long tail from a bounded LRU/TTL tier filled by a
+rate-limited background fetcher (the leader's, in leader/follower mode).
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+import logging
+from config import settings
+from cache.cache_manager import cache
+from cache.freshness import FRESH_SOURCES
+from cache.quote_cache import QuoteCache
+from cache.quote_store import QuoteStore
+from cache.records import Quote
+from services.yahoo_service import yahoo_service
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Yahoo symbols: THYAO.IS, AAPL, TRY=X, GC=F, ^GSPC, BRK-B
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9^][A-Z0-9.=^&-]{0,19}$")
+
+
+class QuoteService:
+    """
+    Quote lookups that never block on upstream
+
+    - Scheduled symbols (BIST100, forex, commodities) come from the main
+      cache; stale ones are flagged and left to the scheduler's freshness job.
+    - Other symbols come from the LRU/TTL tier. Stale hits are returned
+      immediately and queued for refresh; misses are reported as pending.
+    - One background thread drains the queue in Yahoo-chunk-sized batches,
+      at most one request per ON_DEMAND_MIN_INTERVAL_SECONDS, through the
+      single-flight layer and a breaker of their own (yahoo_on_demand).
+    - In leader/follower mode only the leader fetches. Followers forward
+      their queue through a shared QuoteStore and copy the leader's results
+      into their own tier; their request path stays in memory.
+    """
+
+    def __init__(self, source: Any = yahoo_service):
+        """
+        Args:
+            source: Market source with fetch_on_demand
+        """
+        self.source = source
+        self.tier = QuoteCache(
+            settings.ON_DEMAND_CACHE_SIZE, settings.ON_DEMAND_FRESH_SECONDS, settings.ON_DEMAND_MAX_AGE_SECONDS
+        )
+        self._pending: "OrderedDict[str, None]" = OrderedDict()
+        # Symbols Yahoo had no quote for -> monotonic time of the miss (not re-queued until fresh_seconds pass)
+        self._not_found: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._last_fetch = 0.0
+        self.store: Optional[QuoteStore] = None  # Leader/follower mode only
+        self._following = False
+        self._store_seq = 0  # Last QuoteStore batch copied into the tier
+
+    def lead(self, store: QuoteStore) -> None:
+        """Fetch for every worker: drain the store's forwarded misses and publish results to it"""
+        self.store = store
+        self._following = False
+        self._start_worker()
+
+    def follow(self, store: QuoteStore) -> None:
+        """Never fetch: forward misses to the leader through the store and copy its quotes"""
+        self.store = store
+        self._following = True
+        self._start_worker()
+
+    def _start_worker(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="on-demand-quotes", daemon=True)
+                self._worker.start()
+
+    @staticmethod
+    def normalize(symbol: str) -> str:
+        return symbol.strip().upper()
+
+    @staticmethod
+    def is_valid(symbol: str) -> bool:
+        return bool(SYMBOL_PATTERN.match(symbol))
+
+    @staticmethod
+    def _is_stale(record: Quote, now: float) -> bool:
+        """Main-cache record older than the stocks SLO, or mock data"""
+        if record.get("source", "live") not in FRESH_SOURCES:
+            return True
+        fetched_at = record.fetched_at
+        if fetched_at is None:
+            return True
+        return now - fetched_at > settings.FRESHNESS_SLO_SECONDS["stocks"]
+
+    def get_quotes(self, symbols: List[str]) -> Dict[str, Any]:
+        """
+        Quotes for the requested symbols, answered from memory only
+
+        Returns:
+            {"quotes": [record + "stale"], "pending": [...], "not_found": [...]}
+        """
+        now = datetime.now().timestamp()
+        quotes: List[Dict[str, Any]] = []
+        pending: List[str] = []
+        not_found: List[str] = []
+        refresh: List[str] = []
+        for symbol in symbols:
+            record = cache.get_quote(symbol)
+            if record is not None:
+                quotes.append({**record, "stale": self._is_stale(record, now)})
+                continue
+
+            record, stale = self.tier.get(symbol)
+            if record is not None:
+                quotes.append({**record, "stale": stale})
+                if stale:
+                    refresh.append(symbol)
+            elif self._recently_not_found(symbol):
+                not_found.append(symbol)
+            else:
+                pending.append(symbol)
+                refresh.append(symbol)
+
+        if refresh:
+            self._enqueue(refresh)
+        return {"quotes": quotes, "pending": pending, "not_found": not_found}
+
+    def _recently_not_found(self, symbol: str) -> bool:
+        with self._lock:
+            missed_at = self._not_found.get(symbol)
+            if missed_at is None:
+                return False
+            if time.monotonic() - missed_at > settings.ON_DEMAND_FRESH_SECONDS:
+                del self._not_found[symbol]
+                return False
+            return True
+
+    def _enqueue(self, symbols: List[str]) -> None:
+        with self._lock:
+            for symbol in symbols:
+                if len(self._pending) >= settings.ON_DEMAND_MAX_PENDING:
+                    metrics.on_demand_fetches.inc(outcome="dropped")
+                    continue
+                self._pending[symbol] = None
+            metrics.on_demand_pending.set(len(self._pending))
+        self._start_worker()
+        self._wakeup.set()
+
+    def _next_batch(self) -> List[str]:
+        with self._lock:
+            batch: List[str] = []
+            while self._pending and len(batch) < settings.ON_DEMAND_BATCH_SIZE:
+                batch.append(self._pending.popitem(last=False)[0])
+            if not self._pending:
+                self._wakeup.clear()
+            metrics.on_demand_pending.set(len(self._pending))
+            return batch
+
+    def _requeue(self, batch: List[str]) -> None:
+        with self._lock:
+            for symbol in reversed(batch):
+                self._pending[symbol] = None
+                self._pending.move_to_end(symbol, last=False)
+            metrics.on_demand_pending.set(len(self._pending))
+        self._wakeup.set()
+
+    def _take_pending(self) -> List[str]:
+        with self._lock:
+            symbols = list(self._pending)
+            self._pending.clear()
+            metrics.on_demand_pending.set(0)
+            return symbols
+
+    def _adopt_forwarded(self) -> None:
+        """Leader: queue the misses followers forwarded through the store"""
+        assert self.store is not None
+        try:
+            symbols = self.store.take_requests()
+        except Exception as e:
+            logger.error(f"❌ Error reading forwarded on-demand symbols: {e}")
+            return
+        with self._lock:
+            for symbol in symbols:
+                if symbol not in self._pending and len(self._pending) < settings.ON_DEMAND_MAX_PENDING:
+                    self._pending[symbol] = None
+            metrics.on_demand_pending.set(len(self._pending))
+
+    def _sync_with_leader(self) -> None:
+        """Follower: forward queued misses, then copy quotes the leader stored since the last sync"""
+        assert self.store is not None
+        symbols = self._take_pending()
+        try:
+            self.store.request(symbols)
+            rows, self._store_seq = self.store.updated_since(self._store_seq)
+        except Exception as e:
+            logger.error(f"❌ On-demand quote sync failed: {e}")
+            self._requeue(symbols)
+            return
+
+        # The tier ages entries by monotonic time; keep the leader's fetch time
+        offset = time.monotonic() - time.time()
+        with self._lock:
+            for symbol, record, fetched_at in rows:
+                if record is None:
+                    self._not_found[symbol] = fetched_at + offset
+            while len(self._not_found) > settings.ON_DEMAND_CACHE_SIZE:
+                self._not_found.popitem(last=False)
+        for symbol, record, fetched_at in rows:
+            if record is not None:
+                self.tier.put_many([record], now=fetched_at + offset)
+
+    def _run(self) -> None:
+        """Background fetcher (follower: sync loop), one rate-limited batch at a time"""
+        while not self._stop.is_set():
+            if self._following:
+                # Polled, not woken per miss: a burst of requests is one write
+                if not self._stop.wait(settings.ON_DEMAND_SYNC_SECONDS):
+                    self._sync_with_leader()
+                continue
+
+            self._wakeup.wait(1.0)
+            if self.store is not None:
+                self._adopt_forwarded()
+            if not self._pending:
+                continue
+
+            # Rate limit: keep on-demand traffic from eating the scheduled groups' budget
+            wait = settings.ON_DEMAND_MIN_INTERVAL_SECONDS - (time.monotonic() - self._last_fetch)
+            if wait > 0 and self._stop.wait(wait):
+                break
+            self._last_fetch = time.monotonic()
+
+            batch = self._next_batch()
+            if batch:
+                self._fetch(batch)
+
+    def _fetch(self, batch: List[str]) -> None:
+        try:
+            records = self.source.fetch_on_demand(batch)
+        except Exception as e:
+            logger.error(f"❌ On-demand fetch failed for {', '.join(batch)}: {e}")
+            metrics.on_demand_fetches.inc(outcome="error")
+            return
+
+        if records is None:
+            # On-demand circuit open: keep the batch queued until a probe closes it
+            metrics.on_demand_fetches.inc(outcome="deferred")
+            self._requeue(batch)
+            return
+
+        self.tier.put_many(records)
+        found = {r["symbol"] for r in records}
+        missing = [symbol for symbol in batch if symbol not in found]
+        if self.store is not None:
+            try:
+                self.store.put(records, missing, settings.ON_DEMAND_MAX_AGE_SECONDS)
+            except Exception as e:
+                logger.error(f"❌ Error sharing on-demand quotes with followers: {e}")
+        now = time.monotonic()
+        with self._lock:
+            for symbol in missing:
+                self._not_found[symbol] = now
+            while len(self._not_found) > settings.ON_DEMAND_CACHE_SIZE:
+                self._not_found.popitem(last=False)
+        metrics.on_demand_fetches.inc(outcome="ok")
+        logger.info(f"📥 On-demand quotes: {len(found)} fetched" + (f", {len(missing)} not found" if missing else ""))
+
+    def stop(self) -> None:
+        """Stop the background fetcher"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+        if self.store is not None:
+            self.store.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {**self.tier.stats(), "pending": pending}
+
+
+# Create service instance
+quote_service = QuoteService()
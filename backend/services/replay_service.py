@@ -0,0 +1,311 @@
+"""
+Replay Service - Recorded or Synthetic Market Replay
+Stands in for yahoo_service and tefas_service so load and soak tests drive
+the normal DataScheduler -> CacheManager -> API path without the network.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+import logging
+import numpy as np
+from config import settings
+from services.mock_data_service import CorrelatedGBM, TRADING_SECONDS_PER_YEAR
+
+logger = logging.getLogger(__name__)
+
+# Calendar seconds -> trading seconds (volatility is quoted per trading year)
+CALENDAR_TO_TRADING = TRADING_SECONDS_PER_YEAR / (365 * 86400)
+
+# Starting levels for the fixed forex / commodity universes
+REFERENCE_PRICES: Dict[str, float] = {"TRY=X": 34.25, "EURTRY=X": 37.0, "GBPTRY=X": 43.5, "GC=F": 2700.0, "SI=F": 31.0}
+
+
+class ReplayClock:
+    """Simulated time running `speed` times faster than the wall clock"""
+
+    def __init__(self, start: float, speed: float):
+        self.start = start
+        self.speed = speed
+        self._wall_start = time.monotonic()
+
+    def now(self) -> float:
+        return self.start + (time.monotonic() - self._wall_start) * self.speed
+
+
+class _Series:
+    """Latest simulated quote per symbol, stored column-wise"""
+
+    def __init__(self, symbols: List[str], prices: np.ndarray, start: float):
+        self.symbols = symbols
+        self.rows = {symbol: row for row, symbol in enumerate(symbols)}
+        self.price = prices.astype(np.float64)
+        self.previous_close = self.price.copy()
+        self.updated_at = np.full(len(symbols), start)
+        self.day = np.full(len(symbols), int(start // 86400))
+
+
+class ReplayEngine:
+    """
+    Market source with the yahoo_service / tefas_service fetch interface
+
+    Synthetic mode walks a correlated GBM forward by however much simulated
+    time passed since each symbol was last fetched. Recorded mode replays a
+    JSONL tick file ({"ts", "symbol", "price", "volume"?}) in time order.
+    Either way, every record is tagged source='replay' and carries its
+    simulated time in 'replay_time'.
+    """
+
+    use_mock_data = False  # Never in Ghost Mode
+
+    def __init__(
+        self,
+        source: str = "synthetic",
+        speed: float = 1440.0,
+        symbol_count: int = 10000,
+        fund_count: int = 500,
+        seed: Optional[int] = 42
+    ):
+        """
+        Args:
+            source: "synthetic" or a path to a JSONL tick file
+            speed: Simulated seconds per wall-clock second
+            symbol_count: Size of the synthetic stock universe (BIST100 + generated)
+            fund_count: Size of the synthetic fund universe
+            seed: RNG seed for synthetic prices
+        """
+        self.source = source
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(seed)
+        self.stats = {"fetches": 0, "records": 0, "bytes": 0}
+
+        if source == "synthetic":
+            symbols = self._synthetic_symbols(symbol_count)
+            start = datetime.now().timestamp()
+            self._ticks: Optional[List[Dict[str, Any]]] = None
+        else:
+            self._ticks = self._load_ticks(source)
+            symbols = sorted({tick["symbol"] for tick in self._ticks})
+            start = self._ticks[0]["ts"] if self._ticks else datetime.now().timestamp()
+        self._tick_cursor = 0
+
+        self.clock = ReplayClock(start, speed)
+        self._stocks = _Series(symbols, self._rng.uniform(5, 500, len(symbols)), start)
+        self._shares = self._rng.uniform(5e7, 3e9, len(symbols))
+        self._stock_model = CorrelatedGBM(
+            volatility=settings.MOCK_VOLATILITY["stocks"], correlation=settings.MOCK_CORRELATION, seed=seed
+        )
+
+        fund_codes = [f"R{i:04d}" for i in range(fund_count)]
+        self._funds = _Series(fund_codes, self._rng.uniform(0.5, 50, fund_count), start)
+        self._fund_model = CorrelatedGBM(volatility=0.15, correlation=0.3, seed=None if seed is None else seed + 1)
+
+        self._forex = self._fixed_series(settings.FOREX_SYMBOLS, start)
+        self._commodities = self._fixed_series(settings.COMMODITY_SYMBOLS, start)
+        self._fx_model = CorrelatedGBM(volatility=settings.MOCK_VOLATILITY["forex"], seed=None if seed is None else seed + 2)
+        self._commodity_model = CorrelatedGBM(
+            volatility=settings.MOCK_VOLATILITY["commodities"], seed=None if seed is None else seed + 3
+        )
+        logger.info(f"🎬 Replay engine ready: {len(symbols)} stocks, {fund_count} funds, {speed:g}x ({source})")
+
+    @staticmethod
+    def _fixed_series(symbols: List[str], start: float) -> _Series:
+        prices = np.array([REFERENCE_PRICES.get(symbol, 100.0) for symbol in symbols])
+        return _Series(list(symbols), prices, start)
+
+    @staticmethod
+    def _synthetic_symbols(count: int) -> List[str]:
+        symbols = list(dict.fromkeys(settings.BIST100_SYMBOLS))[:count]
+        symbols.extend(f"SYN{i:05d}.IS" for i in range(count - len(symbols)))
+        return symbols
+
+    @staticmethod
+    def _load_ticks(path: str) -> List[Dict[str, Any]]:
+        ticks: List[Dict[str, Any]] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                tick = json.loads(line)
+                ts = tick["ts"]
+                tick["ts"] = float(ts) if isinstance(ts, (int, float)) else datetime.fromisoformat(ts).timestamp()
+                ticks.append(tick)
+        ticks.sort(key=lambda t: t["ts"])
+        return ticks
+
+    def stock_groups(self, count: int = 5) -> List[List[str]]:
+        """Split the replay universe into scheduler groups"""
+        return [list(group) for group in np.array_split(np.array(self._stocks.symbols, dtype=object), count)]
+
+    def _advance(self, series: _Series, model: CorrelatedGBM, rows: np.ndarray, now: float) -> None:
+        """Walk the given rows forward to `now` (synthetic mode)"""
+        elapsed = np.maximum(now - series.updated_at[rows], 0.0)
+        today = int(now // 86400)
+        # Crossing midnight: the last price becomes the previous close
+        new_day = series.day[rows] != today
+        if new_day.any():
+            series.previous_close[rows[new_day]] = series.price[rows[new_day]]
+            series.day[rows[new_day]] = today
+        series.price[rows] = model.advance(series.price[rows], elapsed * CALENDAR_TO_TRADING)
+        series.updated_at[rows] = now
+
+    def _apply_ticks(self, now: float) -> None:
+        """Apply recorded ticks up to `now` (recorded mode)"""
+        assert self._ticks is not None
+        series = self._stocks
+        while self._tick_cursor < len(self._ticks) and self._ticks[self._tick_cursor]["ts"] <= now:
+            tick = self._ticks[self._tick_cursor]
+            row = series.rows[tick["symbol"]]
+            day = int(tick["ts"] // 86400)
+            if series.day[row] != day:
+                series.previous_close[row] = series.price[row]
+                series.day[row] = day
+            series.price[row] = float(tick["price"])
+            if "previous_close" in tick:
+                series.previous_close[row] = float(tick["previous_close"])
+            series.updated_at[row] = tick["ts"]
+            self._tick_cursor += 1
+
+    def _count(self, records: List[Dict[str, Any]]) -> None:
+        self.stats["fetches"] += 1
+        self.stats["records"] += len(records)
+        self.stats["bytes"] += len(json.dumps(records, ensure_ascii=False))
+
+    def fetch_stock_group(self, symbols: List[str], group_name: str = "stocks") -> List[Dict[str, Any]]:
+        """Current simulated quotes for the requested symbols (unknown symbols are skipped)"""
+        with self._lock:
+            series = self._stocks
+            known = [s for s in symbols if s in series.rows]
+            if not known:
+                return []
+            rows = np.fromiter((series.rows[s] for s in known), dtype=np.int64, count=len(known))
+            now = self.clock.now()
+            if self._ticks is None:
+                self._advance(series, self._stock_model, rows, now)
+            else:
+                self._apply_ticks(now)
+
+            price = series.price[rows]
+            previous = series.previous_close[rows]
+            change = price - previous
+            change_percent = np.divide(change * 100, previous, out=np.zeros_like(change), where=previous > 0)
+            volume = self._rng.integers(100_000, 50_000_000, len(known))
+            market_cap = price * self._shares[rows]
+            timestamp = datetime.now().isoformat()
+            replay_time = datetime.fromtimestamp(now).isoformat()
+
+            records = [
+                {
+                    "symbol": symbol,
+                    "name": symbol.replace(".IS", ""),
+                    "price": p,
+                    "change": c,
+                    "change_percent": cp,
+                    "volume": v,
+                    "market_cap": mc,
+                    "timestamp": timestamp,
+                    "source": "replay",
+                    "replay_time": replay_time
+                }
+                for symbol, p, c, cp, v, mc in zip(
+                    known,
+                    np.round(price, 2).tolist(),
+                    np.round(change, 2).tolist(),
+                    np.round(change_percent, 2).tolist(),
+                    volume.tolist(),
+                    np.round(market_cap, 0).tolist()
+                )
+            ]
+            self._count(records)
+            return records
+
+    def fetch_stock_data_batch(self, tickers: List[str], chunk_size: int = 10) -> List[Dict[str, Any]]:
+        return self.fetch_stock_group(tickers)
+
+    def fetch_on_demand(self, tickers: List[str]) -> Optional[List[Dict[str, Any]]]:
+        return self.fetch_stock_group(tickers)
+
+    def _quotes(self, series: _Series, model: CorrelatedGBM) -> List[Dict[str, Any]]:
+        rows = np.arange(len(series.symbols))
+        now = self.clock.now()
+        self._advance(series, model, rows, now)
+        timestamp = datetime.now().isoformat()
+        return [
+            {
+                "symbol": symbol,
+                "price": price,
+                "previous_close": previous,
+                "timestamp": timestamp,
+                "replay_time": datetime.fromtimestamp(now).isoformat()
+            }
+            for symbol, price, previous in zip(series.symbols, series.price.tolist(), series.previous_close.tolist())
+        ]
+
+    def fetch_forex(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            records = [
+                {
+                    "pair": q["symbol"].replace("=X", "").replace("TRY", "/TRY") if q["symbol"] != "TRY=X" else "USD/TRY",
+                    "symbol": q["symbol"],
+                    "rate": round(q["price"], 4),
+                    "change": round(q["price"] - q["previous_close"], 4),
+                    "change_percent": round((q["price"] / q["previous_close"] - 1) * 100, 2),
+                    "timestamp": q["timestamp"],
+                    "source": "replay",
+                    "replay_time": q["replay_time"]
+                }
+                for q in self._quotes(self._forex, self._fx_model)
+            ]
+            self._count(records)
+            return records
+
+    def fetch_commodities(self) -> List[Dict[str, Any]]:
+        names = {"GC=F": "Gold Futures", "SI=F": "Silver Futures"}
+        with self._lock:
+            records = [
+                {
+                    "symbol": q["symbol"],
+                    "name": names.get(q["symbol"], q["symbol"]),
+                    "price": round(q["price"], 2),
+                    "change": round(q["price"] - q["previous_close"], 2),
+                    "change_percent": round((q["price"] / q["previous_close"] - 1) * 100, 2),
+                    "timestamp": q["timestamp"],
+                    "source": "replay",
+                    "replay_time": q["replay_time"]
+                }
+                for q in self._quotes(self._commodities, self._commodity_model)
+            ]
+            self._count(records)
+            return records
+
+    def fetch_all_funds(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            records = [
+                {
+                    "code": q["symbol"],
+                    "name": q["symbol"],
+                    "price": round(q["price"], 4),
+                    "change": round(q["price"] - q["previous_close"], 4),
+                    "change_percent": round((q["price"] / q["previous_close"] - 1) * 100, 2),
+                    "timestamp": q["timestamp"],
+                    "source": "replay",
+                    "replay_time": q["replay_time"]
+                }
+                for q in self._quotes(self._funds, self._fund_model)
+            ]
+            self._count(records)
+            return records
+
+
+def create_replay_engine(source: Optional[str] = settings.REPLAY_SOURCE) -> Optional[ReplayEngine]:
+    """Build the replay engine if replay mode is configured"""
+    if not source:
+        return None
+    return ReplayEngine(
+        source=source,
+        speed=settings.REPLAY_SPEED,
+        symbol_count=settings.REPLAY_SYMBOLS,
+        fund_count=settings.REPLAY_FUNDS,
+        seed=settings.MOCK_SEED if settings.MOCK_SEED is not None else 42
+    )
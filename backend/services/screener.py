@@ -0,0 +1,72 @@
+"""
+Stock Screener - Filter Query Language
+Parses screener filter expressions for the columnar stock view
+
+Syntax (one condition per `filter` query parameter, or several joined with ';'):
+    change_percent>2
+    volume>=5e6
+    market_cap between 1e9 and 5e10      (inclusive, ',' also accepted)
+"""
+import re
+from typing import List, Tuple
+
+Condition = Tuple[str, str, Tuple[float, ...]]
+
+_COMPARISON_RE = re.compile(r"^\s*([a-z_]+)\s*(>=|<=|!=|>|<|=)\s*([-+0-9.eE]+)\s*$")
+_BETWEEN_RE = re.compile(
+    r"^\s*([a-z_]+)\s+between\s+([-+0-9.eE]+)\s*(?:,|\s+and\s+)\s*([-+0-9.eE]+)\s*$",
+    re.IGNORECASE
+)
+
+
+def _parse_number(raw: str, expression: str) -> float:
+    try:
+        return float(raw)
+    except ValueError:
+        raise ValueError(f"Invalid number '{raw}' in filter '{expression}'")
+
+
+def parse_condition(expression: str, allowed_fields: List[str]) -> Condition:
+    """
+    Parse a single filter expression
+
+    Args:
+        expression: e.g. 'volume>5e6' or 'market_cap between 1e9 and 5e10'
+        allowed_fields: Fields the columnar view can filter on
+
+    Returns:
+        (field, operator, values) triple
+
+    Raises:
+        ValueError: If the expression is malformed or uses an unknown field
+    """
+    between = _BETWEEN_RE.match(expression)
+    if between:
+        field, raw_low, raw_high = between.groups()
+        low = _parse_number(raw_low, expression)
+        high = _parse_number(raw_high, expression)
+        if low > high:
+            low, high = high, low
+        condition: Condition = (field, "between", (low, high))
+    else:
+        comparison = _COMPARISON_RE.match(expression)
+        if not comparison:
+            raise ValueError(f"Cannot parse filter '{expression}'")
+        field, op, raw_value = comparison.groups()
+        condition = (field, op, (_parse_number(raw_value, expression),))
+
+    if condition[0] not in allowed_fields:
+        raise ValueError(
+            f"Unknown filter field '{condition[0]}'. Use one of: {', '.join(allowed_fields)}"
+        )
+    return condition
+
+
+def parse_conditions(expressions: List[str], allowed_fields: List[str]) -> List[Condition]:
+    """Parse every filter parameter (each may hold several ';'-separated conditions)"""
+    conditions: List[Condition] = []
+    for raw in expressions:
+        for expression in raw.split(";"):
+            if expression.strip():
+                conditions.append(parse_condition(expression, allowed_fields))
+    return conditions
@@ -0,0 +1,163 @@
+"""
+Search Service - Type-Ahead Across Asset Types
+One prefix index over stock, forex and commodity symbols/names plus every
+TEFAS fund, kept in step with the cache as writes land
+"""
+import threading
+from typing import List, Dict, Any, Mapping, Optional, Tuple
+import logging
+from cache.cache_manager import cache, CacheManager, sector_of
+from cache.search_index import PrefixIndex
+from services.fund_catalog import fund_catalog, FundCatalog
+
+logger = logging.getLogger(__name__)
+
+# Cache list -> asset type reported in results
+ASSET_OF_ITEM = {"bist100": "stocks", "forex": "forex", "commodities": "commodities", "funds": "funds"}
+ASSETS = tuple(ASSET_OF_ITEM.values())
+
+Entry = Dict[str, Any]
+
+
+def _stock_entry(record: Mapping) -> Tuple[Entry, Tuple[str, ...]]:
+    symbol = record["symbol"]
+    sector = sector_of(symbol)
+    entry = {"asset": "stocks", "symbol": symbol, "name": record.get("name") or symbol, "sector": sector}
+    return entry, (symbol, entry["name"], sector)
+
+
+def _market_entry(asset: str, record: Mapping) -> Tuple[Entry, Tuple[str, ...]]:
+    symbol = record["symbol"]
+    # Forex records carry their label as 'pair' ("USD/TRY")
+    name = record.get("name") or record.get("pair") or symbol
+    return {"asset": asset, "symbol": symbol, "name": name}, (symbol, name)
+
+
+def _fund_entry(fund: Mapping) -> Tuple[Entry, Tuple[str, ...]]:
+    code = fund["code"]
+    entry = {"asset": "funds", "code": code, "name": fund.get("name") or code}
+    for field in ("type", "company"):
+        if fund.get(field):
+            entry[field] = fund[field]
+    return entry, (code, entry["name"], entry.get("company") or "")
+
+
+class SearchService:
+    """
+    Multi-asset type-ahead search
+
+    Documents are stocks, forex pairs and commodities from the cache, and
+    funds from the fund catalog (cached funds not in the catalog too).
+    A cache listener re-indexes only the records a write touched whose
+    name changed. Writes that bypass listeners (startup loads, follower
+    snapshots) and catalog refreshes are caught on the next search by
+    comparing the cache version / catalog timestamp, and reconciled in one
+    pass.
+    """
+
+    def __init__(self, manager: CacheManager = cache, catalog: FundCatalog = fund_catalog):
+        self.manager = manager
+        self.catalog = catalog
+        self.index = PrefixIndex()
+        self._entries: Dict[str, Entry] = {}  # doc_id -> result entry
+        self._lock = threading.Lock()
+        self._catalog_funds: Dict[str, Mapping] = {}
+        self._synced_version = -1
+        self._synced_catalog: Optional[str] = None
+        self._synced_lists: Dict[str, List[Any]] = {}  # asset -> cache list object last reconciled
+        manager.add_listener(self._on_write)
+
+    @staticmethod
+    def _doc_id(asset: str, key: str) -> str:
+        return f"{asset}:{key}"
+
+    def _entry_for(self, asset: str, record: Mapping) -> Optional[Tuple[Entry, Tuple[str, ...]]]:
+        if asset == "funds":
+            if not record.get("code"):
+                return None
+            # Catalog metadata (type, company) wins over the price record
+            return _fund_entry(self._catalog_funds.get(record["code"], record))
+        if not record.get("symbol"):
+            return None
+        return _stock_entry(record) if asset == "stocks" else _market_entry(asset, record)
+
+    def _put(self, asset: str, record: Mapping) -> None:
+        """Index one document unless it is already indexed as is (caller holds the lock)"""
+        built = self._entry_for(asset, record)
+        if built is None:
+            return
+        entry, texts = built
+        doc_id = self._doc_id(asset, texts[0])
+        if self._entries.get(doc_id) == entry:
+            return
+        self._entries[doc_id] = entry
+        self.index.add(doc_id, *texts)
+
+    def _drop(self, doc_id: str) -> None:
+        if self._entries.pop(doc_id, None) is not None:
+            self.index.remove(doc_id)
+
+    def _on_write(self, item_key: str, previous: Dict[str, Any], updated: List[Any]) -> None:
+        """Cache listener: index the written records, drop the ones a replace removed"""
+        asset = ASSET_OF_ITEM.get(item_key)
+        if asset is None:
+            return
+        with self._lock:
+            for record in updated:
+                self._put(asset, record)
+            kept = {record.get("symbol") or record.get("code") for record in updated}
+            for key in previous:
+                if key not in kept and not (asset == "funds" and key in self._catalog_funds):
+                    self._drop(self._doc_id(asset, key))
+            self._synced_version = self.manager.get_version()
+
+    def _sync(self) -> None:
+        """Reconcile with the cache and catalog if they moved without telling us"""
+        version = self.manager.get_version()
+        catalog_updated = self.catalog.updated_at
+        if version == self._synced_version and catalog_updated == self._synced_catalog:
+            return
+        catalog_changed = catalog_updated != self._synced_catalog
+        catalog_funds = {fund["code"]: fund for fund in self.catalog.get_funds()} if catalog_changed else self._catalog_funds
+        lists = {asset: self.manager.get_listing(item_key)[0] for item_key, asset in ASSET_OF_ITEM.items()}
+        with self._lock:
+            self._catalog_funds = catalog_funds
+            for asset, records in lists.items():
+                # Lists are replaced on write: an untouched list needs no pass
+                if records is self._synced_lists.get(asset) and not (asset == "funds" and catalog_changed):
+                    continue
+                wanted = set()
+                for record in records:
+                    self._put(asset, record)
+                    wanted.add(self._doc_id(asset, record.get("symbol") or record.get("code")))
+                if asset == "funds":
+                    for code, fund in catalog_funds.items():
+                        self._put("funds", fund)
+                        wanted.add(self._doc_id("funds", code))
+                prefix = f"{asset}:"
+                for doc_id in [doc_id for doc_id in self._entries if doc_id.startswith(prefix) and doc_id not in wanted]:
+                    self._drop(doc_id)
+                self._synced_lists[asset] = records
+            self._synced_version = version
+            self._synced_catalog = catalog_updated
+
+    def search(self, query: str, limit: int = 20, assets: Optional[List[str]] = None) -> List[Entry]:
+        """
+        Best matches for a (partial) query across asset types
+
+        Args:
+            assets: Restrict to these asset types (default: all)
+
+        Returns:
+            Entries ranked exact symbol/code, symbol/code prefix, name prefix,
+            then any token match
+        """
+        self._sync()
+        prefixes = tuple(f"{asset}:" for asset in assets) if assets else None
+        accept = (lambda doc_id: doc_id.startswith(prefixes)) if prefixes else None
+        with self._lock:
+            return [self._entries[doc_id] for doc_id in self.index.search(query, limit, accept)]
+
+
+# Create service instance
+search_service = SearchService()
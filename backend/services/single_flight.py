@@ -0,0 +1,84 @@
+"""
+Single Flight - Upstream Request Coalescing
+Concurrent callers asking for the same thing share one in-flight call and
+its result (or exception), so refresh storms don't multiply upstream load.
+"""
+import threading
+from typing import Dict, Any, Callable, Hashable, Iterable, Optional, Tuple, TypeVar
+import logging
+import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def symbol_key(symbols: Iterable[str]) -> Tuple[str, ...]:
+    """Order- and duplicate-insensitive key for a symbol set"""
+    return tuple(sorted(set(symbols)))
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it"""
+
+    __slots__ = ("done", "result", "error", "shared")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.shared = 0
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls by key
+
+    The first caller for a key runs the function; callers arriving while it
+    runs block and get the same result. Nothing is cached: once the call
+    returns, the next caller starts a fresh one.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Label for this flight group's metrics
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Run func, or wait for the identical call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                call.shared += 1
+
+        if not leader:
+            metrics.upstream_calls.inc(flight=self.name, role="shared")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        metrics.upstream_calls.inc(flight=self.name, role="leader")
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.shared:
+                logger.info(f"🤝 {self.name}: {call.shared} caller(s) shared one upstream call")
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -2,31 +2,54 @@
 TEFAS Service - Group B Data Fetcher
 Fetches Turkish Investment Funds 3 times daily (10:00, 14:00, 18:00)
 """
-from tefas import Crawler
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 import logging
+import time
+import metrics
+from services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    from tefas import Crawler
+
 class TefasService:
     """Service to fetch TEFAS fund data"""
     
     def __init__(self):
-        """Initialize TEFAS crawler with error handling"""
-        self.crawler: Optional[Crawler] = None
-        try:
-            self.crawler = Crawler()
-            logger.info("✅ TEFAS crawler initialized")
-        except Exception as e:
-            logger.warning(f"⚠️  TEFAS crawler initialization failed: {e}")
-            logger.warning("🎭 TEFAS service will return empty data")
+        """Crawler is created on first fetch (tefas imports pandas and opens a session)"""
+        self._crawler: Optional["Crawler"] = None
+        self._crawler_loaded = False
+        self.flights = SingleFlight("tefas")  # Overlapping refreshes share one crawl
+    
+    @property
+    def crawler(self) -> Optional["Crawler"]:
+        """TEFAS crawler, initialized on first access (None if that failed)"""
+        if not self._crawler_loaded:
+            self._crawler_loaded = True
+            try:
+                from tefas import Crawler
+                self._crawler = Crawler()
+                logger.info("✅ TEFAS crawler initialized")
+            except Exception as e:
+                logger.warning(f"⚠️  TEFAS crawler initialization failed: {e}")
+                logger.warning("🎭 TEFAS service will return empty data")
+        return self._crawler
+    
+    @crawler.setter
+    def crawler(self, crawler: Optional["Crawler"]) -> None:
+        self._crawler = crawler
+        self._crawler_loaded = True
     
     def fetch_all_funds(self) -> List[Dict[str, Any]]:
         """
         Fetch all investment funds from TEFAS
-        Returns list of fund dictionaries
+        Returns list of fund dictionaries (shared with concurrent callers; don't mutate)
         """
+        return self.flights.do("funds", self._fetch_all_funds)
+    
+    def _fetch_all_funds(self) -> List[Dict[str, Any]]:
         if not self.crawler:
             logger.warning("⚠️  TEFAS crawler not available")
             return []
@@ -64,10 +87,14 @@ class TefasService:
                 try:
                     # CRITICAL: Use keyword arguments as required by tefas-crawler
                     # fetch(start=date, columns=list)
-                    fund_df = self.crawler.fetch(
-                        start=start_date,
-                        columns=[fund_code]
-                    )
+                    fetch_started = time.perf_counter()
+                    try:
+                        fund_df = self.crawler.fetch(
+                            start=start_date,
+                            columns=[fund_code]
+                        )
+                    finally:
+                        metrics.tefas_fund_fetch_duration.observe(time.perf_counter() - fetch_started)
                     
                     if fund_df is not None and not fund_df.empty:
                         # Get the most recent row
@@ -93,7 +120,8 @@ class TefasService:
                             "price": round(price, 4),
                             "change": round(change, 4),
                             "change_percent": round(change_percent, 2),
-                            "timestamp": datetime.now().isoformat()
+                            "timestamp": datetime.now().isoformat(),
+                            "source": "live"
                         }
                         
                         funds_data.append(fund_item)
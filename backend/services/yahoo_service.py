@@ -3,98 +3,209 @@ Yahoo Finance Service - Professional Anti-Ban Architecture with YahooQuery (Ghos
 ========================================================================================
 Features:
 - Uses yahooquery (better cookie/crumb handling than yfinance)
-- Circuit Breaker Pattern (stops after 3 failures for 5 minutes)
+- Per-endpoint Circuit Breakers (stop after 3 failures, probe once to recover)
 - Singleton Session with realistic browser headers
 - Ultra-conservative throttling (10-15 second delays)
 - Very small batch sizes (5 symbols max)
-- Automatic smart mock data fallback (cache-based)
+- Automatic smart mock data fallback (cache-based), lifted once a probe succeeds
+- Single-flight: concurrent fetches of the same symbol set share one request
+- yahooquery / requests (and pandas behind them) load on first fetch, not at import
 """
-from yahooquery import Ticker
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Callable, TypeVar, cast
+from typing import List, Dict, Any, Optional, Callable, TypeVar, cast, TYPE_CHECKING
 import logging
-import requests
-from requests.adapters import HTTPAdapter
 import time
 import random
 from threading import Lock
 from config import settings
 from services.mock_data_service import mock_service
+from services.single_flight import SingleFlight, symbol_key
+import metrics
 
 logger = logging.getLogger(__name__)
 
 # Type variable for generic return type
 T = TypeVar('T')
 
+if TYPE_CHECKING:
+    import requests
+
+# yahooquery.Ticker, resolved on first use: importing yahooquery pulls in
+# pandas and requests (~0.5s), which the API doesn't need to start serving
+Ticker: Any = None
+
+
+def _ticker(symbols: List[str]) -> Any:
+    """Build a yahooquery Ticker, importing yahooquery on first call"""
+    global Ticker
+    if Ticker is None:
+        from yahooquery import Ticker as YahooTicker
+        Ticker = YahooTicker
+    return Ticker(symbols)
+
 
 class CircuitBreaker:
     """
     Circuit Breaker Pattern Implementation
     Prevents cascading failures by stopping requests after threshold
+
+    CLOSED -> OPEN after `failure_threshold` consecutive failures. Once the
+    timeout passes, exactly one caller gets to probe (HALF_OPEN); everyone
+    else stays blocked until it reports back. A successful probe closes the
+    circuit, a failed one re-opens it with the timeout doubled (up to
+    `max_timeout`) so a long outage doesn't burn the rate-limit budget.
     """
-    def __init__(self, failure_threshold: int = 3, timeout: int = 300):
+    # Gauge value exported per state
+    STATE_VALUES = {"CLOSED": 0.0, "HALF_OPEN": 0.5, "OPEN": 1.0}
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        timeout: int = 300,
+        name: str = "yahoo",
+        max_timeout: Optional[int] = None
+    ):
         """
         Args:
             failure_threshold: Number of consecutive failures before opening circuit
             timeout: Seconds to wait before attempting to close circuit (default: 5 minutes)
+            name: Label used for this breaker's metrics
+            max_timeout: Cap for the backoff after failed probes (default: no backoff)
         """
         self.failure_threshold = failure_threshold
         self.timeout = timeout
-        self.failure_count = 0
-        self.last_failure_time: Optional[datetime] = None
-        self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
+        self.max_timeout = max_timeout if max_timeout is not None else timeout
+        self.name = name
         self._lock = Lock()
-    
-    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> Optional[T]:
+        self.reset()
+
+    def reset(self) -> None:
+        """Back to a healthy CLOSED circuit"""
+        with self._lock:
+            self.failure_count = 0
+            self.last_failure_time: Optional[datetime] = None
+            self.opened_at: Optional[datetime] = None
+            self.current_timeout = self.timeout
+            self._probing = False
+            self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
+        metrics.circuit_breaker_state.set(0.0, breaker=self.name)
+
+    def _transition(self, state: str) -> None:
+        """Change state and record it (caller holds the lock)"""
+        self.state = state
+        metrics.circuit_breaker_transitions.inc(breaker=self.name, state=state)
+        metrics.circuit_breaker_state.set(self.STATE_VALUES[state], breaker=self.name)
+
+    def _retry_in(self) -> float:
+        """Seconds until the next probe is allowed (caller holds the lock)"""
+        if self.state != "OPEN" or self.last_failure_time is None:
+            return 0.0
+        elapsed = (datetime.now() - self.last_failure_time).total_seconds()
+        return max(self.current_timeout - elapsed, 0.0)
+
+    def _acquire(self) -> Optional[bool]:
+        """
+        Decide whether a call may go out
+
+        Returns:
+            None if blocked, True if this call is the half-open probe, False otherwise
+        """
+        with self._lock:
+            if self.state == "CLOSED":
+                return False
+            if self.state == "OPEN" and self._retry_in() <= 0:
+                self._transition("HALF_OPEN")
+                self._probing = True
+                logger.info(f"🔄 Circuit breaker {self.name} entering HALF_OPEN state (single probe)")
+                return True
+            if self.state == "OPEN":
+                logger.error(f"⛔ Circuit breaker {self.name} OPEN - requests blocked for {self._retry_in():.0f}s more")
+            return None  # OPEN, or HALF_OPEN with the probe already in flight
+
+    def _record_success(self) -> None:
+        with self._lock:
+            self.failure_count = 0
+            if self.state != "CLOSED":
+                self._probing = False
+                self.current_timeout = self.timeout
+                self.opened_at = None
+                self._transition("CLOSED")
+                logger.info(f"✅ Circuit breaker {self.name} CLOSED - system recovered")
+
+    def _record_failure(self, error: Exception, probe: bool) -> None:
+        with self._lock:
+            self.failure_count += 1
+            self.last_failure_time = datetime.now()
+            if probe:
+                # Failed probe: straight back to OPEN, wait longer next time
+                self._probing = False
+                self.current_timeout = min(self.current_timeout * 2, self.max_timeout)
+                self._transition("OPEN")
+                logger.error(f"🚨 Circuit breaker {self.name} probe failed, retrying in {self.current_timeout}s: {error}")
+            elif self.state == "CLOSED" and self.failure_count >= self.failure_threshold:
+                self.opened_at = self.last_failure_time
+                self._transition("OPEN")
+                logger.error(f"🚨 Circuit breaker {self.name} OPENED after {self.failure_count} failures")
+                logger.error(f"⏰ System will retry in {self.current_timeout} seconds")
+            else:
+                logger.warning(f"⚠️  {self.name} failure {self.failure_count}/{self.failure_threshold}: {error}")
+
+    def call(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        probe: Optional[Callable[[], Any]] = None,
+        **kwargs: Any
+    ) -> Optional[T]:
         """
         Execute function through circuit breaker
         
         Args:
             func: Function to execute
             *args: Positional arguments for func
+            probe: Cheap request used as the half-open trial instead of func
+                   (func only runs once the probe has closed the circuit)
             **kwargs: Keyword arguments for func
             
         Returns:
             Result of func or None if circuit is open
         """
-        with self._lock:
-            if self.state == "OPEN":
-                # Check if timeout has passed
-                if self.last_failure_time and \
-                   (datetime.now() - self.last_failure_time).seconds >= self.timeout:
-                    self.state = "HALF_OPEN"
-                    logger.info("🔄 Circuit breaker entering HALF_OPEN state (testing)")
-                else:
-                    if self.last_failure_time:
-                        time_remaining = self.timeout - (datetime.now() - self.last_failure_time).seconds
-                        logger.error(f"⛔ Circuit breaker OPEN - requests blocked for {time_remaining}s more")
-                    return None
-        
+        is_probe = self._acquire()
+        if is_probe is None:
+            return None
+
+        if is_probe and probe is not None:
+            try:
+                probe()
+            except Exception as e:
+                self._record_failure(e, probe=True)
+                raise
+            self._record_success()
+            is_probe = False
+
         try:
             result: T = func(*args, **kwargs)
-            
-            with self._lock:
-                if self.state == "HALF_OPEN":
-                    # Success in half-open state, close circuit
-                    self.state = "CLOSED"
-                    self.failure_count = 0
-                    logger.info("✅ Circuit breaker CLOSED - system recovered")
-            
-            return result
-            
         except Exception as e:
-            with self._lock:
-                self.failure_count += 1
-                self.last_failure_time = datetime.now()
-                
-                if self.failure_count >= self.failure_threshold:
-                    self.state = "OPEN"
-                    logger.error(f"🚨 Circuit breaker OPENED after {self.failure_count} failures")
-                    logger.error(f"⏰ System will retry in {self.timeout} seconds")
-                else:
-                    logger.warning(f"⚠️  Failure {self.failure_count}/{self.failure_threshold}: {e}")
-            
+            self._record_failure(e, probe=is_probe)
             raise
+        self._record_success()
+        return result
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == "CLOSED"
+
+    def get_status(self) -> Dict[str, Any]:
+        """Exported breaker state (health endpoint)"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "failure_count": self.failure_count,
+                "last_failure": self.last_failure_time.isoformat() if self.last_failure_time else None,
+                "opened_at": self.opened_at.isoformat() if self.opened_at else None,
+                "retry_in_seconds": round(self._retry_in(), 1),
+                "timeout_seconds": self.current_timeout,
+            }
 
 
 class SessionManager:
@@ -114,6 +225,9 @@ class SessionManager:
     
     def _initialize(self) -> None:
         """Initialize session with professional configuration"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        
         self.session = requests.Session()
         
         # Realistic Chrome browser headers
@@ -145,7 +259,7 @@ class SessionManager:
         
         logger.info("🔐 Session manager initialized with browser headers")
     
-    def get_session(self) -> requests.Session:
+    def get_session(self) -> "requests.Session":
         """Get the singleton session"""
         return self.session
 
@@ -155,16 +269,61 @@ class YahooFinanceService:
     Professional Yahoo Finance Service with Anti-Ban Mechanisms
     """
     
+    # One breaker each; on_demand covers long-tail /api/quotes symbols, so
+    # failures there can't put the scheduled stocks into Ghost Mode
+    ENDPOINTS = ("stocks", "forex", "commodities", "on_demand")
+
     def __init__(self):
-        """Initialize service with circuit breaker and session manager"""
-        self.session_manager = SessionManager()
-        self.circuit_breaker = CircuitBreaker(
-            failure_threshold=3,  # Open circuit after 3 failures
-            timeout=300           # Wait 5 minutes before retry
-        )
-        self.use_mock_data = False
+        """Initialize service with per-endpoint circuit breakers"""
+        self.breakers: Dict[str, CircuitBreaker] = {
+            endpoint: CircuitBreaker(
+                failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+                timeout=settings.BREAKER_TIMEOUT_SECONDS,
+                max_timeout=settings.BREAKER_MAX_TIMEOUT_SECONDS,
+                name=f"yahoo_{endpoint}"
+            )
+            for endpoint in self.ENDPOINTS
+        }
+        self.circuit_breaker = self.breakers["stocks"]
+        # Concurrent triggers for the same symbol set share one upstream call
+        self.flights = SingleFlight("yahoo")
+        self._session_manager: Optional[SessionManager] = None
         logger.info("🕵️  Yahoo Finance Service initialized (Anti-Ban Mode)")
     
+    @property
+    def session_manager(self) -> SessionManager:
+        """Browser-like requests session, created on first use"""
+        if self._session_manager is None:
+            self._session_manager = SessionManager()
+        return self._session_manager
+    
+    @property
+    def use_mock_data(self) -> bool:
+        """Ghost Mode: the stock endpoint's circuit is not closed (cleared by a successful probe)"""
+        return not self.circuit_breaker.is_closed
+    
+    def reset_breakers(self) -> None:
+        """Close every circuit (e.g. after an operator fixed the network)"""
+        for breaker in self.breakers.values():
+            breaker.reset()
+    
+    def get_breaker_status(self) -> Dict[str, Dict[str, Any]]:
+        """State of every endpoint's circuit breaker"""
+        return {endpoint: breaker.get_status() for endpoint, breaker in self.breakers.items()}
+    
+    def _probe(self, symbol: str) -> None:
+        """
+        Half-open trial: one single-symbol quote request, no throttle
+        
+        Raises unless Yahoo returned a usable price, so a soft error payload
+        doesn't close the circuit.
+        """
+        raw_price_data: Any = _ticker([symbol]).price
+        symbol_data = raw_price_data.get(symbol) if isinstance(raw_price_data, dict) else None
+        if not isinstance(symbol_data, dict) or symbol_data.get('regularMarketPrice') is None:
+            raise Exception(f"Probe for {symbol} failed: {str(symbol_data)[:200]}")
+        logger.info(f"🩺 Probe for {symbol} succeeded")
+    
     def _aggressive_throttle(self, min_delay: float = 10.0, max_delay: float = 15.0):
         """
         Conservative throttling between requests (Ghost Mode)
@@ -173,6 +332,7 @@ class YahooFinanceService:
         delay = random.uniform(min_delay, max_delay)
         logger.info(f"😴 Ghost Mode Throttle: sleeping {delay:.1f}s...")
         time.sleep(delay)
+        metrics.throttle_sleep_seconds.inc(delay)
     
     def _fetch_with_circuit_breaker(self, symbols: List[str]) -> List[Dict[str, Any]]:
         """
@@ -189,9 +349,10 @@ class YahooFinanceService:
         for chunk_idx, chunk in enumerate(chunks, 1):
             logger.info(f"🎯 Processing chunk {chunk_idx}/{len(chunks)}: {chunk}")
             
+            chunk_started = time.perf_counter()
             try:
                 # Create Ticker object with list of symbols
-                ticker = Ticker(chunk)
+                ticker = _ticker(chunk)
                 
                 # Get price data (returns dict with symbol as key)
                 try:
@@ -242,7 +403,8 @@ class YahooFinanceService:
                                     "change_percent": round(change_percent, 2),
                                     "volume": int(volume_val) if volume_val else 0,
                                     "market_cap": market_cap,
-                                    "timestamp": datetime.now().isoformat()
+                                    "timestamp": datetime.now().isoformat(),
+                                    "source": "live"
                                 }
                                 
                                 stocks_data.append(stock_data)
@@ -258,6 +420,8 @@ class YahooFinanceService:
                 except Exception as e:
                     logger.error(f"❌ Error fetching price data: {e}")
                     raise
+                finally:
+                    metrics.fetch_chunk_duration.observe(time.perf_counter() - chunk_started)
                 
                 # Aggressive throttle between chunks
                 if chunk_idx < len(chunks):
@@ -282,24 +446,26 @@ class YahooFinanceService:
             chunk_size: Max symbols per batch (default: 10)
         
         Returns:
-            List of stock dictionaries
+            List of stock dictionaries (shared with concurrent callers; don't mutate)
         """
-        # If mock mode is enabled, use mock data
-        if self.use_mock_data:
-            logger.warning("🎭 Using MOCK DATA - Yahoo Finance unavailable")
-            return mock_service.generate_stock_data(tickers)
+        if not tickers:
+            return []
+        return self.flights.do(("stocks", symbol_key(tickers)), lambda: self._fetch_stock_data_batch(tickers))
+    
+    def _fetch_stock_data_batch(self, tickers: List[str]) -> List[Dict[str, Any]]:
         
-        # Try to fetch through circuit breaker
+        # Try to fetch through circuit breaker (one cheap probe while half-open)
         try:
             result: Optional[List[Dict[str, Any]]] = self.circuit_breaker.call(
                 self._fetch_with_circuit_breaker,
-                tickers
+                tickers,
+                probe=lambda: self._probe(tickers[0])
             )
             
             if result is None:
-                # Circuit is open, use mock data
+                # Circuit is open, use mock data until a probe succeeds
                 logger.warning("🎭 Circuit breaker OPEN - using mock data")
-                self.use_mock_data = True
+                metrics.mock_fallbacks.inc(asset="stocks")
                 return mock_service.generate_stock_data(tickers)
             
             return result
@@ -307,9 +473,30 @@ class YahooFinanceService:
         except Exception as e:
             logger.error(f"❌ Fetch failed: {type(e).__name__}: {e}")
             logger.warning(f"🎭 Falling back to mock data due to: {type(e).__name__}")
-            self.use_mock_data = True
+            metrics.mock_fallbacks.inc(asset="stocks")
             return mock_service.generate_stock_data(tickers)
     
+    def fetch_on_demand(self, tickers: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Quotes for long-tail symbols (on-demand tier) through their own breaker
+        
+        No mock fallback: mock prices for arbitrary symbols would be noise.
+        
+        Returns:
+            List of stock dictionaries, or None while the on_demand circuit is open
+        
+        Raises:
+            Exception: If the fetch failed (counted by the on_demand breaker)
+        """
+        if not tickers:
+            return []
+        # The probe uses a scheduled symbol: a long-tail one may legitimately have no quote
+        return self.flights.do(("on_demand", symbol_key(tickers)), lambda: self.breakers["on_demand"].call(
+            self._fetch_with_circuit_breaker,
+            tickers,
+            probe=lambda: self._probe(settings.BIST100_SYMBOLS[0])
+        ))
+    
     def fetch_stock_group(self, symbols: List[str], group_name: str = "stocks") -> List[Dict[str, Any]]:
         """
         Fetch a specific group of stocks
@@ -329,137 +516,157 @@ class YahooFinanceService:
         return self.fetch_stock_data_batch(settings.BIST100_SYMBOLS, chunk_size=10)
     
     def fetch_forex(self) -> List[Dict[str, Any]]:
-        """Fetch forex data with yahooquery and fallback"""
-        if self.use_mock_data:
-            return mock_service.generate_forex_data()
-        
+        """Fetch forex data with yahooquery through the forex breaker, with mock fallback"""
+        return self.flights.do(("forex",), self._fetch_forex)
+    
+    def _fetch_forex(self) -> List[Dict[str, Any]]:
         try:
-            forex_data: List[Dict[str, Any]] = []
-            
-            # Fetch all forex pairs at once
-            ticker = Ticker(settings.FOREX_SYMBOLS)
-            raw_price_data: Any = ticker.price
-            
-            if not isinstance(raw_price_data, dict):
-                raise Exception(f"Invalid price data format: {type(raw_price_data).__name__}")
-            
-            price_data = cast(Dict[str, Dict[str, Any]], raw_price_data)
-            
-            for symbol in settings.FOREX_SYMBOLS:
-                try:
-                    symbol_data: Dict[str, Any] = price_data.get(symbol, {})
-                    
-                    if not isinstance(symbol_data, dict) or 'error' in str(symbol_data).lower():
-                        logger.warning(f"⚠️  Error response for {symbol}: {symbol_data}")
-                        continue
-                    
-                    if not symbol_data:
-                        logger.warning(f"⚠️  No data for {symbol}")
-                        continue
-                    
-                    raw_rate: Any = symbol_data.get('regularMarketPrice')
-                    raw_previous: Any = symbol_data.get('regularMarketPreviousClose')
-                    
-                    if raw_rate is None or raw_previous is None:
-                        logger.warning(f"⚠️  Missing price data for {symbol}")
-                        continue
-                    
-                    current_rate: float = float(raw_rate)
-                    previous_close: float = float(raw_previous)
-                    
-                    change = current_rate - previous_close
-                    change_percent = (change / previous_close * 100) if previous_close else 0
-                    
-                    pair_name = symbol.replace('=X', '').replace('TRY', '/TRY')
-                    if pair_name == '/TRY':
-                        pair_name = 'USD/TRY'
-                    
-                    forex_data.append({
-                        "pair": pair_name,
-                        "symbol": symbol,
-                        "rate": round(current_rate, 4),
-                        "change": round(change, 4),
-                        "change_percent": round(change_percent, 2),
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"❌ Forex {symbol}: {e}")
-                    continue
-            
-            return forex_data if forex_data else mock_service.generate_forex_data()
-            
+            result = self.breakers["forex"].call(self._fetch_forex_live)
+            if result is not None:
+                return result
+            logger.warning("🎭 Forex circuit breaker OPEN - using mock data")
         except Exception as e:
             logger.error(f"❌ Forex fetch failed: {type(e).__name__}: {e}")
             logger.warning(f"🎭 Falling back to mock forex data due to: {type(e).__name__}")
-            return mock_service.generate_forex_data()
+        metrics.mock_fallbacks.inc(asset="forex")
+        return mock_service.generate_forex_data()
     
-    def fetch_commodities(self) -> List[Dict[str, Any]]:
-        """Fetch commodities data with yahooquery and fallback"""
-        if self.use_mock_data:
-            return mock_service.generate_commodities_data()
+    def _fetch_forex_live(self) -> List[Dict[str, Any]]:
+        """One quote request for all forex pairs (raises if nothing usable came back)"""
+        forex_data: List[Dict[str, Any]] = []
         
-        try:
-            commodities_data: List[Dict[str, Any]] = []
-            
-            commodity_names: Dict[str, str] = {
-                "GC=F": "Gold Futures",
-                "SI=F": "Silver Futures"
-            }
-            
-            # Fetch all commodities at once
-            ticker = Ticker(settings.COMMODITY_SYMBOLS)
-            raw_price_data: Any = ticker.price
-            
-            if not isinstance(raw_price_data, dict):
-                raise Exception(f"Invalid price data format: {type(raw_price_data).__name__}")
-            
-            price_data = cast(Dict[str, Dict[str, Any]], raw_price_data)
-            
-            for symbol in settings.COMMODITY_SYMBOLS:
-                try:
-                    symbol_data: Dict[str, Any] = price_data.get(symbol, {})
-                    
-                    if not isinstance(symbol_data, dict) or 'error' in str(symbol_data).lower():
-                        logger.warning(f"⚠️  Error response for {symbol}: {symbol_data}")
-                        continue
-                    
-                    if not symbol_data:
-                        logger.warning(f"⚠️  No data for {symbol}")
-                        continue
-                    
-                    raw_price: Any = symbol_data.get('regularMarketPrice')
-                    raw_previous: Any = symbol_data.get('regularMarketPreviousClose')
-                    
-                    if raw_price is None or raw_previous is None:
-                        logger.warning(f"⚠️  Missing price data for {symbol}")
-                        continue
-                    
-                    current_price: float = float(raw_price)
-                    previous_close: float = float(raw_previous)
-                    
-                    change = current_price - previous_close
-                    change_percent = (change / previous_close * 100) if previous_close else 0
-                    
-                    commodities_data.append({
-                        "symbol": symbol,
-                        "name": commodity_names.get(symbol, symbol),
-                        "price": round(current_price, 2),
-                        "change": round(change, 2),
-                        "change_percent": round(change_percent, 2),
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"❌ Commodity {symbol}: {e}")
+        # Fetch all forex pairs at once
+        ticker = _ticker(settings.FOREX_SYMBOLS)
+        raw_price_data: Any = ticker.price
+        
+        if not isinstance(raw_price_data, dict):
+            raise Exception(f"Invalid price data format: {type(raw_price_data).__name__}")
+        
+        price_data = cast(Dict[str, Dict[str, Any]], raw_price_data)
+        
+        for symbol in settings.FOREX_SYMBOLS:
+            try:
+                symbol_data: Dict[str, Any] = price_data.get(symbol, {})
+                
+                if not isinstance(symbol_data, dict) or 'error' in str(symbol_data).lower():
+                    logger.warning(f"⚠️  Error response for {symbol}: {symbol_data}")
                     continue
-            
-            return commodities_data if commodities_data else mock_service.generate_commodities_data()
-            
+                
+                if not symbol_data:
+                    logger.warning(f"⚠️  No data for {symbol}")
+                    continue
+                
+                raw_rate: Any = symbol_data.get('regularMarketPrice')
+                raw_previous: Any = symbol_data.get('regularMarketPreviousClose')
+                
+                if raw_rate is None or raw_previous is None:
+                    logger.warning(f"⚠️  Missing price data for {symbol}")
+                    continue
+                
+                current_rate: float = float(raw_rate)
+                previous_close: float = float(raw_previous)
+                
+                change = current_rate - previous_close
+                change_percent = (change / previous_close * 100) if previous_close else 0
+                
+                pair_name = symbol.replace('=X', '').replace('TRY', '/TRY')
+                if pair_name == '/TRY':
+                    pair_name = 'USD/TRY'
+                
+                forex_data.append({
+                    "pair": pair_name,
+                    "symbol": symbol,
+                    "rate": round(current_rate, 4),
+                    "change": round(change, 4),
+                    "change_percent": round(change_percent, 2),
+                    "timestamp": datetime.now().isoformat(),
+                    "source": "live"
+                })
+                
+            except Exception as e:
+                logger.error(f"❌ Forex {symbol}: {e}")
+                continue
+        
+        if not forex_data:
+            raise Exception("No usable forex quotes in the response")
+        return forex_data
+    
+    def fetch_commodities(self) -> List[Dict[str, Any]]:
+        """Fetch commodities data with yahooquery through the commodities breaker, with mock fallback"""
+        return self.flights.do(("commodities",), self._fetch_commodities)
+    
+    def _fetch_commodities(self) -> List[Dict[str, Any]]:
+        try:
+            result = self.breakers["commodities"].call(self._fetch_commodities_live)
+            if result is not None:
+                return result
+            logger.warning("🎭 Commodities circuit breaker OPEN - using mock data")
         except Exception as e:
             logger.error(f"❌ Commodities fetch failed: {type(e).__name__}: {e}")
             logger.warning(f"🎭 Falling back to mock commodities data due to: {type(e).__name__}")
-            return mock_service.generate_commodities_data()
+        metrics.mock_fallbacks.inc(asset="commodities")
+        return mock_service.generate_commodities_data()
+    
+    def _fetch_commodities_live(self) -> List[Dict[str, Any]]:
+        """One quote request for all commodities (raises if nothing usable came back)"""
+        commodities_data: List[Dict[str, Any]] = []
+        
+        commodity_names: Dict[str, str] = {
+            "GC=F": "Gold Futures",
+            "SI=F": "Silver Futures"
+        }
+        
+        # Fetch all commodities at once
+        ticker = _ticker(settings.COMMODITY_SYMBOLS)
+        raw_price_data: Any = ticker.price
+        
+        if not isinstance(raw_price_data, dict):
+            raise Exception(f"Invalid price data format: {type(raw_price_data).__name__}")
+        
+        price_data = cast(Dict[str, Dict[str, Any]], raw_price_data)
+        
+        for symbol in settings.COMMODITY_SYMBOLS:
+            try:
+                symbol_data: Dict[str, Any] = price_data.get(symbol, {})
+                
+                if not isinstance(symbol_data, dict) or 'error' in str(symbol_data).lower():
+                    logger.warning(f"⚠️  Error response for {symbol}: {symbol_data}")
+                    continue
+                
+                if not symbol_data:
+                    logger.warning(f"⚠️  No data for {symbol}")
+                    continue
+                
+                raw_price: Any = symbol_data.get('regularMarketPrice')
+                raw_previous: Any = symbol_data.get('regularMarketPreviousClose')
+                
+                if raw_price is None or raw_previous is None:
+                    logger.warning(f"⚠️  Missing price data for {symbol}")
+                    continue
+                
+                current_price: float = float(raw_price)
+                previous_close: float = float(raw_previous)
+                
+                change = current_price - previous_close
+                change_percent = (change / previous_close * 100) if previous_close else 0
+                
+                commodities_data.append({
+                    "symbol": symbol,
+                    "name": commodity_names.get(symbol, symbol),
+                    "price": round(current_price, 2),
+                    "change": round(change, 2),
+                    "change_percent": round(change_percent, 2),
+                    "timestamp": datetime.now().isoformat(),
+                    "source": "live"
+                })
+                
+            except Exception as e:
+                logger.error(f"❌ Commodity {symbol}: {e}")
+                continue
+        
+        if not commodities_data:
+            raise Exception("No usable commodity quotes in the response")
+        return commodities_data
     
     def fetch_all_group_a(self) -> Dict[str, List[Dict[str, Any]]]:
         """Fetch all Group A data"""
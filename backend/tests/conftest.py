@@ -0,0 +1,13 @@
+"""
+Test configuration
+Points DATA_DIR at a throwaway directory and the cache at the memory
+backend before any app module is imported, so tests never touch backend/data
+"""
+import os
+import sys
+import tempfile
+
+os.environ["ALGORIST_DATA_DIR"] = tempfile.mkdtemp(prefix="algorist-tests-")
+os.environ["ALGORIST_CACHE_BACKEND"] = "memory"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,68 @@
+"""Admission control: token buckets and client keys"""
+import pytest
+
+from admission import AdmissionMiddleware, MemoryRateLimiter
+from config import settings
+
+
+def test_bucket_starts_full_and_refills_at_the_rate():
+    limiter = MemoryRateLimiter(rate=2.0, burst=4.0, max_clients=10)
+
+    assert [limiter.acquire("a", 1.0, now=0.0) for _ in range(4)] == [0.0] * 4
+    assert limiter.acquire("a", 1.0, now=0.0) == pytest.approx(0.5)
+    # Half a second later one token is back
+    assert limiter.acquire("a", 1.0, now=0.5) == 0.0
+
+
+def test_refill_is_capped_at_the_burst():
+    limiter = MemoryRateLimiter(rate=2.0, burst=4.0, max_clients=10)
+    limiter.acquire("a", 4.0, now=0.0)
+
+    assert limiter.acquire("a", 4.0, now=100.0) == 0.0
+    assert limiter.acquire("a", 1.0, now=100.0) == pytest.approx(0.5)
+
+
+def test_expensive_requests_cost_more_tokens():
+    limiter = MemoryRateLimiter(rate=1.0, burst=5.0, max_clients=10)
+
+    assert limiter.acquire("a", 5.0, now=0.0) == 0.0
+    assert limiter.acquire("a", 2.0, now=1.0) == pytest.approx(1.0)
+
+
+def test_least_recently_seen_client_is_dropped_first():
+    limiter = MemoryRateLimiter(rate=1.0, burst=1.0, max_clients=2)
+    limiter.acquire("a", 1.0, now=0.0)
+    limiter.acquire("b", 1.0, now=0.0)
+    limiter.acquire("a", 1.0, now=0.0)  # Touch a: b is now the oldest
+
+    limiter.acquire("c", 1.0, now=0.0)
+
+    assert len(limiter) == 2
+    assert limiter.acquire("a", 1.0, now=0.0) > 0  # a kept its empty bucket
+    assert limiter.acquire("b", 1.0, now=0.0) == 0.0  # b comes back with a full one
+
+
+def scope(api_key=None, forwarded=None, client="10.0.0.1"):
+    headers = []
+    if api_key is not None:
+        headers.append((settings.RATE_LIMIT_KEY_HEADER.lower().encode(), api_key.encode()))
+    if forwarded is not None:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    return {"headers": headers, "client": (client, 1234)}
+
+
+def test_only_allow_listed_api_keys_get_their_own_bucket(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_API_KEYS", frozenset({"partner"}))
+
+    assert AdmissionMiddleware.client_key(scope("partner")) == "key:partner"
+    # Random keys can't mint fresh buckets: they count against the IP
+    assert AdmissionMiddleware.client_key(scope("random-1")) == "ip:10.0.0.1"
+    assert AdmissionMiddleware.client_key(scope("random-2")) == "ip:10.0.0.1"
+
+
+def test_forwarded_address_is_only_used_when_trusted(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED", False)
+    assert AdmissionMiddleware.client_key(scope(forwarded="1.2.3.4, 10.0.0.9")) == "ip:10.0.0.1"
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED", True)
+    assert AdmissionMiddleware.client_key(scope("random", forwarded="1.2.3.4, 10.0.0.9")) == "ip:1.2.3.4"
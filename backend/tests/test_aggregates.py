@@ -0,0 +1,63 @@
+"""MarketAggregates: incremental index, breadth and sector stats"""
+import pytest
+
+from cache.aggregates import MarketAggregates
+
+SECTORS = {"A": "Banking", "B": "Banking", "C": "Energy"}
+
+
+def stock(symbol, change_percent, market_cap, price=10.0, volume=100):
+    return {"symbol": symbol, "change_percent": change_percent, "market_cap": market_cap, "price": price, "volume": volume}
+
+
+def aggregates():
+    agg = MarketAggregates(lambda symbol: SECTORS.get(symbol, "Other"), base_level=1000.0)
+    agg.rebuild([stock("A", 10.0, 110.0), stock("B", -10.0, 90.0), stock("C", 0.0, 100.0)])
+    return agg
+
+
+def test_rebuild_bases_the_index_on_the_previous_close():
+    summary = aggregates().snapshot()
+
+    # Previous close caps: 100 + 100 + 100 = 300 -> level 1000; now 300 -> unchanged
+    assert summary["index"]["level"] == 1000.0
+    assert summary["breadth"] == {"advancers": 1, "decliners": 1, "unchanged": 1, "total": 3}
+    assert summary["mean_change_percent"] == 0.0
+    assert summary["turnover"] == 3000.0
+    banking = next(s for s in summary["sectors"] if s["sector"] == "Banking")
+    assert banking["count"] == 2 and banking["advancers"] == 1 and banking["decliners"] == 1
+
+
+def test_upsert_replaces_a_stocks_contribution():
+    agg = aggregates()
+
+    agg.upsert(stock("C", 20.0, 120.0))
+    summary = agg.snapshot()
+
+    assert summary["index"]["level"] == pytest.approx(1000.0 * 320.0 / 300.0, abs=0.01)
+    assert summary["breadth"]["advancers"] == 2
+    assert summary["breadth"]["total"] == 3
+
+
+@pytest.mark.parametrize("change", [
+    lambda agg: agg.upsert(stock("D", 5.0, 500.0)),
+    lambda agg: agg.remove("B"),
+])
+def test_constituent_changes_keep_the_level_continuous(change):
+    agg = aggregates()
+    before = agg.snapshot()["index"]["level"]
+
+    change(agg)
+
+    assert agg.snapshot()["index"]["level"] == pytest.approx(before, abs=0.01)
+
+
+def test_remove_drops_empty_sectors():
+    agg = aggregates()
+
+    agg.remove("C")
+    agg.remove("missing")
+    summary = agg.snapshot()
+
+    assert summary["breadth"]["total"] == 2
+    assert [s["sector"] for s in summary["sectors"]] == ["Banking"]
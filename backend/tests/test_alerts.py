@@ -0,0 +1,130 @@
+"""Alert rules: threshold crossing and trigger bookkeeping"""
+import os
+
+import services.alert_service as alert_module
+from cache.backends import MemoryBackend
+from cache.cache_manager import CacheManager
+from services.alert_service import AlertService, ThresholdBook, ABOVE, BELOW
+
+
+def test_above_rules_fire_when_crossed_upwards():
+    book = ThresholdBook()
+    for rule_id, threshold in ((1, 10.0), (2, 20.0), (3, 30.0)):
+        book.add(ABOVE, threshold, rule_id)
+
+    assert book.pop_crossed(5.0, 20.0) == [1, 2]  # old < t <= new
+    assert book.pop_crossed(20.0, 25.0) == []
+    assert book.pop_crossed(35.0, 25.0) == []     # Falling never fires 'above'
+    assert len(book) == 1
+
+
+def test_below_rules_fire_when_crossed_downwards():
+    book = ThresholdBook()
+    for rule_id, threshold in ((1, 10.0), (2, 20.0)):
+        book.add(BELOW, threshold, rule_id)
+
+    assert book.pop_crossed(25.0, 20.0) == [2]    # new <= t < old
+    assert book.pop_crossed(20.0, 20.0) == []
+    assert book.pop_crossed(None, 5.0) == [1]     # No previous value: already satisfied fires
+
+
+def test_remove_drops_a_single_rule():
+    book = ThresholdBook()
+    book.add(ABOVE, 10.0, 1)
+    book.add(ABOVE, 10.0, 2)
+
+    book.remove(ABOVE, 10.0, 1)
+
+    assert book.pop_crossed(0.0, 10.0) == [2]
+
+
+def quote(symbol, price):
+    return {"symbol": symbol, "price": price}
+
+
+def test_database_is_only_created_on_first_use(tmp_path):
+    path = str(tmp_path / "alerts.db")
+    service = AlertService(path)
+    assert not os.path.exists(path)
+
+    service.list_rules()
+
+    assert os.path.exists(path)
+    service.shutdown()
+
+
+def test_crossing_deactivates_the_rule_before_notifying(tmp_path):
+    service = AlertService(str(tmp_path / "alerts.db"))
+    service._load_rules()
+    rule = service.create_rule("thyao.is", "price_above", 300, client_id="c1")
+    assert rule["symbol"] == "THYAO.IS" and rule["active"]
+
+    service.on_cache_update("bist100", {"THYAO.IS": quote("THYAO.IS", 290.0)}, [quote("THYAO.IS", 305.0)])
+
+    # Recorded before anything was dispatched
+    assert service._outbox.get_nowait() == rule["id"]
+    triggered = service.get_recent_alerts("c1")
+    assert [(a["id"], a["active"], a["triggered_value"]) for a in triggered] == [(rule["id"], False, 305.0)]
+    assert service.list_rules("c1") == []
+
+    # Crossing again does nothing: the rule left the book
+    service.on_cache_update("bist100", {"THYAO.IS": quote("THYAO.IS", 290.0)}, [quote("THYAO.IS", 310.0)])
+    assert service._outbox.empty()
+    service.shutdown()
+
+
+def test_rules_created_by_another_worker_are_picked_up(tmp_path):
+    path = str(tmp_path / "alerts.db")
+    leader, other = AlertService(path), AlertService(path)
+    leader._load_rules()
+
+    rule = other.create_rule("GARAN.IS", "change_below", -3)
+    leader.on_cache_update("bist100", {}, [{"symbol": "GARAN.IS", "change_percent": -4.0}])
+
+    assert leader._outbox.get_nowait() == rule["id"]
+    leader.shutdown()
+    other.shutdown()
+
+
+def test_deleted_rules_no_longer_fire(tmp_path):
+    service = AlertService(str(tmp_path / "alerts.db"))
+    service._load_rules()
+    rule = service.create_rule("GC=F", "price_below", 2000)
+    service.on_cache_update("commodities", {}, [])  # Loads the new rule
+
+    assert service.delete_rule(rule["id"])
+    assert not service.delete_rule(rule["id"])
+    service.on_cache_update("commodities", {"GC=F": quote("GC=F", 2100.0)}, [quote("GC=F", 1900.0)])
+
+    assert service._outbox.empty()
+    service.shutdown()
+
+
+def test_rule_already_satisfied_at_creation_fires_immediately(tmp_path, monkeypatch):
+    market = CacheManager(MemoryBackend())
+    market.update_forex([{"symbol": "USDTRY=X", "rate": 34.0}])
+    monkeypatch.setattr(alert_module, "cache", market)
+
+    notified = []
+
+    class Capture(alert_module.AlertNotifier):
+        def notify(self, alert):
+            notified.append(alert["id"])
+
+    service = AlertService(str(tmp_path / "alerts.db"))
+    service.set_notifier(Capture())
+    service._load_rules()
+    fired = service.create_rule("USDTRY=X", "price_above", 30)
+    pending = service.create_rule("USDTRY=X", "price_above", 40)
+    service.shutdown()  # Drains the outbox
+
+    assert not fired["active"] and fired["triggered_value"] == 34.0
+    assert pending["active"] and pending["triggered_at"] is None
+    assert notified == [fired["id"]]
+
+    # Only the pending rule is evaluated from now on
+    service._load_rules()
+    service.on_cache_update("forex", {"USDTRY=X": {"symbol": "USDTRY=X", "rate": 34.0}}, [{"symbol": "USDTRY=X", "rate": 41.0}])
+    assert service._outbox.get_nowait() == pending["id"]
+    assert service._outbox.empty()
+    service.shutdown()
@@ -0,0 +1,108 @@
+"""Cache backends: selection, fallback and the change log"""
+import json
+import os
+from functools import partial
+
+import pytest
+
+from cache import backends
+from cache.backends import MemoryBackend, LocalFileBackend, LogBackend, create_backend
+from cache.cache_manager import CacheManager
+
+
+def test_unreachable_redis_falls_back_to_local_files(monkeypatch):
+    pytest.importorskip("redis")
+    monkeypatch.setattr(backends, "RedisBackend", partial(backends.RedisBackend, "redis://127.0.0.1:1/0"))
+
+    assert isinstance(create_backend("redis"), LocalFileBackend)
+
+
+class _NoPubSub(MemoryBackend):
+    name = "flaky"
+
+    def subscribe(self, callback):
+        raise ConnectionError("pub/sub refused")
+
+
+def test_failed_subscription_falls_back_to_local_files():
+    cache = CacheManager(_NoPubSub())
+
+    assert isinstance(cache._backend, LocalFileBackend)
+
+
+def test_unknown_backend_uses_local_files():
+    assert isinstance(create_backend("nope"), LocalFileBackend)
+    assert isinstance(create_backend("memory"), MemoryBackend)
+
+
+def entry(version, records, op="upsert", item="bist100", removed=()):
+    return {
+        "version": version, "item": item, "op": op, "records": records,
+        "removed": list(removed), "last_updated": f"t{version}",
+    }
+
+
+def no_snapshot():
+    raise AssertionError("checkpoint not expected")
+
+
+def test_log_round_trip_replays_changes_over_the_checkpoint(tmp_path):
+    log = LogBackend(str(tmp_path), checkpoint_entries=100, codec="pickle")
+    log.save("market", {"version": 1, "bist100": [{"symbol": "A", "price": 1.0}, {"symbol": "B", "price": 2.0}]})
+    log.append("market", entry(2, [{"symbol": "A", "price": 1.5}]), no_snapshot)
+    log.append("market", entry(3, [{"symbol": "C", "price": 3.0}], removed=["B"]), no_snapshot)
+    log.append("market", entry(4, [{"pair": "USD/TRY", "symbol": "TRY=X"}], op="replace", item="forex"), no_snapshot)
+
+    loaded = LogBackend(str(tmp_path), codec="pickle").load("market")
+
+    assert {r["symbol"]: r["price"] for r in loaded["bist100"]} == {"A": 1.5, "C": 3.0}
+    assert loaded["forex"] == [{"pair": "USD/TRY", "symbol": "TRY=X"}]
+    assert (loaded["version"], loaded["last_updated"]) == (4, "t4")
+
+
+def test_replay_applies_entries_in_version_order_and_skips_checkpointed_ones():
+    snapshot = {"version": 2, "bist100": [{"symbol": "A", "price": 2.0}]}
+    entries = [entry(4, [{"symbol": "A", "price": 4.0}]), entry(1, [{"symbol": "A", "price": 1.0}]),
+               entry(3, [{"symbol": "A", "price": 3.0}])]
+
+    replayed = LogBackend._replay(snapshot, entries)
+
+    assert replayed["bist100"] == [{"symbol": "A", "price": 4.0}]
+    assert replayed["version"] == 4
+
+
+def test_torn_tail_is_truncated_and_later_appends_stay_readable(tmp_path):
+    log = LogBackend(str(tmp_path), checkpoint_entries=100, codec="pickle")
+    log.append("market", entry(1, [{"symbol": "A", "price": 1.0}]), no_snapshot)
+    path = os.path.join(str(tmp_path), "market.log")
+    intact = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(LogBackend.FRAME.pack(500) + b"half a payload")
+
+    reopened = LogBackend(str(tmp_path), checkpoint_entries=100, codec="pickle")
+    assert reopened.load("market")["bist100"] == [{"symbol": "A", "price": 1.0}]
+    assert os.path.getsize(path) == intact
+
+    reopened.append("market", entry(2, [{"symbol": "B", "price": 2.0}]), no_snapshot)
+    assert len(LogBackend(str(tmp_path)).load("market")["bist100"]) == 2
+
+
+def test_log_is_compacted_into_a_checkpoint(tmp_path):
+    log = LogBackend(str(tmp_path), checkpoint_entries=2, codec="pickle")
+    state = {"version": 2, "bist100": [{"symbol": "A", "price": 2.0}]}
+    log.append("market", entry(1, [{"symbol": "A", "price": 1.0}]), no_snapshot)
+    log.append("market", entry(2, [{"symbol": "A", "price": 2.0}]), lambda: state)
+
+    assert os.path.getsize(os.path.join(str(tmp_path), "market.log")) == len(LogBackend.MAGIC) + 1
+    assert LogBackend(str(tmp_path)).load("market") == state
+
+
+def test_log_backend_migrates_from_the_json_files(tmp_path):
+    legacy_path = tmp_path / "market_data.json"
+    legacy_path.write_text(json.dumps({"bist100": [{"symbol": "A", "price": 1.0}], "last_updated": "t0"}))
+    log = LogBackend(str(tmp_path), codec="pickle")
+    log._legacy = LocalFileBackend({"market": str(legacy_path)})
+
+    log.append("market", entry(1, [{"symbol": "B", "price": 2.0}]), no_snapshot)
+
+    assert [r["symbol"] for r in log.load("market")["bist100"]] == ["A", "B"]
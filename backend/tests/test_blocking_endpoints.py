@@ -0,0 +1,62 @@
+"""Slow endpoints run in the threadpool and leave the event loop serving"""
+import asyncio
+import threading
+
+import httpx
+
+import main
+
+
+def test_fund_catalog_refresh_does_not_block_other_requests(monkeypatch):
+    crawling, release = threading.Event(), threading.Event()
+
+    def slow_refresh():
+        crawling.set()
+        release.wait(5)
+        return 42
+
+    monkeypatch.setattr(main.fund_catalog, "refresh", slow_refresh)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            refresh = asyncio.create_task(http.post("/api/refresh/fund-catalog"))
+            await asyncio.to_thread(crawling.wait, 5)
+            health = await http.get("/health")
+            # Answered while the crawl is still running
+            still_crawling = not refresh.done()
+            release.set()
+            return health, still_crawling, await refresh
+
+    health, still_crawling, refreshed = asyncio.run(scenario())
+
+    assert health.status_code == 200
+    assert still_crawling
+    assert refreshed.json()["message"] == "Fund catalog refreshed (42 funds)"
+
+
+def test_alert_endpoints_do_not_block_other_requests(monkeypatch):
+    querying, release = threading.Event(), threading.Event()
+
+    def slow_list_rules(client_id=None):
+        querying.set()
+        release.wait(5)
+        return []
+
+    monkeypatch.setattr(main.alert_service, "list_rules", slow_list_rules)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            alerts = asyncio.create_task(http.get("/api/alerts"))
+            await asyncio.to_thread(querying.wait, 5)
+            health = await http.get("/health")
+            still_querying = not alerts.done()
+            release.set()
+            return health, still_querying, await alerts
+
+    health, still_querying, alerts = asyncio.run(scenario())
+
+    assert health.status_code == 200
+    assert still_querying
+    assert alerts.json() == {"alerts": []}
@@ -0,0 +1,85 @@
+"""CacheManager: group upserts, eviction and derived views"""
+from cache.backends import MemoryBackend, LogBackend
+from cache.cache_manager import CacheManager
+
+
+def stock(symbol, price=10.0, change_percent=1.0, volume=1000, market_cap=1e9):
+    return {
+        "symbol": symbol,
+        "name": symbol,
+        "price": price,
+        "change_percent": change_percent,
+        "volume": volume,
+        "market_cap": market_cap,
+        "timestamp": "2026-10-19T10:00:00",
+    }
+
+
+def test_upsert_patches_only_the_group():
+    cache = CacheManager(MemoryBackend())
+    cache.upsert_stocks([stock("A.IS"), stock("B.IS")], group=["A.IS", "B.IS"])
+    cache.upsert_stocks([stock("C.IS", change_percent=5.0)], group=["C.IS"])
+
+    assert [s["symbol"] for s in cache.get_stocks()] == ["A.IS", "B.IS", "C.IS"]
+    assert [s["symbol"] for s in cache.get_movers("change_percent", 1)] == ["C.IS"]
+
+
+def test_group_symbols_missing_from_a_fetch_are_evicted():
+    cache = CacheManager(MemoryBackend())
+    cache.upsert_stocks([stock("A.IS"), stock("B.IS"), stock("C.IS")], group=["A.IS", "B.IS", "C.IS"])
+    events = []
+    cache.add_listener(lambda item, previous, updated: events.append((set(previous), [r.key for r in updated])))
+
+    cache.upsert_stocks([stock("A.IS", price=11.0)], group=["A.IS", "B.IS"])
+
+    assert [s["symbol"] for s in cache.get_stocks()] == ["A.IS", "C.IS"]
+    assert cache.get_quote("B.IS") is None
+    assert "B.IS" not in cache.get_movers("volume", 10)
+    assert cache.screen_stocks([], limit=10)[-1]["symbol"] in ("A.IS", "C.IS")
+    assert cache.get_market_summary()["breadth"]["total"] == 2
+    assert "B.IS" not in {entry["key"] for entry in cache.get_freshness("stocks")}
+    assert events == [({"A.IS", "B.IS"}, ["A.IS"])]
+
+
+def test_stale_refetch_without_group_evicts_nothing():
+    cache = CacheManager(MemoryBackend())
+    cache.upsert_stocks([stock("A.IS"), stock("B.IS")], group=["A.IS", "B.IS"])
+
+    cache.upsert_stocks([stock("A.IS", price=12.0)])
+
+    assert len(cache.get_stocks()) == 2
+
+
+def test_retain_stocks_drops_unscheduled_symbols():
+    cache = CacheManager(MemoryBackend())
+    cache.upsert_stocks([stock("A.IS"), stock("B.IS")])
+    version = cache.get_version()
+
+    cache.retain_stocks(["A.IS"])
+    cache.retain_stocks(["A.IS"])  # Nothing left to evict: no write
+
+    assert [s["symbol"] for s in cache.get_stocks()] == ["A.IS"]
+    assert cache.get_version() == version + 1
+
+
+def test_evictions_survive_a_log_backend_reload(tmp_path):
+    cache = CacheManager(LogBackend(str(tmp_path)))
+    cache.upsert_stocks([stock("A.IS"), stock("B.IS")], group=["A.IS", "B.IS"])
+    cache.upsert_stocks([stock("A.IS", price=11.0)], group=["A.IS", "B.IS"])
+
+    restored = CacheManager(LogBackend(str(tmp_path)))
+
+    assert [(s["symbol"], s["price"]) for s in restored.get_stocks()] == [("A.IS", 11.0)]
+
+
+def test_version_is_scoped_to_the_data_an_asset_reads():
+    cache = CacheManager(MemoryBackend())
+    cache.upsert_stocks([stock("A.IS")])
+    market = cache.get_version(("stocks",))
+
+    cache.update_funds([{"code": "AAK", "price": 1.0}])
+
+    assert cache.get_version(("stocks",)) == cache.get_version(("forex",)) == market
+    assert cache.get_version(("funds",)) == cache.get_version() == market + 1
+    assert cache.get_version(("stocks", "funds")) == market + 1
+    assert cache.get_listing("bist100")[1] == market
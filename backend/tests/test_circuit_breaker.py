@@ -0,0 +1,101 @@
+"""CircuitBreaker: opening, single half-open probe, backoff and recovery"""
+from datetime import timedelta
+
+import pytest
+
+from services.yahoo_service import CircuitBreaker
+
+
+def fail():
+    raise RuntimeError("upstream down")
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(RuntimeError):
+            breaker.call(fail)
+
+
+def expire(breaker):
+    """Pretend the open timeout has passed"""
+    breaker.last_failure_time -= timedelta(seconds=breaker.current_timeout + 1)
+
+
+def test_opens_after_threshold_and_blocks_calls():
+    breaker = CircuitBreaker(failure_threshold=3, timeout=60, name="test")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            breaker.call(fail)
+    assert breaker.state == "CLOSED"
+
+    with pytest.raises(RuntimeError):
+        breaker.call(fail)
+    assert breaker.state == "OPEN"
+    calls = []
+    assert breaker.call(lambda: calls.append(1)) is None
+    assert calls == []
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=3, timeout=60, name="test")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            breaker.call(fail)
+    assert breaker.call(lambda: "ok") == "ok"
+    with pytest.raises(RuntimeError):
+        breaker.call(fail)
+
+    assert breaker.state == "CLOSED"
+
+
+def test_only_one_caller_probes_while_half_open():
+    breaker = CircuitBreaker(failure_threshold=1, timeout=60, name="test")
+    trip(breaker)
+    expire(breaker)
+
+    concurrent = []
+
+    def probe():
+        # A second caller arriving mid-probe is turned away
+        concurrent.append(breaker.call(lambda: "second"))
+        assert breaker.state == "HALF_OPEN"
+        return "probed"
+
+    assert breaker.call(probe) == "probed"
+    assert concurrent == [None]
+    assert breaker.state == "CLOSED"
+
+
+def test_failed_probes_double_the_timeout_up_to_the_cap():
+    breaker = CircuitBreaker(failure_threshold=1, timeout=60, name="test", max_timeout=200)
+    trip(breaker)
+
+    timeouts = []
+    for _ in range(3):
+        expire(breaker)
+        with pytest.raises(RuntimeError):
+            breaker.call(fail)
+        assert breaker.state == "OPEN"
+        timeouts.append(breaker.current_timeout)
+
+    assert timeouts == [120, 200, 200]
+
+
+def test_successful_probe_closes_and_resets_the_backoff():
+    breaker = CircuitBreaker(failure_threshold=1, timeout=60, name="test", max_timeout=600)
+    trip(breaker)
+    expire(breaker)
+    with pytest.raises(RuntimeError):
+        breaker.call(fail)
+    expire(breaker)
+
+    # The cheap probe runs first, then the real call
+    order = []
+    assert breaker.call(lambda: order.append("func") or "data", probe=lambda: order.append("probe")) == "data"
+
+    assert order == ["probe", "func"]
+    assert breaker.state == "CLOSED"
+    assert breaker.current_timeout == 60
+    assert breaker.get_status()["retry_in_seconds"] == 0.0
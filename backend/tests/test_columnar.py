@@ -0,0 +1,57 @@
+"""ColumnarView: row patching and removal"""
+from cache.columnar import ColumnarView
+
+
+def test_remove_moves_the_last_row_into_the_gap():
+    view = ColumnarView(["price"], initial_capacity=2, category_of=lambda symbol: "x")
+    view.rebuild([{"symbol": s, "price": p} for s, p in (("A", 1.0), ("B", 2.0), ("C", 3.0))])
+
+    view.remove("A")
+    view.remove("missing")
+
+    assert len(view) == 2
+    assert sorted(view.select([])) == ["B", "C"]
+    assert view.select([("price", ">", (2.5,))]) == ["C"]
+    view.upsert({"symbol": "D", "price": 4.0})
+    assert view.select([], sort_by="price") == ["D", "C", "B"]
+
+
+def screen_view():
+    view = ColumnarView(["price", "volume"], category_of=lambda symbol: "Banking" if symbol in ("A", "B") else "Energy")
+    view.rebuild([
+        {"symbol": "A", "price": 10.0, "volume": 500},
+        {"symbol": "B", "price": 30.0, "volume": None},
+        {"symbol": "C", "price": 20.0, "volume": 300},
+        {"symbol": "D", "price": "n/a", "volume": 100},
+    ])
+    return view
+
+
+def test_filters_combine_and_nan_never_matches():
+    view = screen_view()
+
+    assert view.select([("price", ">", (5.0,))]) == ["A", "B", "C"]
+    assert view.select([("price", "between", (10.0, 20.0)), ("volume", ">=", (300.0,))]) == ["A", "C"]
+    assert view.select([("volume", "!=", (100.0,))]) == ["A", "C"]
+
+
+def test_sort_puts_missing_values_last_in_both_directions():
+    view = screen_view()
+
+    assert view.select([], sort_by="volume") == ["A", "C", "D", "B"]
+    assert view.select([], sort_by="volume", descending=False) == ["D", "C", "A", "B"]
+    assert view.select([], sort_by="price", limit=2) == ["B", "C"]
+
+
+def test_category_filter_is_case_insensitive():
+    view = screen_view()
+
+    assert view.select([], sort_by="price", categories=["banking"]) == ["B", "A"]
+    assert view.select([], categories=["Unknown"]) == []
+
+
+def test_columns_grow_past_the_initial_capacity():
+    view = ColumnarView(["price"], initial_capacity=1)
+    view.rebuild([{"symbol": f"S{i}", "price": float(i)} for i in range(5)])
+
+    assert view.select([], sort_by="price", limit=1) == ["S4"]
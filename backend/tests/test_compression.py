@@ -0,0 +1,84 @@
+"""Accept-Encoding negotiation and precompressed snapshot bodies"""
+import gzip
+import json
+
+import pytest
+
+from compression import PrecompressedResponses, negotiate
+
+BOTH = ("br", "gzip")
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip;q=0.8", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0.1, gzip;q=0", "br"),
+    ("identity", None),
+    ("", None),
+    ("gzip;q=oops, br", "br"),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header, BOTH) == expected
+
+
+def test_negotiate_only_picks_supported_encodings():
+    assert negotiate("br", ("gzip",)) is None
+    assert negotiate("br, gzip;q=0.2", ("gzip",)) == "gzip"
+
+
+def responses(min_bytes=64):
+    store = PrecompressedResponses(min_bytes=min_bytes)
+    store.supported = ("gzip",)
+    return store
+
+
+def big_payload(tag):
+    return {"tag": tag, "rows": [{"symbol": f"S{i}", "price": i} for i in range(50)]}
+
+
+def test_body_is_rendered_once_per_version():
+    store = responses()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return big_payload(len(builds))
+
+    first, encoding = store.get("stocks", 1, build, "gzip")
+    again, _ = store.get("stocks", 1, build, "gzip")
+    plain, identity = store.get("stocks", 1, build, "")
+
+    assert (encoding, identity) == ("gzip", None)
+    assert first is again
+    assert json.loads(gzip.decompress(first)) == json.loads(plain) == big_payload(1)
+    assert len(builds) == 1
+
+    moved, _ = store.get("stocks", 2, build, "")
+    assert json.loads(moved)["tag"] == 2
+
+
+def test_lookup_only_answers_what_is_already_rendered():
+    store = responses()
+
+    assert store.lookup("stocks", 1, "gzip") is None
+    store.get("stocks", 1, lambda: big_payload(1), "")
+
+    # Identity is rendered, gzip isn't yet, and version 2 doesn't exist
+    assert store.lookup("stocks", 1, "")[1] is None
+    assert store.lookup("stocks", 1, "gzip") is None
+    assert store.lookup("stocks", 2, "") is None
+
+    store.get("stocks", 1, lambda: big_payload(1), "gzip")
+    assert store.lookup("stocks", 1, "gzip")[1] == "gzip"
+
+
+def test_small_bodies_are_never_compressed():
+    store = responses(min_bytes=4096)
+
+    body, encoding = store.get("summary", 1, lambda: {"ok": True}, "gzip")
+
+    assert (body, encoding) == (b'{"ok":true}', None)
+    assert store.lookup("summary", 1, "gzip") == (body, None)
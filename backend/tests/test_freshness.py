@@ -0,0 +1,48 @@
+"""FreshnessTracker: SLO breaches by age and source"""
+from datetime import datetime
+
+from cache.freshness import FreshnessTracker
+from cache.records import SymbolTable, compact
+
+NOW = 1_700_000_000.0
+
+
+def tracker(*entries):
+    fresh = FreshnessTracker()
+    for key, fetched_at, source in entries:
+        timestamp = datetime.fromtimestamp(fetched_at).isoformat() if fetched_at is not None else None
+        fresh.upsert("stocks", key, {"symbol": key, "timestamp": timestamp, "source": source})
+    return fresh
+
+
+def test_restored_records_are_judged_by_fetch_age():
+    fresh = tracker(("NEW", NOW - 60, "disk"), ("OLD", NOW - 3600, "disk"))
+
+    assert fresh.stale("stocks", 1200, NOW) == ["OLD"]
+
+
+def test_mock_and_untimed_records_always_breach():
+    fresh = tracker(("LIVE", NOW - 60, "live"), ("MOCK", NOW - 60, "mock"), ("NONE", None, "live"))
+
+    # Oldest first: no timestamp counts as infinitely old
+    assert fresh.stale("stocks", 1200, NOW) == ["NONE", "MOCK"]
+
+
+def test_report_counts_a_fresh_restart_as_within_slo():
+    fresh = tracker(("A", NOW - 60, "disk"), ("B", NOW - 120, "disk"), ("C", NOW - 7200, "live"))
+
+    report = fresh.report({"stocks": 1200}, NOW)["stocks"]
+
+    assert report["breaching"] == 1
+    assert report["within_slo_percent"] == 66.67
+    assert report["sources"]["disk"] == 2
+
+
+def test_restoring_keeps_mock_records_mock():
+    table = SymbolTable()
+
+    mock = compact({"symbol": "A", "price": 1.0, "source": "mock"}, table, "disk")
+    live = compact({"symbol": "B", "price": 1.0, "source": "live"}, table, "disk")
+
+    assert mock["source"] == "mock"
+    assert live["source"] == "disk"
@@ -0,0 +1,106 @@
+"""FundCatalog: listing per fund kind, refresh fallback, company names and search"""
+from fastapi.testclient import TestClient
+
+import main
+from services.fund_catalog import FundCatalog, company_of
+
+
+class ListingCrawler:
+    """Serves TEFAS fund listing rows per kind; a kind mapped to an exception raises it"""
+
+    list_endpoint = "/api/funds/fonGetiriBazliBilgiGetir"
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.requests = []
+
+    def _do_post(self, endpoint, payload):
+        self.requests.append((endpoint, payload["fonTipi"]))
+        rows = self.listings.get(payload["fonTipi"], [])
+        if isinstance(rows, Exception):
+            raise rows
+        return rows
+
+
+class Source:
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+
+def catalog(tmp_path, listings):
+    return FundCatalog(str(tmp_path / "catalog.json"), Source(ListingCrawler(listings)))
+
+
+LISTINGS = {
+    "YAT": [
+        {"fonKodu": "AKE", "fonUnvan": "AK PORTFÖY ALTIN FONU"},
+        {"fonKodu": "TCD", "fonUnvan": "TACİRLER PORTFÖY DEĞİŞKEN FON"},
+        {"fonKodu": "XYZ", "fonUnvan": None},
+        {"fonKodu": None, "fonUnvan": "NO CODE"},
+    ],
+    "EMK": [{"fonKodu": "AEA", "fonUnvan": "AVİVASA EMEKLİLİK PORTFÖY FONU"}],
+    "BYF": [{"fonKodu": "GLDTR", "fonUnvan": "QNB PORTFÖY ALTIN BYF"}],
+}
+
+
+def test_company_of():
+    assert company_of("AK PORTFÖY ALTIN FONU") == "AK PORTFÖY"
+    assert company_of("Is Portfoy Hisse") == "Is Portfoy"
+    assert company_of("PORTFÖY ALTIN") is None  # Nothing before the marker
+    assert company_of("XYZ FON") is None
+
+
+def test_fetch_kind_makes_one_listing_request(tmp_path):
+    cat = catalog(tmp_path, LISTINGS)
+
+    funds = cat._fetch_kind("YAT")
+
+    assert cat.source.crawler.requests == [(ListingCrawler.list_endpoint, "YAT")]
+    assert [(f["code"], f["name"], f["company"]) for f in funds] == [
+        ("AKE", "AK PORTFÖY ALTIN FONU", "AK PORTFÖY"),
+        ("TCD", "TACİRLER PORTFÖY DEĞİŞKEN FON", "TACİRLER PORTFÖY"),
+        ("XYZ", "XYZ", None),
+    ]
+    assert {(f["kind"], f["type"]) for f in funds} == {("YAT", "Mutual Fund")}
+
+
+def test_refresh_keeps_the_previous_entries_of_failed_or_empty_kinds(tmp_path):
+    cat = catalog(tmp_path, LISTINGS)
+    assert cat.refresh() == 5
+
+    cat.source.crawler.listings = {
+        "YAT": [{"fonKodu": "AKE", "fonUnvan": "AK PORTFÖY ALTIN FONU"}],
+        "EMK": ConnectionError("TEFAS down"),
+        "BYF": [],
+    }
+    assert cat.refresh() == 3
+
+    assert sorted(f["code"] for f in cat.get_funds()) == ["AEA", "AKE", "GLDTR"]
+    # Saved, so a restart starts from the merged catalog
+    assert len(FundCatalog(cat.path, Source(None))) == 3
+
+
+def test_refresh_with_nothing_listed_leaves_the_catalog_alone(tmp_path):
+    cat = catalog(tmp_path, LISTINGS)
+    cat.refresh()
+    updated_at = cat.updated_at
+
+    cat.source.crawler.listings = {}
+
+    assert cat.refresh() == 5
+    assert cat.updated_at == updated_at
+
+
+def test_search_endpoint(tmp_path, monkeypatch):
+    cat = catalog(tmp_path, LISTINGS)
+    cat.refresh()
+    monkeypatch.setattr(main, "fund_catalog", cat)
+    client = TestClient(main.app)
+
+    found = client.get("/api/funds/search", params={"q": "altın", "limit": 5}).json()
+
+    assert found["count"] == 2
+    assert {f["code"] for f in found["funds"]} == {"AKE", "GLDTR"}
+    assert found["catalog_updated"] == cat.updated_at
+    assert client.get("/api/funds/search", params={"q": "gldtr"}).json()["funds"][0]["code"] == "GLDTR"
+    assert client.get("/api/funds/search").status_code == 422
@@ -0,0 +1,39 @@
+"""ETags and conditional requests on the cached read endpoints"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from cache.cache_manager import cache
+
+
+@pytest.fixture
+def client():
+    cache.upsert_stocks([{"symbol": "A.IS", "name": "A", "price": 10.0, "change_percent": 1.0}])
+    cache.update_funds([{"code": "AAK", "name": "Fund", "price": 1.0}])
+    return TestClient(main.app)
+
+
+def test_matching_etag_gets_an_empty_304(client):
+    etag = client.get("/api/stocks").headers["etag"]
+
+    response = client.get("/api/stocks", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_writes_only_move_the_etags_of_the_data_they_touch(client):
+    stocks, funds = client.get("/api/stocks").headers["etag"], client.get("/api/funds").headers["etag"]
+
+    cache.update_funds([{"code": "AAK", "name": "Fund", "price": 2.0}])
+
+    assert client.get("/api/stocks", headers={"If-None-Match": stocks}).status_code == 304
+    moved = client.get("/api/funds", headers={"If-None-Match": funds})
+    assert moved.status_code == 200
+    assert moved.json()["funds"][0]["price"] == 2.0
+
+    cache.upsert_stocks([{"symbol": "A.IS", "name": "A", "price": 11.0, "change_percent": 2.0}])
+
+    assert client.get("/api/stocks", headers={"If-None-Match": stocks}).status_code == 200
+    assert client.get("/api/funds").headers["etag"] == moved.headers["etag"]
@@ -0,0 +1,72 @@
+"""SortedIndex: incremental leaderboard patching"""
+from cache.indexes import SortedIndex
+
+
+def stock(symbol, change_percent):
+    return {"symbol": symbol, "change_percent": change_percent}
+
+
+def test_upsert_keeps_entries_sorted():
+    index = SortedIndex("change_percent")
+    for record in (stock("A", 1.0), stock("B", -2.0), stock("C", 3.0)):
+        index.upsert(record)
+
+    assert index.top(2) == ["C", "A"]
+    assert index.top(2, descending=False) == ["B", "A"]
+
+
+def test_upsert_moves_an_existing_symbol():
+    index = SortedIndex("change_percent")
+    index.rebuild([stock("A", 1.0), stock("B", 2.0)])
+
+    index.upsert(stock("A", 5.0))
+
+    assert len(index) == 2
+    assert index.top(1) == ["A"]
+    assert index.value_of("A") == 5.0
+
+
+def test_unrankable_values_drop_the_symbol():
+    index = SortedIndex("change_percent")
+    index.rebuild([stock("A", 1.0), stock("B", "n/a"), {"change_percent": 4.0}])
+    assert index.top(5) == ["A"]
+
+    index.upsert(stock("A", None))
+    assert len(index) == 0
+    assert index.value_of("A") is None
+
+
+def test_remove_and_top_bounds():
+    index = SortedIndex("change_percent")
+    index.rebuild([stock("A", 1.0), stock("B", 2.0)])
+
+    index.remove("B")
+    index.remove("missing")
+
+    assert index.top(10) == ["A"]
+    assert index.top(0) == []
+
+
+def test_equal_values_break_ties_by_symbol():
+    index = SortedIndex("change_percent")
+    for symbol in ("B", "A", "C"):
+        index.upsert(stock(symbol, 1.0))
+
+    assert index.top(3, descending=False) == ["A", "B", "C"]
+
+
+def test_nan_values_are_not_ranked():
+    nan = float("nan")
+    index = SortedIndex("change_percent")
+    index.rebuild([stock("A", 1.0), stock("B", nan), stock("C", 3.0)])
+    index.upsert(stock("D", nan))
+    index.upsert(stock("E", 2.0))
+
+    assert index.top(5) == ["C", "E", "A"]
+    assert index.value_of("B") is None
+
+    # A NaN update unranks the symbol instead of leaving a stale entry behind
+    index.upsert(stock("C", nan))
+    index.upsert(stock("A", 0.5))
+    assert index.top(5) == ["E", "A"]
+    assert len(index) == 2
@@ -0,0 +1,84 @@
+"""Metrics: registration, labels, text exposition and the request middleware"""
+from fastapi.testclient import TestClient
+
+import main
+import metrics
+from metrics import MetricsRegistry
+
+
+def test_registering_a_name_twice_returns_the_first_metric():
+    registry = MetricsRegistry()
+    first = registry.counter("jobs_total", "Jobs", ("queue",))
+
+    again = registry.counter("jobs_total", "Other help", ("other",))
+
+    assert again is first
+    assert registry.render().count("# TYPE jobs_total counter") == 1
+
+
+def test_counters_and_gauges_keep_one_series_per_label_set():
+    registry = MetricsRegistry()
+    jobs = registry.counter("jobs_total", "Jobs", ("queue", "outcome"))
+    depth = registry.gauge("queue_depth", "Queued jobs", ("queue",))
+
+    jobs.inc(queue="fast", outcome="ok")
+    jobs.inc(2, outcome="ok", queue="fast")  # Keyword order doesn't matter
+    jobs.inc(queue="slow", outcome="error")
+    depth.set(5, queue="fast")
+    depth.dec(2, queue="fast")
+
+    assert jobs.value(queue="fast", outcome="ok") == 3
+    assert jobs.value(queue="slow") == 0  # Missing labels are a different series
+    assert jobs.total() == 4
+    assert depth.value(queue="fast") == 3
+    assert registry.render() == (
+        "# HELP jobs_total Jobs\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{queue="fast",outcome="ok"} 3\n'
+        'jobs_total{queue="slow",outcome="error"} 1\n'
+        "# HELP queue_depth Queued jobs\n"
+        "# TYPE queue_depth gauge\n"
+        'queue_depth{queue="fast"} 3\n'
+    )
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    errors = registry.counter("errors_total", "Errors", ("message",))
+
+    errors.inc(message='bad "quote"\\path\nnext')
+
+    assert 'errors_total{message="bad \\"quote\\"\\\\path\\nnext"} 1' in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, route="/a")
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+    assert latency.count(route="/a") == 4
+
+
+def test_requests_are_labelled_by_route_template():
+    client = TestClient(main.app)
+    before = metrics.http_responses.value(method="DELETE", route="/api/alerts/{rule_id}", status="404")
+    unmatched = metrics.http_responses.value(method="GET", route="unmatched", status="404")
+
+    client.delete("/api/alerts/987654")
+    client.get("/no/such/path")
+    body = client.get("/metrics").text
+
+    assert metrics.http_responses.value(method="DELETE", route="/api/alerts/{rule_id}", status="404") == before + 1
+    assert metrics.http_responses.value(method="GET", route="unmatched", status="404") == unmatched + 1
+    assert "# TYPE algorist_http_request_duration_seconds histogram" in body
+    assert 'algorist_http_responses_total{method="DELETE",route="/api/alerts/{rule_id}",status="404"}' in body
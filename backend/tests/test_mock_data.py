@@ -0,0 +1,125 @@
+"""Ghost Mode mock data: correlated GBM paths, anchored to the last real cached prices"""
+import math
+
+import numpy as np
+import pytest
+
+import services.mock_data_service as mock_module
+from cache.backends import MemoryBackend
+from cache.cache_manager import CacheManager
+from services.mock_data_service import CorrelatedGBM, MockDataService, TRADING_SECONDS_PER_YEAR
+
+
+@pytest.mark.parametrize("correlation", [0.0, 0.5, 0.9])
+def test_returns_have_the_requested_correlation(correlation):
+    model = CorrelatedGBM(correlation=correlation, seed=1)
+
+    returns = model.log_returns(n=3, steps=20_000)
+
+    pairwise = np.corrcoef(returns, rowvar=False)[np.triu_indices(3, k=1)]
+    assert pairwise == pytest.approx([correlation] * 3, abs=0.03)
+
+
+def test_returns_have_the_requested_volatility_and_drift():
+    model = CorrelatedGBM(volatility=0.4, drift=0.1, step_seconds=3600, seed=2)
+    dt = 3600 / TRADING_SECONDS_PER_YEAR
+
+    returns = model.log_returns(n=50, steps=4_000)
+
+    assert returns.std() == pytest.approx(0.4 * math.sqrt(dt), rel=0.02)
+    # Without volatility only the drift is left
+    riskless = CorrelatedGBM(volatility=0.0, drift=0.1, step_seconds=3600, seed=2).log_returns(n=2, steps=3)
+    np.testing.assert_allclose(riskless, 0.1 * dt)
+
+
+def test_same_seed_same_market():
+    prices = np.array([100.0, 50.0, 10.0])
+
+    first = CorrelatedGBM(seed=7).paths(prices, 10)
+    again = CorrelatedGBM(seed=7).paths(prices, 10)
+
+    assert first.shape == (10, 3)
+    np.testing.assert_array_equal(first, again)
+    assert not np.array_equal(first, CorrelatedGBM(seed=8).paths(prices, 10))
+    # A path's last row is where step() lands for the same draws
+    np.testing.assert_allclose(first[-1], CorrelatedGBM(seed=7).step(prices, 10))
+
+
+def test_advance_scales_with_elapsed_time():
+    prices = np.array([100.0, 100.0, 100.0])
+
+    moved = CorrelatedGBM(seed=3).advance(prices, np.array([0.0, 900.0, 86_400.0]))
+
+    assert moved[0] == 100.0
+    assert np.all(moved > 0)
+    assert abs(math.log(moved[2] / 100)) > abs(math.log(moved[1] / 100))
+
+
+@pytest.fixture
+def market(monkeypatch):
+    """Fresh cache the mock service anchors to"""
+    market = CacheManager(MemoryBackend())
+    market.update_stocks([{"symbol": "THYAO.IS", "name": "Türk Hava Yolları", "price": 300.0, "market_cap": 4e11, "source": "live"}])
+    market.update_forex([{"pair": "USD/TRY", "symbol": "TRY=X", "rate": 35.0, "source": "live"}])
+    monkeypatch.setattr(mock_module, "cache", market)
+    return market
+
+
+def test_mock_prices_start_from_the_last_real_price(market):
+    mock = MockDataService(seed=1)
+
+    stock, = mock.generate_stock_data(["THYAO.IS"])
+    usd = next(pair for pair in mock.generate_forex_data() if pair["symbol"] == "TRY=X")
+
+    assert stock["source"] == "mock" and stock["name"] == "Türk Hava Yolları" and stock["market_cap"] == 4e11
+    assert stock["price"] == pytest.approx(300.0, rel=0.05)
+    assert stock["change"] == pytest.approx(stock["price"] - 300.0, abs=0.01)
+    assert usd["rate"] == pytest.approx(35.0, rel=0.05)
+    assert usd["change"] == pytest.approx(usd["rate"] - 35.0, abs=1e-4)
+
+
+def test_same_seed_same_mock_data(market):
+    first = MockDataService(seed=5).generate_stock_data(["THYAO.IS", "GARAN.IS", "NEW.IS"])
+    again = MockDataService(seed=5).generate_stock_data(["THYAO.IS", "GARAN.IS", "NEW.IS"])
+
+    assert [(r["price"], r["volume"]) for r in first] == [(r["price"], r["volume"]) for r in again]
+
+
+def test_simulation_keeps_walking_between_calls(market):
+    mock = MockDataService(seed=2)
+
+    first, = mock.generate_stock_data(["THYAO.IS"])
+    second, = mock.generate_stock_data(["THYAO.IS"])
+
+    # Each step starts where the last one ended; change stays relative to the real price
+    assert second["price"] != first["price"]
+    assert second["change"] == pytest.approx(second["price"] - 300.0, abs=0.01)
+
+
+def test_real_cache_writes_re_anchor_and_mock_writes_do_not(market):
+    mock = MockDataService(seed=3)
+    mock.generate_stock_data(["THYAO.IS"])
+
+    market.update_stocks([{"symbol": "THYAO.IS", "name": "THY", "price": 400.0, "source": "live"}])
+    anchored, = mock.generate_stock_data(["THYAO.IS"])
+
+    # Ghost Mode output written back to the cache must not become the new anchor
+    market.update_stocks([dict(anchored, price=999.0)])
+    still, = mock.generate_stock_data(["THYAO.IS"])
+
+    assert anchored["name"] == "THY"
+    assert anchored["change"] == pytest.approx(anchored["price"] - 400.0, abs=0.01)
+    assert anchored["price"] == pytest.approx(400.0, rel=0.05)
+    assert still["change"] == pytest.approx(still["price"] - 400.0, abs=0.01)
+    assert mock._get_base_price("THYAO.IS")["base_price"] == 400.0
+
+
+def test_unknown_symbols_are_pinned_to_one_fallback_price(market):
+    mock = MockDataService(seed=4)
+
+    first = mock._get_base_price("GARAN.IS")["base_price"]
+    invented = mock._get_base_price("NEW.IS")["base_price"]
+
+    assert first == MockDataService.FALLBACK_PRICES["GARAN.IS"]
+    assert 10 <= invented <= 200
+    assert mock._get_base_price("NEW.IS")["base_price"] == invented
@@ -0,0 +1,82 @@
+"""Cursor pagination: cursor format, pinned pages and expired pins"""
+import pytest
+
+from cache.backends import MemoryBackend
+from cache.cache_manager import CacheManager
+from cache.pagination import Paginator, decode_cursor, encode_cursor
+
+
+def stocks(*symbols, price=10.0):
+    return [{"symbol": symbol, "name": symbol, "price": price} for symbol in symbols]
+
+
+def paginator(retained_versions=4):
+    cache = CacheManager(MemoryBackend())
+    cache.upsert_stocks(stocks("D.IS", "B.IS", "A.IS", "C.IS", "E.IS"))
+    return cache, Paginator(cache, retained_versions=retained_versions)
+
+
+def symbols(page):
+    return [item["symbol"] for item in page["items"]]
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("bist100", 7, "GARAN.IS")
+
+    assert decode_cursor(cursor, "bist100") == (7, "GARAN.IS")
+    with pytest.raises(ValueError, match="another listing"):
+        decode_cursor(cursor, "funds")
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "bm90IGpzb24", encode_cursor("bist100", 1, "A")[:-3]])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "bist100")
+
+
+def test_pages_walk_the_list_in_key_order():
+    _, pages = paginator()
+
+    first = pages.page("bist100", 2)
+    second = pages.page("bist100", 2, first["next_cursor"])
+    last = pages.page("bist100", 2, second["next_cursor"])
+
+    assert symbols(first) + symbols(second) + symbols(last) == ["A.IS", "B.IS", "C.IS", "D.IS", "E.IS"]
+    assert last["next_cursor"] is None
+    assert first["total"] == 5
+
+
+def test_pinned_pages_ignore_writes_made_mid_listing():
+    cache, pages = paginator()
+    first = pages.page("bist100", 2)
+
+    cache.upsert_stocks(stocks("AA.IS", "BB.IS", price=99.0) + stocks("C.IS", price=50.0))
+    second = pages.page("bist100", 2, first["next_cursor"])
+
+    assert symbols(second) == ["C.IS", "D.IS"]
+    assert second["items"][0]["price"] == 10.0
+    assert second["consistent"] is True
+    assert second["version"] == first["version"]
+
+
+def test_writes_to_other_lists_keep_the_pin():
+    cache, pages = paginator(retained_versions=1)
+    first = pages.page("bist100", 2)
+
+    cache.update_funds([{"code": "AAK", "price": 1.0}])
+
+    assert pages.page("bist100", 2)["version"] == first["version"]
+    assert pages.page("bist100", 2, first["next_cursor"])["consistent"] is True
+
+
+def test_expired_pin_continues_on_current_data():
+    cache, pages = paginator(retained_versions=1)
+    first = pages.page("bist100", 2)
+
+    cache.upsert_stocks(stocks("BA.IS", price=20.0))
+    pages.page("bist100", 2)  # Current version pushes the pinned one out
+    second = pages.page("bist100", 2, first["next_cursor"])
+
+    assert second["consistent"] is False
+    assert symbols(second) == ["BA.IS", "C.IS"]
+    assert second["version"] == cache.get_listing("bist100")[1]
@@ -0,0 +1,83 @@
+"""Portfolio valuation: currency conversion, missing data, batch vs single"""
+import pytest
+
+from cache.backends import MemoryBackend
+from cache.cache_manager import CacheManager
+from models.schemas import PortfolioHolding
+from services import portfolio_service as portfolio_module
+from services.portfolio_service import PortfolioService
+
+
+@pytest.fixture
+def market(monkeypatch):
+    cache = CacheManager(MemoryBackend())
+    cache.upsert_stocks([{"symbol": "THYAO.IS", "name": "THY", "price": 300.0}])
+    cache.update_forex([{"symbol": "TRY=X", "pair": "USD/TRY", "rate": 30.0}])
+    cache.update_commodities([{"symbol": "GC=F", "name": "Gold", "price": 2000.0}])
+    cache.update_funds([{"code": "TCD", "name": "Fund", "price": 6.0}])
+    monkeypatch.setattr(portfolio_module, "cache", cache)
+    return cache
+
+
+def holding(symbol, quantity, cost_basis=0.0, currency="TRY"):
+    return PortfolioHolding(symbol=symbol, quantity=quantity, cost_basis=cost_basis, currency=currency)
+
+
+def test_mixed_currencies_are_converted_to_try(market):
+    result = PortfolioService().value_portfolio([
+        holding("THYAO", 10, 250.0),              # 3000 TRY vs 2500 TRY
+        holding("GC=F", 1, 1900.0, "USD"),        # 2000 USD * 30 vs 1900 USD * 30
+        holding("TCD", 100, 0.2, "USD"),          # 600 TRY vs 20 USD * 30
+    ])
+
+    totals = result["totals"]
+    assert totals["value_try"] == 3000 + 60000 + 600
+    assert totals["cost_try"] == 2500 + 57000 + 600
+    assert totals["pnl_try"] == 500 + 3000
+    assert totals["pnl_usd"] == round(3500 / 30, 2)
+    assert result["positions"][1]["pnl_percent"] == round(3000 / 57000 * 100, 2)
+    assert result["missing_symbols"] == []
+
+
+def test_positions_without_price_or_fx_are_left_out_of_both_totals(market):
+    result = PortfolioService().value_portfolio([
+        holding("THYAO.IS", 10, 250.0),
+        holding("NOPE.IS", 5, 10.0),             # No cached price
+        holding("TCD", 100, 0.2, "EUR"),         # No EURTRY=X rate for the cost
+    ])
+
+    assert result["totals"]["value_try"] == 3000
+    assert result["totals"]["cost_try"] == 2500
+    assert result["missing_symbols"] == ["NOPE.IS", "TCD"]
+    fund = result["positions"][2]
+    assert fund["priced"] is True and fund["value_try"] == 600 and fund["cost_try"] is None
+
+
+def test_unsupported_cost_currency_is_rejected(market):
+    with pytest.raises(ValueError, match="Unsupported currency"):
+        PortfolioService().value_portfolio([holding("THYAO.IS", 1, 1.0, "JPY")])
+
+
+def test_batch_matches_single_valuations(market):
+    service = PortfolioService()
+    portfolios = [
+        [holding("THYAO.IS", 10, 250.0), holding("GC=F", 1, 1900.0, "USD")],
+        [],
+        [holding("TCD", 100, 5.0), holding("USD", 1000, 28.0)],
+    ]
+
+    batch = service.value_portfolios(portfolios)
+
+    assert batch == [service.value_portfolio(holdings) for holdings in portfolios]
+    assert batch[1]["totals"]["value_try"] == 0
+    assert batch[2]["totals"]["value_try"] == 600 + 30000
+
+
+def test_price_table_is_rebuilt_after_a_write(market):
+    service = PortfolioService()
+    before = service.value_portfolio([holding("THYAO.IS", 1)])["totals"]["value_try"]
+
+    market.upsert_stocks([{"symbol": "THYAO.IS", "name": "THY", "price": 310.0}])
+
+    assert before == 300
+    assert service.value_portfolio([holding("THYAO.IS", 1)])["totals"]["value_try"] == 310
@@ -0,0 +1,38 @@
+"""QuoteCache: freshness window, hard expiry and LRU eviction"""
+from cache.quote_cache import QuoteCache
+
+
+def quote(symbol, price=1.0):
+    return {"symbol": symbol, "price": price}
+
+
+def test_entries_go_stale_then_expire():
+    tier = QuoteCache(max_entries=10, fresh_seconds=60, max_age_seconds=600)
+    tier.put_many([quote("AAPL", 190.0)], now=1000.0)
+
+    assert tier.get("AAPL", now=1030.0) == (quote("AAPL", 190.0), False)
+    assert tier.get("AAPL", now=1100.0) == (quote("AAPL", 190.0), True)
+
+    assert tier.get("AAPL", now=1601.0) == (None, False)
+    assert "AAPL" not in tier  # Dropped on the expired read
+
+
+def test_least_recently_read_symbol_is_evicted():
+    tier = QuoteCache(max_entries=2, fresh_seconds=60, max_age_seconds=600)
+    tier.put_many([quote("A"), quote("B")], now=0.0)
+
+    tier.get("A", now=1.0)  # B is now the least recently used
+    tier.put_many([quote("C")], now=2.0)
+
+    assert len(tier) == 2
+    assert "A" in tier and "C" in tier and "B" not in tier
+
+
+def test_put_refreshes_an_entry_and_skips_records_without_symbol():
+    tier = QuoteCache(max_entries=10, fresh_seconds=60, max_age_seconds=600)
+    tier.put_many([quote("A", 1.0)], now=0.0)
+
+    tier.put_many([quote("A", 2.0), {"price": 3.0}], now=500.0)
+
+    assert len(tier) == 1
+    assert tier.get("A", now=530.0) == (quote("A", 2.0), False)
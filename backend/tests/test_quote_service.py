@@ -0,0 +1,142 @@
+"""QuoteService: main-cache hits, tier hits, background fetches of misses"""
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import services.quote_service as quote_module
+from cache.backends import MemoryBackend
+from cache.cache_manager import CacheManager
+from cache.quote_store import QuoteStore
+from config import settings
+from services.quote_service import QuoteService
+from services.yahoo_service import YahooFinanceService
+
+
+class Source:
+    """fetch_on_demand stand-in: known symbols get a quote, None while `open`"""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.open = False
+        self.batches = []
+        self.fetched = threading.Event()
+
+    def fetch_on_demand(self, tickers):
+        self.batches.append(list(tickers))
+        self.fetched.set()
+        if self.open:
+            return None
+        return [{"symbol": t, "price": self.prices[t], "source": "live"} for t in tickers if t in self.prices]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    market = CacheManager(MemoryBackend())
+    market.update_stocks([{"symbol": "THYAO.IS", "price": 300.0, "timestamp": datetime.now().isoformat()}])
+    monkeypatch.setattr(quote_module, "cache", market)
+    monkeypatch.setattr(settings, "ON_DEMAND_MIN_INTERVAL_SECONDS", 0.0)
+    service = QuoteService(Source({"AAPL": 190.0}))
+    yield service
+    service.stop()
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_scheduled_symbols_come_from_the_main_cache(service):
+    result = service.get_quotes(["THYAO.IS"])
+
+    assert [(q["symbol"], q["price"], q["stale"]) for q in result["quotes"]] == [("THYAO.IS", 300.0, False)]
+    assert result["pending"] == [] and service.source.batches == []
+
+
+def test_misses_are_pending_until_fetched_in_the_background(service):
+    assert service.get_quotes(["AAPL", "NOPE"]) == {"quotes": [], "pending": ["AAPL", "NOPE"], "not_found": []}
+
+    wait_until(lambda: "AAPL" in service.tier and service._recently_not_found("NOPE"))
+    result = service.get_quotes(["AAPL", "NOPE"])
+
+    assert service.source.batches == [["AAPL", "NOPE"]]
+    assert [(q["symbol"], q["price"], q["stale"]) for q in result["quotes"]] == [("AAPL", 190.0, False)]
+    assert result["not_found"] == ["NOPE"]
+
+
+def test_stale_tier_hits_are_served_and_requeued(service):
+    service.tier.put_many([{"symbol": "AAPL", "price": 180.0}], now=time.monotonic() - settings.ON_DEMAND_FRESH_SECONDS - 1)
+
+    result = service.get_quotes(["AAPL"])
+
+    assert [(q["price"], q["stale"]) for q in result["quotes"]] == [(180.0, True)]
+    wait_until(lambda: service.tier.get("AAPL")[0]["price"] == 190.0)
+
+
+def test_batches_stay_queued_while_the_on_demand_circuit_is_open(service, monkeypatch):
+    service.source.open = True
+
+    service.get_quotes(["AAPL"])
+    assert service.source.fetched.wait(5)
+    monkeypatch.setattr(settings, "ON_DEMAND_MIN_INTERVAL_SECONDS", 60.0)  # Park the fetcher
+
+    wait_until(lambda: service.get_status()["pending"] == 1)
+    assert "AAPL" not in service.tier
+
+
+def test_on_demand_failures_do_not_trip_the_stocks_breaker(monkeypatch):
+    yahoo = YahooFinanceService()
+
+    def fail(symbols):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(yahoo, "_fetch_with_circuit_breaker", fail)
+    for _ in range(settings.BREAKER_FAILURE_THRESHOLD):
+        with pytest.raises(RuntimeError):
+            yahoo.fetch_on_demand(["AAPL"])
+
+    assert yahoo.fetch_on_demand(["AAPL"]) is None
+    assert yahoo.breakers["on_demand"].state == "OPEN"
+    assert yahoo.breakers["stocks"].state == "CLOSED"
+    assert not yahoo.use_mock_data
+
+
+def test_followers_forward_misses_to_the_leader(service, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ON_DEMAND_SYNC_SECONDS", 0.01)
+    follower = QuoteService(Source({"AAPL": 999.0}))
+    path = str(tmp_path / "on_demand.db")
+    service.lead(QuoteStore(path))
+    follower.follow(QuoteStore(path))
+    try:
+        assert follower.get_quotes(["AAPL", "NOPE"])["pending"] == ["AAPL", "NOPE"]
+
+        wait_until(lambda: "AAPL" in follower.tier and follower._recently_not_found("NOPE"))
+        result = follower.get_quotes(["AAPL", "NOPE"])
+    finally:
+        follower.stop()
+
+    # Fetched once, by the leader, and served from the follower's own tier
+    assert follower.source.batches == []
+    assert service.source.batches == [["AAPL", "NOPE"]]
+    assert [(q["symbol"], q["price"], q["stale"]) for q in result["quotes"]] == [("AAPL", 190.0, False)]
+    assert result["not_found"] == ["NOPE"]
+
+
+def test_store_hands_out_only_new_batches(tmp_path):
+    store = QuoteStore(str(tmp_path / "on_demand.db"))
+    store.request(["B", "A", "B"])
+    assert sorted(store.take_requests()) == ["A", "B"]
+    assert store.take_requests() == []
+
+    store.put([{"symbol": "A", "price": 1.0}], ["B"], max_age_seconds=60)
+    rows, seq = store.updated_since(0)
+    store.put([{"symbol": "C", "price": 3.0}], [], max_age_seconds=60)
+    newer, last = store.updated_since(seq)
+
+    assert [(symbol, record) for symbol, record, _ in rows] == [("A", {"symbol": "A", "price": 1.0}), ("B", None)]
+    assert [symbol for symbol, _, _ in newer] == ["C"]
+    assert store.updated_since(last) == ([], last)
+    store.close()
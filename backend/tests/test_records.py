@@ -0,0 +1,109 @@
+"""Compact Quote records: dict round trips, shared metadata and serialization"""
+import json
+import pickle
+
+import pytest
+
+from cache.records import Quote, SymbolTable, compact, compact_many, to_dicts
+from compression import render_json
+from models.schemas import StockData
+
+STOCK = {
+    "symbol": "THYAO.IS",
+    "name": "Türk Hava Yolları",
+    "price": 305.25,
+    "change": 4.5,
+    "change_percent": 1.5,
+    "volume": 12_345_678,
+    "market_cap": None,
+    "timestamp": "2026-10-19T10:15:30.123456",
+    "source": "live",
+}
+FOREX = {"symbol": "USDTRY=X", "pair": "USD/TRY", "rate": 34.12, "change": 0.1, "timestamp": "2026-10-19T10:15:30"}
+FUND = {"code": "AKE", "name": "AK PORTFÖY ALTIN FONU", "price": 1.234567, "sector": "Gold"}
+
+
+@pytest.mark.parametrize("record", [STOCK, FOREX, FUND])
+def test_round_trip_keeps_the_fetched_dict(record):
+    quote = compact(record, SymbolTable())
+
+    assert quote.to_dict() == record
+    assert list(quote) == list(record)  # Key order too, so rendered JSON is unchanged
+    assert {**quote} == record
+    assert len(quote) == len(record)
+
+
+def test_mapping_reads():
+    forex = compact(FOREX, SymbolTable())
+
+    assert forex["rate"] == 34.12 and forex.price == 34.12
+    assert forex.get("price") is None  # Not a field of this record
+    assert "pair" in forex and "price" not in forex
+    with pytest.raises(KeyError):
+        forex["volume"]
+    assert forex.key == "USDTRY=X"
+    assert forex.fetched_at == pytest.approx(compact(dict(FOREX, timestamp="2026-10-19T10:15:31"), SymbolTable()).fetched_at - 1)
+
+
+def test_unparseable_and_aware_timestamps_are_kept_verbatim():
+    table = SymbolTable()
+
+    for timestamp in ("yesterday", "2026-10-19T10:15:30+03:00", None):
+        record = dict(FOREX, timestamp=timestamp)
+        quote = compact(record, table)
+        assert quote.to_dict() == record
+        assert quote.fetched_at is None
+
+
+def test_refreshes_share_the_symbol_metadata():
+    table = SymbolTable()
+    first = compact(STOCK, table)
+
+    moved = compact(dict(STOCK, price=306.0, timestamp="2026-10-19T10:18:30"), table)
+    renamed = compact(dict(STOCK, name="THY"), table)
+
+    assert moved.meta is first.meta
+    assert renamed.meta is not first.meta and renamed["name"] == "THY"
+    assert len(table) == 1
+
+
+def test_source_override_and_mock_records():
+    table = SymbolTable()
+    live = compact(STOCK, table)
+
+    restored = compact(live, table, "disk")
+
+    assert compact(live, table) is live  # Already compact: reused as-is
+    assert restored["source"] == "disk" and restored.to_dict() == dict(STOCK, source="disk")
+    assert compact(dict(STOCK, source="mock"), table, "disk")["source"] == "mock"
+    assert compact({"symbol": "X", "price": 1.0}, table, "disk").to_dict() == {"symbol": "X", "price": 1.0, "source": "disk"}
+
+
+def test_compact_many_drops_records_without_a_key():
+    quotes = compact_many([STOCK, {"price": 1.0}, {"symbol": "", "price": 2.0}, FUND], SymbolTable())
+
+    assert [quote.key for quote in quotes] == ["THYAO.IS", "AKE"]
+
+
+def test_serialization():
+    quotes = compact_many([STOCK, FOREX, FUND], SymbolTable())
+
+    # JSON persistence and responses render exactly what the fetcher wrote
+    assert to_dicts(quotes) == [STOCK, FOREX, FUND]
+    assert to_dicts([FUND]) == [FUND] and to_dicts([FUND])[0] is not FUND
+    assert json.loads(render_json(to_dicts(quotes))) == [STOCK, FOREX, FUND]
+
+    # Shared snapshots pickle the compact form
+    restored = pickle.loads(pickle.dumps(quotes))
+    assert all(isinstance(quote, Quote) for quote in restored)
+    assert to_dicts(restored) == [STOCK, FOREX, FUND]
+
+
+def test_project_matches_the_response_models():
+    quote = compact(STOCK, SymbolTable())
+
+    projected = quote.project(tuple(StockData.model_fields))
+
+    assert projected["price"] == 305.25 and projected["timestamp"] == STOCK["timestamp"]
+    assert StockData(**projected).model_dump(mode="json") == projected
+    assert compact(FUND, SymbolTable()).project(("code", "volume")) == {"code": "AKE", "volume": None}
@@ -0,0 +1,117 @@
+"""ReplayEngine: clock speed, recorded tick order and synthetic walks"""
+import json
+from datetime import datetime
+
+import pytest
+
+import services.replay_service as replay_module
+from services.replay_service import ReplayClock, ReplayEngine
+
+# 2026-10-19 10:00 local time
+START = datetime(2026, 10, 19, 10, 0).timestamp()
+
+
+class Clock:
+    """Simulated time set by the test"""
+
+    def __init__(self, now):
+        self.t = now
+
+    def now(self):
+        return self.t
+
+
+def test_clock_runs_speed_times_faster(monkeypatch):
+    wall = [100.0]
+    monkeypatch.setattr(replay_module.time, "monotonic", lambda: wall[0])
+    clock = ReplayClock(START, speed=1440.0)
+
+    wall[0] += 2.5
+
+    assert clock.now() == START + 2.5 * 1440
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    ticks = [
+        {"ts": START + 120, "symbol": "GARAN.IS", "price": 101.0},
+        {"ts": datetime.fromtimestamp(START).isoformat(), "symbol": "THYAO.IS", "price": 300.0},
+        {"ts": START + 60, "symbol": "THYAO.IS", "price": 302.0},
+        {"ts": START, "symbol": "GARAN.IS", "price": 100.0, "previous_close": 95.0},
+        {"ts": START + 86_400, "symbol": "THYAO.IS", "price": 310.0},
+    ]
+    path = tmp_path / "ticks.jsonl"
+    path.write_text("\n".join(json.dumps(tick) for tick in ticks) + "\n\n")
+    engine = ReplayEngine(source=str(path), seed=1)
+    engine.clock = Clock(START)
+    return engine
+
+
+def prices(records):
+    return {r["symbol"]: r["price"] for r in records}
+
+
+def test_recorded_ticks_replay_in_time_order(recorded):
+    assert [tick["ts"] for tick in recorded._ticks] == sorted(tick["ts"] for tick in recorded._ticks)
+    assert recorded._stocks.symbols == ["GARAN.IS", "THYAO.IS"]
+
+    # Only ticks at or before the simulated time are applied
+    assert prices(recorded.fetch_stock_group(["THYAO.IS", "GARAN.IS"])) == {"THYAO.IS": 300.0, "GARAN.IS": 100.0}
+
+    recorded.clock.t = START + 90
+    assert prices(recorded.fetch_stock_group(["THYAO.IS", "GARAN.IS"])) == {"THYAO.IS": 302.0, "GARAN.IS": 100.0}
+
+    recorded.clock.t = START + 3600
+    records = recorded.fetch_stock_group(["THYAO.IS", "GARAN.IS", "UNKNOWN.IS"])
+    assert prices(records) == {"THYAO.IS": 302.0, "GARAN.IS": 101.0}
+    garan = next(r for r in records if r["symbol"] == "GARAN.IS")
+    assert garan["change"] == 6.0  # Against the recorded previous close
+    assert {r["source"] for r in records} == {"replay"}
+    assert garan["replay_time"] == datetime.fromtimestamp(START + 3600).isoformat()
+
+
+def test_next_day_tick_rolls_the_previous_close(recorded):
+    recorded.fetch_stock_group(["THYAO.IS"])
+
+    recorded.clock.t = START + 86_400
+    thyao, = recorded.fetch_stock_group(["THYAO.IS"])
+
+    assert (thyao["price"], thyao["change"]) == (310.0, 8.0)
+
+
+def test_synthetic_prices_move_only_with_simulated_time():
+    engine = ReplayEngine(symbol_count=20, fund_count=3, seed=7)
+    engine.clock = Clock(START)
+    symbols = engine._stocks.symbols[:5]
+
+    first = prices(engine.fetch_stock_group(symbols))
+    same = prices(engine.fetch_stock_group(symbols))
+    engine.clock.t += 3600
+    moved = prices(engine.fetch_stock_group(symbols))
+
+    assert same == first
+    assert moved != first and set(moved) == set(symbols)
+    assert engine.stats["fetches"] == 3 and engine.stats["records"] == 15
+
+
+def test_synthetic_replay_is_reproducible():
+    def run(seed):
+        engine = ReplayEngine(symbol_count=20, fund_count=3, seed=seed)
+        engine.clock = Clock(START)
+        out = []
+        for _ in range(3):
+            engine.clock.t += 900
+            out.append(prices(engine.fetch_stock_group(engine._stocks.symbols)))
+        return out
+
+    assert run(3) == run(3)
+    assert run(3) != run(4)
+
+
+def test_groups_cover_the_universe_once():
+    engine = ReplayEngine(symbol_count=23, fund_count=1, seed=1)
+
+    groups = engine.stock_groups(5)
+
+    assert len(groups) == 5
+    assert [symbol for group in groups for symbol in group] == engine._stocks.symbols
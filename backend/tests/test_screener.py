@@ -0,0 +1,25 @@
+"""Screener filter expressions"""
+import pytest
+
+from services.screener import parse_conditions
+
+FIELDS = ["price", "change_percent", "volume", "market_cap"]
+
+
+def test_comparisons_and_between():
+    conditions = parse_conditions(
+        ["change_percent>2", "volume >= 5e6; market_cap between 5e10 and 1e9", "price between 1, 2"], FIELDS
+    )
+
+    assert conditions == [
+        ("change_percent", ">", (2.0,)),
+        ("volume", ">=", (5e6,)),
+        ("market_cap", "between", (1e9, 5e10)),
+        ("price", "between", (1.0, 2.0)),
+    ]
+
+
+@pytest.mark.parametrize("expression", ["pe>10", "price>>1", "price>1e", "price"])
+def test_invalid_expressions_raise(expression):
+    with pytest.raises(ValueError):
+        parse_conditions([expression], FIELDS)
@@ -0,0 +1,80 @@
+"""PrefixIndex: Turkish folding, symbol tokens, tiered ranking, incremental updates"""
+import pytest
+
+from cache.backends import MemoryBackend
+from cache.cache_manager import CacheManager
+from cache.search_index import PrefixIndex, fold, tokenize
+from services.fund_catalog import FundCatalog
+from services.search_service import SearchService
+
+
+@pytest.mark.parametrize("text, folded", [
+    ("İŞ", "is"), ("iş", "is"), ("IŞIK", "isik"), ("Türk Hava Yolları", "turk hava yollari"), ("ALTIN", "altin"),
+])
+def test_fold_follows_turkish_casing(text, folded):
+    assert fold(text) == folded
+
+
+@pytest.mark.parametrize("text, tokens", [
+    ("THYAO.IS", ["thyao"]),
+    ("TRY=X", ["try"]),
+    ("GC=F", ["gc"]),
+    ("İş Bankası", ["is", "bankasi"]),
+    ("USD/TRY", ["usd", "try"]),
+    ("thyao.is garan", ["thyao", "garan"]),
+])
+def test_tokenize_drops_symbol_suffixes_only(text, tokens):
+    assert tokenize(text) == tokens
+
+
+def index():
+    return PrefixIndex({
+        "stocks:THYAO.IS": ("THYAO.IS", "Türk Hava Yolları"),
+        "stocks:ISCTR.IS": ("ISCTR.IS", "Türkiye İş Bankası"),
+        "stocks:GARAN.IS": ("GARAN.IS", "Garanti Bankası"),
+        "funds:TI2": ("TI2", "İş Portföy Teknoloji"),
+        "funds:IST": ("IST", "Istanbul Hisse Fonu"),
+    })
+
+
+def test_suffix_is_not_a_searchable_word():
+    # Key prefixes, then the name starting with "İş"; THYAO.IS and GARAN.IS stay out
+    assert index().search("is") == ["stocks:ISCTR.IS", "funds:IST", "funds:TI2"]
+
+
+def test_ranking_tiers():
+    docs = index()
+
+    # Exact key, then key prefix, then name prefix, then any token
+    assert docs.search("IST")[0] == "funds:IST"
+    assert docs.search("tür") == ["stocks:THYAO.IS", "stocks:ISCTR.IS"]
+    assert docs.search("bankasi") == ["stocks:GARAN.IS", "stocks:ISCTR.IS"]
+    assert docs.search("THYAO.IS") == docs.search("thyao") == ["stocks:THYAO.IS"]
+    assert docs.search("bankası", limit=1) == ["stocks:GARAN.IS"]
+
+
+def test_add_and_remove_update_every_column():
+    docs = index()
+
+    docs.add("stocks:GARAN.IS", "GARAN.IS", "Garanti BBVA")
+    docs.remove("funds:IST")
+
+    assert docs.search("bbva") == ["stocks:GARAN.IS"]
+    assert docs.search("garanti bankasi") == []
+    assert docs.search("istanbul") == []
+    assert "funds:IST" not in docs
+    assert len(docs) == 4
+
+
+def test_search_service_ignores_market_suffixes(tmp_path):
+    cache = CacheManager(MemoryBackend())
+    cache.upsert_stocks([
+        {"symbol": "THYAO.IS", "name": "Türk Hava Yolları"},
+        {"symbol": "ISCTR.IS", "name": "Türkiye İş Bankası"},
+    ])
+    cache.update_forex([{"symbol": "TRY=X", "pair": "USD/TRY"}])
+    search = SearchService(cache, FundCatalog(str(tmp_path / "catalog.json")))
+
+    assert [r["symbol"] for r in search.search("is")] == ["ISCTR.IS"]
+    assert [r["symbol"] for r in search.search("x")] == []
+    assert [r["symbol"] for r in search.search("TRY=X")] == ["TRY=X"]
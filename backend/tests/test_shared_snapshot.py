@@ -0,0 +1,75 @@
+"""SharedSnapshot seqlock region and leader -> follower cache sync"""
+from cache.backends import MemoryBackend
+from cache.cache_manager import CacheManager
+from cache.shared_snapshot import SharedSnapshot, LeaderLock
+
+
+def test_readers_see_each_published_snapshot_once(tmp_path):
+    path = str(tmp_path / "snapshot.shm")
+    writer, reader = SharedSnapshot(path, 1 << 16), SharedSnapshot(path, 1 << 16)
+    assert reader.read_if_changed() is None  # Nothing published yet
+
+    assert writer.publish({"version": 1, "data": "a"})
+    assert reader.read_if_changed() == {"version": 1, "data": "a"}
+    assert reader.read_if_changed() is None
+
+    writer.publish({"version": 2, "data": "b"})
+    assert reader.read_if_changed()["data"] == "b"
+    assert reader.status()["version"] == 2
+
+
+def test_older_snapshots_are_not_published_over_newer_ones(tmp_path):
+    path = str(tmp_path / "snapshot.shm")
+    writer, reader = SharedSnapshot(path, 1 << 16), SharedSnapshot(path, 1 << 16)
+
+    writer.publish({"version": 5})
+    writer.publish({"version": 4})  # A slower writer thread finishing late
+
+    assert reader.read_if_changed() == {"version": 5}
+
+
+def test_oversized_snapshot_is_reported_until_the_next_publish(tmp_path):
+    path = str(tmp_path / "snapshot.shm")
+    writer, reader = SharedSnapshot(path, 4096), SharedSnapshot(path, 4096)
+    writer.publish({"version": 1})
+
+    assert not writer.publish({"version": 2, "blob": b"x" * 8192})
+
+    assert reader.read_if_changed() == {"version": 1}
+    status = reader.status()
+    assert status["failed_version"] == 2
+    assert writer.status()["publish_failures"] == 1
+
+    writer.publish({"version": 3})
+    assert reader.status()["failed_version"] is None
+
+
+def stock(symbol, price):
+    return {"symbol": symbol, "name": symbol, "price": price, "change_percent": 1.0, "volume": 10, "market_cap": 1e9}
+
+
+def test_followers_adopt_only_the_lists_that_changed(tmp_path):
+    path = str(tmp_path / "snapshot.shm")
+    leader, follower = CacheManager(MemoryBackend()), CacheManager(MemoryBackend())
+    leader.update_funds([{"code": "AAK", "name": "Fund", "price": 1.0}])
+    leader.start_publishing(SharedSnapshot(path, 1 << 20))
+    snapshot = SharedSnapshot(path, 1 << 20)
+
+    follower._replace_state(snapshot.read_if_changed())
+    funds = follower.get_listing("funds")[0]
+    leader.upsert_stocks([stock("A.IS", 10.0)])
+    follower._replace_state(snapshot.read_if_changed())
+
+    assert follower.get_version() == leader.get_version()
+    assert [s["price"] for s in follower.get_stocks()] == [10.0]
+    assert follower.get_movers("volume", 1)[0]["symbol"] == "A.IS"
+    assert follower.get_listing("funds")[0] is funds  # Untouched list kept as is
+
+
+def test_leader_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    first, second = LeaderLock(path), LeaderLock(path)
+
+    assert first.try_acquire()
+    assert first.held
+    assert not second.try_acquire()
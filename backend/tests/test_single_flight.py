@@ -0,0 +1,83 @@
+"""SingleFlight: concurrent callers share one call, its result and its error"""
+import threading
+
+import pytest
+
+from services.single_flight import SingleFlight, symbol_key
+
+
+def run_concurrently(flight, key, func, callers):
+    """Start `callers` threads on flight.do once the leader's call is running"""
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(flight.do(key, func))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"THYAO.IS": 1.0}
+
+    leader, results, _ = run_concurrently(flight, "k", fetch, 1)
+    assert started.wait(5)
+    followers, more, _ = run_concurrently(flight, "k", fetch, 4)
+    while flight._calls["k"].shared < 4:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results + more == [{"THYAO.IS": 1.0}] * 5
+    assert flight.in_flight() == 0
+
+
+def test_waiters_get_the_leaders_exception():
+    flight = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("rate limited")
+
+    leader, _, leader_errors = run_concurrently(flight, "k", fetch, 1)
+    assert started.wait(5)
+    followers, _, errors = run_concurrently(flight, "k", fetch, 2)
+    while flight._calls["k"].shared < 2:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert [str(e) for e in leader_errors + errors] == ["rate limited"] * 3
+
+
+def test_nothing_is_cached_between_calls():
+    flight = SingleFlight("test")
+    counter = iter(range(10))
+
+    assert flight.do("k", lambda: next(counter)) == 0
+    assert flight.do("k", lambda: next(counter)) == 1
+    with pytest.raises(ZeroDivisionError):
+        flight.do("k", lambda: 1 / 0)
+    assert flight.in_flight() == 0
+
+
+def test_symbol_key_ignores_order_and_duplicates():
+    assert symbol_key(["GARAN.IS", "AKBNK.IS", "GARAN.IS"]) == symbol_key(["AKBNK.IS", "GARAN.IS"])